@@ -1,11 +1,22 @@
+import io
+import numpy as np
 import pandas as pd
 from datetime import datetime
-from models.pedido import Pedido
-from typing import List, Optional
+from models.catalogo import Catalogo, IndiceCatalogo, RecorteCatalogo
+from models.indice_pedidos import IndicePedidos
+from models.indice_datas import IndiceDatas
+from models.resumo_pedidos import resumo_por_cliente
+from typing import List, Optional, Tuple
 import streamlit as st
 import os
 import shutil
 from utils.sheets_pedidos_sync import SheetsPedidosSync
+from utils.cache_compartilhado import cache_catalogo, cache_dados, cache_historico
+from utils.armazenamento import obter_armazenamento
+from utils.backup_pedidos import obter_backups
+from utils.busca_pedidos import indice_busca
+from utils.fila_replicacao import fila_replicacao
+from utils.numerador_pedidos import NumeradorPedidos, ordem_numerica
 import webbrowser
 import pathlib
 import base64
@@ -19,176 +30,136 @@ class PedidoController:
         """
         self.caminho_planilha = caminho_planilha
         self.pedidos = []
-        self.arquivo_pedidos = os.path.join('pedidos', 'pedidos.xlsx')
-        self.diretorio_backup = os.path.join('pedidos', 'backup')
+        self.indice = None
         self.sheets_sync = SheetsPedidosSync()
-        
-        # Criar diretório de backup se não existir
-        os.makedirs(self.diretorio_backup, exist_ok=True)
+        self.armazenamento = obter_armazenamento()
+        self.backups = obter_backups()
+        self.numerador = NumeradorPedidos(self.armazenamento, os.path.join('pedidos', 'contador_pedidos.json'))
+        # Alterações que ficaram pendentes (ex.: antes de um reinício) voltam a ser enviadas
+        self._replicacao_disponivel()
 
-    def _carregar_planilha(self, caminho: str) -> List[Pedido]:
+    def _carregar_planilha(self, caminho: str) -> Catalogo:
         """
-        Carrega os dados da planilha SOMENTE do Google Sheets.
+        Carrega o catálogo do armazenamento local, atualizado pela aba Projeto do Google Sheets.
+
+        A cada recarga do cache (CATALOGO_TTL_SEGUNDOS) uma sonda barata (modifiedTime da
+        planilha) diz se ela mudou desde a cópia local; só então a aba Projeto é baixada de novo.
+        Sem conexão, segue com a cópia local.
         """
         try:
-            sheets_sync = SheetsPedidosSync()
-            if sheets_sync.client and sheets_sync.SPREADSHEET_URL:
-                sheet = sheets_sync.client.open_by_url(sheets_sync.SPREADSHEET_URL)
-                worksheet = sheet.worksheet("Projeto")
-                data = worksheet.get_all_records()
-                df = pd.DataFrame(data)
-            else:
+            valores = self.armazenamento.ler_projeto()
+            if self.sheets_sync.client and self.sheets_sync.SPREADSHEET_URL:
+                try:
+                    versao = self.sheets_sync.versao_planilha()
+                    if not valores or (versao is not None and versao != self.armazenamento.versao_projeto()):
+                        remotos = self.sheets_sync.ler_valores("Projeto")
+                        if remotos:
+                            self.armazenamento.salvar_projeto(remotos, versao)
+                            valores = remotos
+                except Exception:
+                    if not valores:
+                        raise
+            elif not valores:
                 raise Exception("Não foi possível conectar ao Google Sheets. Verifique as credenciais e a URL da planilha.")
             
-            # Mapeia os nomes das colunas da planilha
-            colunas_mapeadas = {
-                'RACK': 'rack',
-                'CÓD Yazaki': 'cod_yazaki',
-                'Codigo Cabo': 'codigo_cabo',
-                'Secção': 'seccao',
-                'Cor': 'cor',
-                'Cliente': 'cliente',
-                'Locação': 'locacao',
-                'Projeto': 'projeto',
-                'Cod OES': 'cod_oes'
-            }
-            
-            # Renomeia as colunas para corresponder aos nomes dos atributos da classe
-            df = df.rename(columns=colunas_mapeadas)
-            
-            # Limpa os dados
-            for col in df.columns:
-                if df[col].dtype == 'object':
-                    df[col] = df[col].fillna('').astype(str).str.strip()
-            
-            # Converte o DataFrame para lista de objetos Pedido
-            pedidos = [
-                Pedido(
-                    id=idx + 1,
-                    rack=row['rack'],
-                    cod_yazaki=row['cod_yazaki'],
-                    codigo_cabo=row['codigo_cabo'],
-                    seccao=row['seccao'],
-                    cor=row['cor'],
-                    cliente=row['cliente'],
-                    locacao=row['locacao'],
-                    projeto=row['projeto'],
-                    cod_oes=row['cod_oes']
-                )
-                for idx, row in df.iterrows()
-            ]
-            
-            return pedidos
+            # Monta o catálogo colunar com operações vetorizadas
+            return Catalogo.de_valores(valores)
             
         except Exception as e:
             raise Exception(f"Erro ao carregar dados da planilha do Google Sheets: {str(e)}")
 
+    def carregar_indice(self) -> IndiceCatalogo:
+        """Retorna o índice do catálogo, montado uma vez por versão no cache compartilhado"""
+        self.indice = cache_catalogo.obter(
+            lambda: IndiceCatalogo(self._carregar_planilha(self.caminho_planilha))
+        )
+        self.pedidos = self.indice.catalogo
+        return self.indice
+
     def carregar_dados(self):
-        """Carrega os dados usando a função cacheada"""
-        self.pedidos = self._carregar_planilha(self.caminho_planilha)
-        return self.pedidos
+        """Carrega os dados do cache compartilhado entre sessões (recarrega após o TTL)"""
+        return self.carregar_indice().catalogo
 
     def _fazer_backup(self):
-        """Faz backup do arquivo antes de modificá-lo"""
-        if os.path.exists(self.arquivo_pedidos):
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            backup_path = os.path.join(
-                self.diretorio_backup, 
-                f"pedidos_backup_{timestamp}.xlsx"
-            )
-            
-            # Copiar arquivo atual para backup
-            pd.read_excel(self.arquivo_pedidos).to_excel(backup_path, index=False)
-            
-            # Manter apenas os últimos 10 backups
-            backups = sorted([
-                os.path.join(self.diretorio_backup, f) 
-                for f in os.listdir(self.diretorio_backup)
-                if f.endswith('.xlsx')
-            ])
-            while len(backups) > 10:
-                os.remove(backups.pop(0))
+        """Faz backup do armazenamento local antes de modificá-lo (se mudou desde o último backup)"""
+        self.backups.fazer_backup()
+
+    def _garantir_dados_locais(self):
+        """Na primeira execução, carrega o armazenamento local com as abas Pedidos e Itens do Google Sheets"""
+        if not self.armazenamento.vazio():
+            return
+        if self.sheets_sync.client and self.sheets_sync.SPREADSHEET_URL:
+            self.armazenamento.substituir_pedidos(*self.sheets_sync.carregar_pedidos_do_sheets())
+
+    def _replicacao_disponivel(self) -> bool:
+        """Garante a thread de replicação rodando se o Google Sheets estiver configurado"""
+        if not (self.sheets_sync.client and self.sheets_sync.SPREADSHEET_URL):
+            return False
+        fila_replicacao.iniciar(self.sheets_sync)
+        return True
 
     def _ler_pedidos(self) -> pd.DataFrame:
-        """Lê a aba 'Pedidos' do Google Sheets com cache"""
-        try:
-            # Verificar cache
-            if 'cache_pedidos' in st.session_state:
-                return st.session_state['cache_pedidos']
-
-            if self.sheets_sync.client and self.sheets_sync.SPREADSHEET_URL:
-                sheet = self.sheets_sync.client.open_by_url(self.sheets_sync.SPREADSHEET_URL)
-                worksheet = sheet.worksheet("Pedidos")
-                data = worksheet.get_all_records()
-                df = pd.DataFrame(data)
-                # Garantir que as colunas existam
-                if 'Ultima_Atualizacao' not in df.columns:
-                    df['Ultima_Atualizacao'] = ""
-                if 'Responsavel_Atualizacao' not in df.columns:
-                    df['Responsavel_Atualizacao'] = ""
-                
-                # Salvar no cache
-                st.session_state['cache_pedidos'] = df
-                return df
-            else:
-                return pd.DataFrame()
-        except Exception as e:
-            if "Quota exceeded" in str(e) or "[429]" in str(e):
-                # Se tiver cache, usa ele
-                if 'cache_pedidos' in st.session_state:
-                    return st.session_state['cache_pedidos']
-                return pd.DataFrame()
-            return pd.DataFrame()
+        """Pedidos do armazenamento local, em cache compartilhado pela versão dos dados (somente leitura)"""
+        return cache_dados.obter("pedidos", self.versao_dados(), self.armazenamento.ler_pedidos)
 
     def _ler_itens(self) -> pd.DataFrame:
-        """Lê a aba 'Itens' do Google Sheets com cache"""
-        try:
-            # Verificar cache
-            if 'cache_itens' in st.session_state:
-                return st.session_state['cache_itens']
-
-            if self.sheets_sync.client and self.sheets_sync.SPREADSHEET_URL:
-                sheet = self.sheets_sync.client.open_by_url(self.sheets_sync.SPREADSHEET_URL)
-                worksheet = sheet.worksheet("Itens")
-                data = worksheet.get_all_records()
-                df = pd.DataFrame(data)
-                
-                # Salvar no cache
-                st.session_state['cache_itens'] = df
-                return df
-            else:
-                return pd.DataFrame()
-        except Exception as e:
-            if "Quota exceeded" in str(e) or "[429]" in str(e):
-                # Se tiver cache, usa ele
-                if 'cache_itens' in st.session_state:
-                    return st.session_state['cache_itens']
-                return pd.DataFrame()
-            return pd.DataFrame()
+        """Itens do armazenamento local, em cache compartilhado pela versão dos dados (somente leitura)"""
+        return cache_dados.obter("itens", self.versao_dados(), self.armazenamento.ler_itens)
+
+    def _indice_pedidos(self) -> IndicePedidos:
+        """Índice Numero_Pedido → pedido/itens, construído uma vez por versão dos dados"""
+        return cache_dados.obter(
+            "indice_pedidos", self.versao_dados(), lambda: IndicePedidos(self._ler_pedidos(), self._ler_itens())
+        )
+
+    def _indice_datas(self) -> IndiceDatas:
+        """Datas dos pedidos já convertidas e ordenadas, uma vez por versão dos dados"""
+        return cache_dados.obter("indice_datas", self.versao_dados(), lambda: IndiceDatas(self._ler_pedidos()))
+
+    def versao_dados(self) -> int:
+        """Versão atual dos pedidos locais (muda a cada gravação); chave para caches derivados"""
+        self._garantir_dados_locais()
+        return self.armazenamento.versao_dados()
+
+    def resumo_por_cliente(self) -> pd.DataFrame:
+        """Totais por cliente (Total, Concluído, Em Processamento, Pendente, Urgente), lidos do resumo materializado"""
+        return cache_dados.obter(
+            "resumo_por_cliente", self.versao_dados(),
+            lambda: resumo_por_cliente(self.armazenamento.resumo_status())
+        )
+
+    def tempos_de_atendimento(self) -> dict:
+        """Pedidos concluídos e média/mediana do tempo de atendimento (horas), lidos do resumo materializado"""
+        return cache_dados.obter(
+            "tempos_de_atendimento", self.versao_dados(), self.armazenamento.tempos_de_atendimento
+        )
+
+    def historico_pedido(self, numero_pedido: str) -> pd.DataFrame:
+        """Eventos (criação e mudanças de status) de um pedido, em ordem"""
+        return self.armazenamento.eventos(numero_pedido)
+
+    def exportar_excel(self) -> bytes:
+        """Gera sob demanda o arquivo Excel com as abas Pedidos e Itens (em cache por versão dos dados)"""
+        def gerar():
+            buffer = io.BytesIO()
+            with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
+                self._ler_pedidos().to_excel(writer, sheet_name='Pedidos', index=False)
+                self._ler_itens().to_excel(writer, sheet_name='Itens', index=False)
+            return buffer.getvalue()
+        return cache_dados.obter("exportacao_excel", self.versao_dados(), gerar)
 
     def _gerar_numero_pedido(self) -> str:
-        """Gera um número único para o pedido"""
-        try:
-            df = self._ler_pedidos()
-            if df.empty:
-                return "REQ-001"
-            ultimo_numero = df["Numero_Pedido"].iloc[-1]
-            numero = int(ultimo_numero.split("-")[1]) + 1
-            return f"REQ-{numero:03d}"
-        except:
-            return "REQ-001"
+        """Gera um número único para o pedido (reservado no armazenamento local)"""
+        return self.numerador.proximo()
 
     def salvar_pedido(self, pedido_info: dict) -> str:
         """Salva o pedido localmente e sincroniza com Google Sheets"""
+        self._garantir_dados_locais()
         numero_pedido = self._gerar_numero_pedido()
         
         try:
-            # Carregar dados existentes
-            df_pedidos = self._ler_pedidos()
-            df_itens = self._ler_itens()
-            
             # Criar novo registro de pedido
-            novo_pedido = pd.DataFrame([{
+            registro_pedido = {
                 "Numero_Pedido": numero_pedido,
                 "Data": pedido_info["data"].strftime('%d/%m/%Y %H:%M'),
                 "Cliente": pedido_info["cliente"],
@@ -200,7 +171,7 @@ class PedidoController:
                 "Status": "Pendente",
                 "Ultima_Atualizacao": datetime.now().strftime('%d/%m/%Y %H:%M'),
                 "Responsavel_Atualizacao": pedido_info["solicitante"]
-            }])
+            }
             
             # Criar registros de itens
             novos_itens = []
@@ -214,152 +185,193 @@ class PedidoController:
                     "quantidade": item["quantidade"]
                 })
             
-            df_novos_itens = pd.DataFrame(novos_itens)
-            
-            # Concatenar com dados existentes
-            df_pedidos = pd.concat([df_pedidos, novo_pedido], ignore_index=True)
-            df_itens = pd.concat([df_itens, df_novos_itens], ignore_index=True)
-            
             # Fazer backup antes de salvar
             self._fazer_backup()
             
-            # Salvar localmente
-            with pd.ExcelWriter(self.arquivo_pedidos, engine='openpyxl') as writer:
-                df_pedidos.to_excel(writer, sheet_name='Pedidos', index=False)
-                df_itens.to_excel(writer, sheet_name='Itens', index=False)
+            # Gravar no armazenamento local (sistema de registro): só as linhas novas
+            versao_anterior = self.armazenamento.versao_dados()
+            self.armazenamento.inserir_pedido(registro_pedido, novos_itens)
+            # O índice de busca recebe só o pedido novo
+            indice_busca.acompanhar(versao_anterior, self.armazenamento.versao_dados(), [registro_pedido])
             
-            # Sincronizar com Google Sheets
-            success, message = self.sheets_sync.salvar_pedido_completo(df_pedidos, df_itens)
-            if not success:
-                st.warning(f"Aviso: {message}")
+            # Replicar no Google Sheets em segundo plano (apenas as novas linhas)
+            if self._replicacao_disponivel():
+                fila_replicacao.enfileirar_pedido(registro_pedido, novos_itens)
+            else:
+                st.warning("Aviso: Google Sheets não configurado. O pedido foi salvo apenas localmente.")
             
             return numero_pedido
             
         except Exception as e:
             raise Exception(f"Erro ao salvar pedido: {str(e)}")
 
-    def buscar_pedidos(self, 
-                      numero_pedido: Optional[str] = None,
-                      cliente: Optional[str] = None,
-                      status: Optional[str] = None) -> pd.DataFrame:
-        """Busca pedidos com filtros opcionais"""
-        try:
+    # Ordenações do histórico: rótulo → coluna
+    ORDENACOES_HISTORICO = {
+        "Data": "Data",
+        "Última Atualização": "Ultima_Atualizacao",
+        "Número": "Numero_Pedido",
+        "Cliente": "Cliente",
+        "Status": "Status",
+    }
+
+    def consultar_pedidos(self, status: Optional[str] = None, data_inicial=None, data_final=None,
+                          ordenar_por: str = "Data", crescente: bool = False) -> np.ndarray:
+        """
+        Rótulos dos pedidos filtrados, na ordem do histórico, em cache por filtro e versão dos dados.
+
+        Só os rótulos ficam em cache (não uma cópia dos pedidos por filtro); as linhas de
+        uma página são lidas do DataFrame compartilhado por pagina_pedidos.
+        """
+        def consultar():
             df = self._ler_pedidos()
-            
-            # Se não conseguiu ler os pedidos, retorna DataFrame vazio
-            if df.empty:
-                return df
-            
-            # Preencher valores NaN com string vazia
-            df = df.fillna("")
-            
-            if numero_pedido:
-                df = df[df["Numero_Pedido"].str.contains(numero_pedido, case=False)]
-            if cliente:
-                df = df[df["Cliente"].str.contains(cliente, case=False)]
+            indice = self._indice_datas()
+            coluna = self.ORDENACOES_HISTORICO.get(ordenar_por, "Data")
+            # Período por busca binária nas datas já ordenadas; o resultado já sai ordenado por Data
+            rotulos = indice.selecionar(
+                pd.Timestamp(data_inicial) if data_inicial else None,
+                pd.Timestamp(data_final) + pd.Timedelta(days=1) if data_final else None,
+                crescente=crescente or coluna != "Data"
+            )
             if status:
-                df = df[df["Status"] == status]
-            
-            return df
-        except Exception as e:
-            # Retorna DataFrame vazio em caso de erro
-            return pd.DataFrame()
+                rotulos = rotulos[(df["Status"].loc[rotulos] == status).to_numpy()]
+            if coluna == "Data":
+                return rotulos
+            if coluna == "Ultima_Atualizacao":
+                chave = indice.ultima_atualizacao.loc[rotulos]
+                ordenada = chave.sort_values(ascending=crescente, kind="stable", na_position="last")
+            elif coluna == "Numero_Pedido":
+                # Pela parte numérica: como texto, REQ-1000 viria antes de REQ-999
+                ordenada = df[coluna].loc[rotulos].sort_values(
+                    ascending=crescente, kind="stable", key=ordem_numerica, na_position="last"
+                )
+            else:
+                ordenada = df[coluna].loc[rotulos].sort_values(ascending=crescente, kind="stable")
+            return ordenada.index.to_numpy()
+        chave = ("consulta", status, data_inicial, data_final, ordenar_por, crescente)
+        return cache_historico.obter(chave, self.versao_dados(), consultar)
+
+    def pagina_pedidos(self, rotulos: np.ndarray, inicio: int, tamanho: int) -> pd.DataFrame:
+        """Linhas de uma página de consultar_pedidos (cópia só das linhas exibidas)"""
+        return self._ler_pedidos().loc[rotulos[inicio:inicio + tamanho]]
+
+    def _numeros_com_status(self, status: str) -> set:
+        """Números dos pedidos com o status, uma vez por versão dos dados"""
+        def calcular():
+            df = self._ler_pedidos()
+            return set(df.loc[df["Status"] == status, "Numero_Pedido"])
+        return cache_dados.obter(("numeros_com_status", status), self.versao_dados(), calcular)
+
+    def buscar_texto(self, consulta: str, status: Optional[str] = None,
+                     limite: int = 200) -> Tuple[pd.DataFrame, int]:
+        """
+        Busca por texto em número, cliente, solicitante, RACK, localização e observações.
+
+        Usa o índice invertido do processo (reconstruído só quando os dados mudaram por
+        outro caminho que não as gravações deste app). O filtro de status entra antes do
+        corte em limite; retorna (pedidos por relevância, total encontrado).
+        """
+        versao = self.versao_dados()
+        if indice_busca.versao != versao:
+            indice_busca.reconstruir(self._ler_pedidos(), versao)
+        resultados, total = indice_busca.buscar(
+            consulta, limite, self._numeros_com_status(status) if status else None
+        )
+        indice = self._indice_pedidos()
+        registros = [indice.pedido(numero) for numero, _ in resultados]
+        return pd.DataFrame(
+            [registro for registro in registros if registro], columns=self._ler_pedidos().columns
+        ), total
 
     def get_pedido_detalhes(self, numero_pedido: str) -> dict:
-        """Retorna os detalhes completos de um pedido, consultando apenas o Google Sheets, com cache e tratamento de quota."""
+        """Retorna os detalhes completos de um pedido pelo índice em memória (sem rede nem varredura)."""
         try:
-            # Usar cache em session_state
-            cache_key = f"detalhes_pedido_{numero_pedido}"
-            if cache_key in st.session_state:
-                return st.session_state[cache_key]
-            if not hasattr(self, 'sheets_sync') or not self.sheets_sync.client:
-                st.warning("Por favor, recarregue a página e aguarde um minuto antes de tentar novamente.")
+            indice = self._indice_pedidos()
+            pedido = indice.pedido(numero_pedido)
+            if not pedido:
                 return {}
-            detalhes = self.sheets_sync.get_pedido_detalhes(numero_pedido)
-            st.session_state[cache_key] = detalhes
-            return detalhes
+            info_dict = {
+                chave: pedido.get(chave, "")
+                for chave in [
+                    "Numero_Pedido", "Data", "Cliente", "RACK", "Localizacao", "Solicitante",
+                    "Observacoes", "Ultima_Atualizacao", "Responsavel_Atualizacao"
+                ]
+            }
+            return {
+                "info": info_dict,
+                "itens": indice.itens(numero_pedido),
+                "status": pedido.get("Status", "")
+            }
         except Exception as e:
-            if "Quota exceeded" in str(e) or "[429]" in str(e):
-                st.warning("Por favor, recarregue a página e aguarde um minuto antes de tentar novamente.")
+            st.warning(f"Não foi possível carregar os detalhes do pedido: {str(e)}")
             return {}
 
     def atualizar_status_pedido(self, numero_pedido: str, novo_status: str, responsavel: str):
         """Atualiza o status de um pedido localmente e no Google Sheets."""
         try:
-            # Carregar dados existentes do Sheets
-            df_pedidos = self._ler_pedidos()
-            df_itens = self._ler_itens()
-
-            # Encontrar o índice do pedido no DataFrame
-            idx = df_pedidos[df_pedidos['Numero_Pedido'] == numero_pedido].index[0]
+            self.atualizar_status_pedidos([numero_pedido], novo_status, responsavel)
+        except Exception as e:
+            # Não exibe mensagem de erro, apenas retorna silenciosamente
+            pass
 
-            # Atualizar status no DataFrame
+    def atualizar_status_pedidos(self, numeros_pedidos: List[str], novo_status: str, responsavel: str) -> tuple[bool, str]:
+        """Atualiza o status de vários pedidos de uma vez: uma gravação local e uma requisição ao Google Sheets."""
+        try:
+            self._garantir_dados_locais()
             ultima_atualizacao = datetime.now().strftime('%d/%m/%Y %H:%M')
-            df_pedidos.loc[idx, 'Status'] = novo_status
-            df_pedidos.loc[idx, 'Ultima_Atualizacao'] = ultima_atualizacao
-            df_pedidos.loc[idx, 'Responsavel_Atualizacao'] = responsavel
-
-            # Se for urgente e concluído, atualizar campo Urgente (robusto)
-            urgente_original = str(df_pedidos.loc[idx, 'Urgente']).strip().lower()
-            urgente_foi_concluido = False
-            if novo_status == 'Concluído' and 'sim' in urgente_original:
-                df_pedidos.loc[idx, 'Urgente'] = 'Concluido Urgente'
-                urgente_foi_concluido = True
-                print(f"[DEBUG] Pedido {numero_pedido} marcado como Concluido Urgente!")
 
             # Fazer backup antes de salvar localmente
             self._fazer_backup()
 
-            # Salvar localmente
-            with pd.ExcelWriter(self.arquivo_pedidos, engine='openpyxl') as writer:
-                df_pedidos.to_excel(writer, sheet_name='Pedidos', index=False)
-                df_itens.to_excel(writer, sheet_name='Itens', index=False)
-
-            # Atualizar status (e urgente se necessário) no Google Sheets
-            self.sheets_sync.atualizar_status_pedido_sheets(
-                numero_pedido=numero_pedido,
-                novo_status=novo_status,
-                ultima_atualizacao=ultima_atualizacao,
-                responsavel=responsavel,
-                urgente_para_concluido_urgente=urgente_foi_concluido
+            # Atualizar no armazenamento local; urgentes concluídos passam a "Concluido Urgente"
+            versao_anterior = self.armazenamento.versao_dados()
+            encontrados = self.armazenamento.atualizar_status(
+                numeros_pedidos, novo_status, ultima_atualizacao, responsavel
             )
-
-            # Limpar cache após atualização
-            if 'cache_pedidos' in st.session_state:
-                del st.session_state['cache_pedidos']
-            cache_key = f"detalhes_pedido_{numero_pedido}"
-            if cache_key in st.session_state:
-                del st.session_state[cache_key]
+            # Status não é pesquisado: o índice de busca só acompanha a versão
+            indice_busca.acompanhar(versao_anterior, self.armazenamento.versao_dados())
+            if not encontrados:
+                return False, "Nenhum dos pedidos selecionados foi encontrado."
+
+            # Replicar status (e urgente se necessário) no Google Sheets em segundo plano
+            if not self._replicacao_disponivel():
+                return True, "Status atualizado apenas localmente: Google Sheets não configurado."
+            fila_replicacao.enfileirar_status([
+                {
+                    "numero_pedido": numero_pedido,
+                    "novo_status": novo_status,
+                    "ultima_atualizacao": ultima_atualizacao,
+                    "responsavel": responsavel,
+                    "urgente_para_concluido_urgente": urgente_concluido
+                }
+                for numero_pedido, urgente_concluido in encontrados.items()
+            ])
+            return True, "Status atualizado com sucesso!"
 
         except Exception as e:
-            # Não exibe mensagem de erro, apenas retorna silenciosamente
-            pass
+            raise Exception(f"Erro ao atualizar status dos pedidos: {str(e)}")
+
+    def filtrar_dados(self, cliente: Optional[str] = None,
+                     rack: Optional[str] = None) -> RecorteCatalogo:
+        """
+        Filtra o catálogo pelo motor vetorizado (cache por versão do catálogo e filtro).
+
+        Retorna só as posições encontradas; os objetos Pedido são criados quando cada
+        linha é acessada, então quem exibe parte do resultado paga só por essa parte.
+        """
+        catalogo = self.carregar_dados()
+        return catalogo.recorte(catalogo.filtrar(cliente, rack))
 
-    @staticmethod
-    @st.cache_data
-    def filtrar_dados(pedidos: List[Pedido], cliente: Optional[str] = None, 
-                     rack: Optional[str] = None) -> List[Pedido]:
-        """Filtra os dados com cache"""
-        resultado = pedidos
-        if cliente:
-            cliente = cliente.lower()
-            resultado = [p for p in resultado if p.cliente.lower() == cliente]
-        if rack:
-            rack = rack.lower()
-            resultado = [p for p in resultado if p.rack.lower() == rack]
-        return resultado
-
-    def buscar_por_cliente(self, cliente: str) -> List[Pedido]:
+    def buscar_por_cliente(self, cliente: str) -> RecorteCatalogo:
         """Busca pedidos por cliente (case-insensitive)"""
-        return self.filtrar_dados(self.pedidos, cliente=cliente)
+        return self.filtrar_dados(cliente=cliente)
 
-    def buscar_por_rack(self, rack: str) -> List[Pedido]:
+    def buscar_por_rack(self, rack: str) -> RecorteCatalogo:
         """Busca pedidos por rack (case-insensitive)"""
-        return self.filtrar_dados(self.pedidos, rack=rack)
+        return self.filtrar_dados(rack=rack)
 
-    def buscar_por_cliente_e_rack(self, cliente: str, rack: str) -> List[Pedido]:
+    def buscar_por_cliente_e_rack(self, cliente: str, rack: str) -> RecorteCatalogo:
         """Busca pedidos por cliente e rack (case-insensitive)"""
-        return self.filtrar_dados(self.pedidos, cliente=cliente, rack=rack)
+        return self.filtrar_dados(cliente=cliente, rack=rack)
 
     def imprimir_pedido(self, numero_pedido: str, view=None):
         """Gera um PDF do comprovante do pedido (layout texto) e retorna o link de download para o usuário"""
@@ -0,0 +1,178 @@
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+import numpy as np
+import pandas as pd
+from models.pedido import Pedido
+
+# Colunas da aba "Projeto" → atributos do Pedido
+COLUNAS_PLANILHA = {
+    'RACK': 'rack',
+    'CÓD Yazaki': 'cod_yazaki',
+    'Codigo Cabo': 'codigo_cabo',
+    'Secção': 'seccao',
+    'Cor': 'cor',
+    'Cliente': 'cliente',
+    'Locação': 'locacao',
+    'Projeto': 'projeto',
+    'Cod OES': 'cod_oes'
+}
+
+# Colunas com poucos valores distintos, guardadas como categorias
+COLUNAS_CATEGORICAS = ['cliente', 'rack', 'projeto', 'seccao', 'cor']
+
+# Limite de combinações de filtro guardadas por versão do catálogo
+MAX_FILTROS_EM_CACHE = 256
+
+
+def _casefold(coluna: pd.Series) -> np.ndarray:
+    """Versão casefold de uma coluna, calculada só sobre as categorias quando possível"""
+    if isinstance(coluna.dtype, pd.CategoricalDtype):
+        categorias = np.asarray(coluna.cat.categories.str.casefold(), dtype=object)
+        return categorias[coluna.cat.codes.to_numpy()]
+    return np.asarray(coluna.str.casefold(), dtype=object)
+
+
+class Catalogo(Sequence[Pedido]):
+    """
+    Catálogo de localizações em formato colunar.
+
+    Os dados ficam em um DataFrame com colunas categóricas; objetos Pedido só
+    são criados sob demanda, quando um item específico é acessado.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+        self.cliente_cf = _casefold(df['cliente'])
+        self.rack_cf = _casefold(df['rack'])
+        self.locacao_cf = _casefold(df['locacao'])
+        # Resultados de filtros já calculados; o catálogo é imutável, então valem por toda a versão
+        self._filtros: Dict[Tuple[Optional[str], Optional[str]], np.ndarray] = {}
+
+    @classmethod
+    def de_valores(cls, valores: List[List[str]]) -> 'Catalogo':
+        """Monta o catálogo a partir das linhas da planilha (primeira linha = cabeçalho)"""
+        if not valores:
+            valores = [list(COLUNAS_PLANILHA)]
+        df = pd.DataFrame(valores[1:], columns=valores[0], dtype=object)
+        df = df.rename(columns=COLUNAS_PLANILHA)
+
+        colunas = list(COLUNAS_PLANILHA.values())
+        # Descarta colunas extras/em branco da planilha antes de alinhar o layout
+        df = df.loc[:, df.columns.isin(colunas) & ~df.columns.duplicated()]
+        df = df.reindex(columns=colunas, fill_value='')
+        for col in colunas:
+            df[col] = df[col].fillna('').astype(str).str.strip()
+        for col in COLUNAS_CATEGORICAS:
+            df[col] = df[col].astype('category')
+        return cls(df.reset_index(drop=True))
+
+    def __len__(self) -> int:
+        return len(self.df)
+
+    def __getitem__(self, posicao: int) -> Pedido:
+        return self.pedido(posicao)
+
+    def __iter__(self) -> Iterator[Pedido]:
+        return (self.pedido(posicao) for posicao in range(len(self)))
+
+    def pedido(self, posicao: int) -> Pedido:
+        """Cria a visão Pedido de uma linha do catálogo"""
+        if posicao < 0:
+            posicao += len(self)
+        valores = {col: self.df[col].iat[posicao] for col in COLUNAS_PLANILHA.values()}
+        return Pedido(id=posicao + 1, **valores)
+
+    def recorte(self, posicoes: np.ndarray) -> 'RecorteCatalogo':
+        """Visão das linhas nas posições informadas, sem criar os objetos Pedido"""
+        return RecorteCatalogo(self, posicoes)
+
+    def filtrar(self, cliente: Optional[str] = None, rack: Optional[str] = None) -> np.ndarray:
+        """Posições das linhas do cliente/rack informados (case-insensitive), com cache por filtro"""
+        chave = (cliente.casefold() if cliente else None, rack.casefold() if rack else None)
+        posicoes = self._filtros.get(chave)
+        if posicoes is None:
+            mascara = np.ones(len(self), dtype=bool)
+            if chave[0]:
+                mascara &= self.cliente_cf == chave[0]
+            if chave[1]:
+                mascara &= self.rack_cf == chave[1]
+            posicoes = np.flatnonzero(mascara)
+            if len(self._filtros) >= MAX_FILTROS_EM_CACHE:
+                self._filtros.clear()
+            self._filtros[chave] = posicoes
+        return posicoes
+
+
+class RecorteCatalogo(Sequence[Pedido]):
+    """
+    Linhas selecionadas do catálogo (por exemplo, o resultado de um filtro).
+
+    Guarda só as posições; cada Pedido é criado quando a linha é acessada, então quem
+    exibe uma página do resultado paga só pelas linhas exibidas.
+    """
+
+    def __init__(self, catalogo: Catalogo, posicoes: np.ndarray):
+        self.catalogo = catalogo
+        self.posicoes = posicoes
+
+    def __len__(self) -> int:
+        return len(self.posicoes)
+
+    def __getitem__(self, indice):
+        if isinstance(indice, slice):
+            return RecorteCatalogo(self.catalogo, self.posicoes[indice])
+        return self.catalogo.pedido(int(self.posicoes[indice]))
+
+    def __iter__(self) -> Iterator[Pedido]:
+        return (self.catalogo.pedido(int(posicao)) for posicao in self.posicoes)
+
+    @property
+    def df(self) -> pd.DataFrame:
+        """Linhas selecionadas em formato colunar"""
+        return self.catalogo.df.iloc[self.posicoes]
+
+
+class IndiceCatalogo:
+    """
+    Índice hierárquico cliente → rack → locação → Pedido do catálogo de localizações.
+
+    As chaves são normalizadas com casefold(); o índice é montado uma única vez
+    por versão do catálogo e responde às consultas da tela sem percorrer a lista.
+    """
+
+    def __init__(self, catalogo: Catalogo):
+        self.catalogo = catalogo
+        df = catalogo.df
+        chaves = pd.DataFrame({
+            'cliente': catalogo.cliente_cf,
+            'rack': catalogo.rack_cf,
+            'nome_rack': df['rack'].astype(str).to_numpy()
+        })
+        # Posições (na ordem da planilha) de cada par cliente/rack
+        self._grupos: Dict[tuple, np.ndarray] = chaves.groupby(['cliente', 'rack'], sort=False).indices
+
+        self.clientes: List[str] = sorted(df['cliente'].cat.categories)
+        pares = chaves[['cliente', 'nome_rack']].drop_duplicates()
+        self._racks: Dict[str, List[str]] = {
+            chave: sorted(racks) for chave, racks in pares.groupby('cliente')['nome_rack']
+        }
+
+    def _posicoes_do_rack(self, cliente: str, rack: str) -> np.ndarray:
+        return self._grupos.get((cliente.casefold(), rack.casefold()), np.empty(0, dtype=np.intp))
+
+    def racks(self, cliente: str) -> List[str]:
+        """Racks do cliente, já ordenados"""
+        return self._racks.get(cliente.casefold(), [])
+
+    def posicoes(self, cliente: str, rack: str) -> List[str]:
+        """Locações do rack na ordem da planilha"""
+        posicoes = self._posicoes_do_rack(cliente, rack)
+        return self.catalogo.df['locacao'].to_numpy()[posicoes].tolist()
+
+    def item(self, cliente: str, rack: str, locacao: str) -> Optional[Pedido]:
+        """Item do catálogo para a posição selecionada"""
+        posicoes = self._posicoes_do_rack(cliente, rack)
+        encontrados = posicoes[self.catalogo.locacao_cf[posicoes] == locacao.casefold()]
+        if len(encontrados) == 0:
+            return None
+        # Mantém o primeiro item da locação, como fazia a busca linear
+        return self.catalogo.pedido(int(encontrados[0]))
@@ -0,0 +1,59 @@
+from datetime import datetime
+from typing import Optional
+import numpy as np
+import pandas as pd
+
+# Formatos aceitos nas colunas de data dos pedidos, do mais comum para o menos comum
+FORMATOS_DATA = ('%d/%m/%Y %H:%M', '%d/%m/%Y %H:%M:%S', '%d/%m/%Y')
+
+
+def converter_datas(textos: pd.Series) -> pd.Series:
+    """Converte a coluna inteira para datetime64 (NaT onde nenhum formato serve), um formato por vez"""
+    textos = textos.fillna("").astype(str).str.strip()
+    datas = pd.to_datetime(textos, format=FORMATOS_DATA[0], errors="coerce")
+    for formato in FORMATOS_DATA[1:]:
+        faltantes = datas.isna()
+        if not faltantes.any():
+            break
+        datas[faltantes] = pd.to_datetime(textos[faltantes], format=formato, errors="coerce")
+    return datas
+
+
+class IndiceDatas:
+    """
+    Datas dos pedidos (Data e Ultima_Atualizacao) convertidas uma vez por versão dos dados.
+
+    Os rótulos dos pedidos ficam ordenados por Data, então um filtro de período é
+    uma busca binária (searchsorted) nas datas ordenadas seguida de um recorte, sem
+    converter nem comparar a coluna inteira a cada consulta.
+    """
+
+    def __init__(self, df_pedidos: pd.DataFrame):
+        vazio = pd.Series(dtype=str, index=df_pedidos.index)
+        self.data = converter_datas(df_pedidos.get("Data", vazio))
+        self.ultima_atualizacao = converter_datas(df_pedidos.get("Ultima_Atualizacao", vazio))
+        # Ordenação estável: pedidos com a mesma data mantêm a ordem de criação; sem data vão para o fim
+        ordem = np.argsort(self.data.values, kind="stable")
+        self._rotulos = self.data.index.values[ordem]
+        self._datas = self.data.values[ordem]
+        self._validas = int(self.data.notna().sum())
+
+    def __len__(self) -> int:
+        return len(self._rotulos)
+
+    def selecionar(self, inicio: Optional[datetime] = None, fim: Optional[datetime] = None,
+                   crescente: bool = True) -> np.ndarray:
+        """
+        Rótulos dos pedidos com inicio <= Data <= fim, ordenados por Data.
+
+        Sem limites retorna todos (os sem data no fim); com algum limite, os sem data ficam de fora.
+        """
+        validas = self._datas[:self._validas]
+        if inicio is None and fim is None:
+            rotulos = self._rotulos[:self._validas]
+            sem_data = self._rotulos[self._validas:]
+            return np.concatenate([rotulos if crescente else rotulos[::-1], sem_data])
+        primeiro = np.searchsorted(validas, np.datetime64(inicio), side="left") if inicio is not None else 0
+        ultimo = np.searchsorted(validas, np.datetime64(fim), side="right") if fim is not None else self._validas
+        rotulos = self._rotulos[primeiro:ultimo]
+        return rotulos if crescente else rotulos[::-1]
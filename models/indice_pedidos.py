@@ -0,0 +1,46 @@
+from typing import Dict, List, Optional
+import numpy as np
+import pandas as pd
+
+
+class IndicePedidos:
+    """
+    Índice por Numero_Pedido sobre os pedidos e itens de uma versão dos dados.
+
+    Construído uma vez por versão (agrupando os itens em uma única passada); depois
+    cada consulta de pedido ou de itens é uma busca em dicionário, sem varrer as tabelas.
+    """
+
+    def __init__(self, df_pedidos: pd.DataFrame, df_itens: pd.DataFrame):
+        self.df_pedidos = df_pedidos
+        self.df_itens = df_itens
+        self._pedidos: Dict[str, int] = {}
+        if "Numero_Pedido" in df_pedidos.columns:
+            # O armazenamento não guarda números repetidos: inserir_pedido recusa um número já
+            # gravado e a carga completa fica com a primeira linha (as demais são registradas em
+            # pedidos_repetidos). Se ainda assim houver repetição, vale a primeira, como na carga.
+            numeros = df_pedidos["Numero_Pedido"].tolist()
+            self._pedidos = dict(zip(reversed(numeros), range(len(numeros) - 1, -1, -1)))
+        self._itens: Dict[str, np.ndarray] = {}
+        if "Numero_Pedido" in df_itens.columns and not df_itens.empty:
+            self._itens = df_itens.groupby("Numero_Pedido", sort=False).indices
+
+    def __contains__(self, numero_pedido: str) -> bool:
+        return numero_pedido in self._pedidos
+
+    def __len__(self) -> int:
+        return len(self._pedidos)
+
+    def pedido(self, numero_pedido: str) -> Optional[Dict[str, str]]:
+        """Registro do pedido ou None se não existir"""
+        posicao = self._pedidos.get(numero_pedido)
+        if posicao is None:
+            return None
+        return self.df_pedidos.iloc[posicao].to_dict()
+
+    def itens(self, numero_pedido: str) -> List[Dict[str, str]]:
+        """Itens do pedido, na ordem em que foram gravados"""
+        posicoes = self._itens.get(numero_pedido)
+        if posicoes is None:
+            return []
+        return self.df_itens.iloc[posicoes].to_dict('records')
@@ -0,0 +1,25 @@
+import pandas as pd
+
+# Colunas do resumo por cliente, na ordem dos cartões do dashboard
+COLUNAS_RESUMO = ["Total", "Concluído", "Em Processamento", "Pendente", "Urgente"]
+
+
+def resumo_por_cliente(contagens: pd.DataFrame) -> pd.DataFrame:
+    """
+    Totais por cliente (colunas de COLUNAS_RESUMO) a partir do resumo de status materializado.
+
+    `contagens` tem uma linha por Cliente, Status, Urgente (0/1) e Dia com a Quantidade
+    de pedidos; o trabalho é proporcional ao número de combinações, não ao de pedidos.
+    Urgente conta só os pedidos urgentes ainda pendentes, como nos cartões do dashboard.
+    """
+    if contagens.empty:
+        return pd.DataFrame(columns=COLUNAS_RESUMO, dtype="int64").rename_axis("Cliente")
+    por_status = contagens.pivot_table(
+        index="Cliente", columns="Status", values="Quantidade", aggfunc="sum", fill_value=0
+    )
+    resumo = por_status.reindex(columns=COLUNAS_RESUMO[1:4], fill_value=0)
+    resumo.insert(0, "Total", por_status.sum(axis=1))
+    urgentes = contagens[(contagens["Status"] == "Pendente") & contagens["Urgente"].astype(bool)]
+    resumo["Urgente"] = urgentes.groupby("Cliente")["Quantidade"].sum().reindex(resumo.index, fill_value=0)
+    resumo.columns.name = None
+    return resumo.astype("int64").sort_index()
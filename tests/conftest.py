@@ -0,0 +1,21 @@
+import pytest
+from utils.armazenamento import ArmazenamentoSQLite, COLUNAS_PEDIDOS
+
+
+def pedido(numero: str, **campos) -> dict:
+    """Registro de pedido completo, com valores padrão para as colunas não informadas"""
+    registro = {coluna: "" for coluna in COLUNAS_PEDIDOS}
+    registro.update({
+        "Numero_Pedido": numero,
+        "Data": "10/03/2025 08:00",
+        "Cliente": "ACME",
+        "Status": "Pendente",
+        "Urgente": "Não",
+    })
+    registro.update(campos)
+    return registro
+
+
+@pytest.fixture
+def armazenamento(tmp_path):
+    return ArmazenamentoSQLite(str(tmp_path / "pedidos.db"))
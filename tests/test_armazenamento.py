@@ -0,0 +1,52 @@
+import sqlite3
+import pandas as pd
+import pytest
+from tests.conftest import pedido
+
+
+def test_numero_repetido_gera_erro_e_preserva_o_pedido(armazenamento):
+    armazenamento.inserir_pedido(pedido("REQ-001", Cliente="ACME"), [])
+    versao = armazenamento.versao_dados()
+    with pytest.raises(sqlite3.IntegrityError):
+        armazenamento.inserir_pedido(pedido("REQ-001", Cliente="Outro"), [])
+    assert armazenamento.ler_pedidos()["Cliente"].tolist() == ["ACME"]
+    assert armazenamento.versao_dados() == versao
+    assert armazenamento.verificar_resumo().empty
+
+
+def test_carga_completa_relata_numeros_repetidos(armazenamento):
+    pedidos = pd.DataFrame([
+        pedido("REQ-001", Cliente="Primeiro"),
+        pedido("REQ-001", Cliente="Segundo"),
+        pedido("REQ-002"),
+    ])
+    repetidos = armazenamento.substituir_pedidos(pedidos, pd.DataFrame(columns=["Numero_Pedido"]))
+    assert repetidos == ["REQ-001"]
+    assert armazenamento.pedidos_repetidos() == ["REQ-001"]
+    df = armazenamento.ler_pedidos()
+    assert df["Numero_Pedido"].tolist() == ["REQ-001", "REQ-002"]
+    assert df["Cliente"].iloc[0] == "Primeiro"
+
+
+def test_catalogo_guarda_a_versao_da_planilha(armazenamento):
+    assert armazenamento.versao_projeto() is None
+    armazenamento.salvar_projeto([["RACK", "Cliente"], ["R1", "ACME"]], "2025-03-10T08:00:00Z")
+    assert armazenamento.versao_projeto() == "2025-03-10T08:00:00Z"
+    assert armazenamento.ler_projeto()[1][:1] == ["R1"]
+
+
+def test_snapshots_periodicos_tem_retencao(armazenamento):
+    diario = armazenamento.diario
+    diario.eventos_por_snapshot, diario.snapshots_recentes = 2, 3
+    # Sem a thread de segundo plano: os snapshots são gravados aqui, na ordem do teste
+    armazenamento._snapshot_em_andamento.acquire()
+    for i in range(12):
+        armazenamento.inserir_pedido(pedido(f"REQ-{i:03d}"), [])
+        with armazenamento._conexao() as conexao:
+            diario.registrar_snapshot_periodico(conexao)
+    with armazenamento._conexao() as conexao:
+        snapshots = conexao.execute("SELECT periodico FROM snapshots ORDER BY id").fetchall()
+    # A base do diário fica sempre; dos periódicos (todos do mesmo dia) ficam os mais recentes
+    assert snapshots[0] == (0,)
+    assert [linha for linha in snapshots if linha == (1,)] == [(1,)] * 3
+    assert len(armazenamento.estado_em(pd.Timestamp.now().to_pydatetime())[0]) == 12
@@ -0,0 +1,98 @@
+import hashlib
+import json
+import os
+from datetime import datetime, timedelta
+import pytest
+from tests.conftest import pedido
+from utils.backup_pedidos import GerenciadorBackups
+
+
+@pytest.fixture
+def backups(armazenamento, tmp_path):
+    return GerenciadorBackups(armazenamento, str(tmp_path / "backup"), intervalo_minimo=timedelta(minutes=10))
+
+
+def _dias_atras(dias: int, hora: int) -> datetime:
+    return datetime.combine(datetime.now().date() - timedelta(days=dias), datetime.min.time()).replace(hour=hora)
+
+
+def _redatar(backups, **momentos):
+    """Reescreve criado_em das entradas do manifesto (arquivo → momento)"""
+    entradas = backups._ler_manifesto()
+    for entrada in entradas:
+        if entrada["arquivo"] in momentos:
+            entrada["criado_em"] = momentos[entrada["arquivo"]].isoformat(timespec='seconds')
+    backups._gravar_manifesto(entradas)
+
+
+def test_backup_so_quando_os_dados_mudaram_e_o_intervalo_passou(backups, armazenamento):
+    armazenamento.inserir_pedido(pedido("REQ-001"), [{"Numero_Pedido": "REQ-001", "quantidade": "2"}])
+    entrada = backups.fazer_backup()
+    assert (entrada["pedidos"], entrada["itens"]) == (1, 1)
+    assert backups.fazer_backup() is None
+
+    armazenamento.inserir_pedido(pedido("REQ-002"), [])
+    assert backups.fazer_backup() is None
+    assert backups.fazer_backup(forcar=True, motivo="manual")["pedidos"] == 2
+    assert [e["motivo"] for e in backups.listar()] == ["manual", "automático"]
+
+
+def test_manifesto_registra_tamanho_e_checksum(backups, armazenamento):
+    armazenamento.inserir_pedido(pedido("REQ-001"), [])
+    entrada = backups.fazer_backup()
+    caminho = os.path.join(backups.diretorio, entrada["arquivo"])
+    with open(caminho, "rb") as f:
+        assert hashlib.sha256(f.read()).hexdigest() == entrada["sha256"]
+    assert entrada["tamanho"] == os.path.getsize(caminho)
+    with open(backups.arquivo_manifesto, encoding="utf-8") as f:
+        assert json.load(f) == [entrada]
+
+
+def test_retencao_mantem_recentes_e_um_por_dia(backups, armazenamento):
+    nomes = []
+    for i in range(4):
+        armazenamento.inserir_pedido(pedido(f"REQ-{i:03d}"), [])
+        nomes.append(backups.fazer_backup(forcar=True)["arquivo"])
+    antigo, mesmo_dia_cedo, mesmo_dia_tarde, recente = nomes
+    _redatar(backups, **{
+        antigo: _dias_atras(40, 10),
+        mesmo_dia_cedo: _dias_atras(3, 10),
+        mesmo_dia_tarde: _dias_atras(3, 11),
+        recente: datetime.now() - timedelta(hours=1),
+    })
+    armazenamento.inserir_pedido(pedido("REQ-999"), [])
+    novo = backups.fazer_backup()["arquivo"]
+
+    mantidos = [e["arquivo"] for e in backups.listar()]
+    assert mantidos == [novo, recente, mesmo_dia_tarde]
+    assert sorted(os.listdir(backups.diretorio)) == sorted(mantidos + ["manifesto.json"])
+
+
+def test_restaurar_confere_o_checksum_e_salva_o_estado_atual(backups, armazenamento):
+    armazenamento.inserir_pedido(pedido("REQ-001"), [])
+    arquivo = backups.fazer_backup()["arquivo"]
+    armazenamento.inserir_pedido(pedido("REQ-002"), [])
+
+    backups.restaurar(arquivo)
+    assert armazenamento.ler_pedidos()["Numero_Pedido"].tolist() == ["REQ-001"]
+    assert backups.listar()[0]["motivo"] == f"antes de restaurar {arquivo}"
+    assert backups.listar()[0]["pedidos"] == 2
+
+    with open(os.path.join(backups.diretorio, arquivo), "ab") as f:
+        f.write(b"corrompido")
+    with pytest.raises(ValueError, match="checksum"):
+        backups.restaurar(arquivo)
+    with pytest.raises(ValueError, match="manifesto"):
+        backups.restaurar("inexistente.db")
+
+
+def test_restaurar_backup_antigo_nao_o_apaga_antes_de_usar(backups, armazenamento):
+    armazenamento.inserir_pedido(pedido("REQ-001"), [])
+    antigo = backups.fazer_backup()["arquivo"]
+    armazenamento.inserir_pedido(pedido("REQ-002"), [])
+    mais_tarde = backups.fazer_backup(forcar=True)["arquivo"]
+    # Do mesmo dia que outro backup e fora das últimas horas: a próxima retenção o descartaria
+    _redatar(backups, **{antigo: _dias_atras(2, 10), mais_tarde: _dias_atras(2, 11)})
+
+    backups.restaurar(antigo)
+    assert armazenamento.ler_pedidos()["Numero_Pedido"].tolist() == ["REQ-001"]
@@ -0,0 +1,63 @@
+import pandas as pd
+from utils.busca_pedidos import IndiceBusca, normalizar
+
+
+def _indice(registros, versao=1):
+    indice = IndiceBusca()
+    indice.reconstruir(pd.DataFrame(registros), versao)
+    return indice
+
+
+def _numeros(resultado):
+    return [numero for numero, _ in resultado[0]]
+
+
+def test_normalizar_ignora_caixa_e_acentos():
+    assert normalizar("Conexão ÁGUA") == "conexao agua"
+
+
+def test_exige_todos_os_termos_e_ordena_por_relevancia():
+    indice = _indice([
+        {"Numero_Pedido": "REQ-001", "Cliente": "Volvo", "Observacoes": "cabo azul"},
+        {"Numero_Pedido": "REQ-002", "Cliente": "Scania", "Observacoes": "volvo azulado"},
+        {"Numero_Pedido": "REQ-003", "Cliente": "Volvo", "Observacoes": "cabo verde"},
+    ])
+    # Cliente pesa mais que observações; palavra exata vale mais que início de palavra
+    assert _numeros(indice.buscar("volvo azul")) == ["REQ-001", "REQ-002"]
+    assert _numeros(indice.buscar("ânia")) == ["REQ-002"]
+    assert indice.buscar("volvo inexistente") == ([], 0)
+
+
+def test_termo_curto_vale_como_inicio_de_palavra():
+    indice = _indice([
+        {"Numero_Pedido": "REQ-001", "Cliente": "Volvo"},
+        {"Numero_Pedido": "REQ-002", "Cliente": "Evo"},
+    ])
+    assert _numeros(indice.buscar("vo")) == ["REQ-001"]
+
+
+def test_filtro_entra_antes_do_limite_e_total_conta_tudo():
+    registros = [{"Numero_Pedido": f"REQ-{i:03d}", "Cliente": "ACME"} for i in range(300)]
+    indice = _indice(registros)
+    resultados, total = indice.buscar("acme", limite=200)
+    assert len(resultados) == 200 and total == 300
+    # Os permitidos são os mais antigos, que ficariam fora dos 200 primeiros
+    permitidos = {"REQ-000", "REQ-001", "REQ-002"}
+    resultados, total = indice.buscar("acme", limite=200, permitidos=permitidos)
+    assert {numero for numero, _ in resultados} == permitidos and total == 3
+
+
+def test_acompanhar_inclui_pedido_novo_sem_reconstruir():
+    indice = _indice([{"Numero_Pedido": "REQ-001", "Cliente": "ACME"}], versao=1)
+    indice.acompanhar(1, 2, [{"Numero_Pedido": "REQ-002", "Cliente": "Zeta"}])
+    assert indice.versao == 2
+    assert _numeros(indice.buscar("zeta")) == ["REQ-002"]
+
+
+def test_acompanhar_fora_de_sequencia_pede_reconstrucao():
+    indice = _indice([{"Numero_Pedido": "REQ-001", "Cliente": "ACME"}], versao=1)
+    indice.acompanhar(2, 3, [{"Numero_Pedido": "REQ-002", "Cliente": "Zeta"}])
+    assert indice.versao is None
+    indice = _indice([{"Numero_Pedido": "REQ-001", "Cliente": "ACME"}], versao=1)
+    indice.acompanhar(1, 2, [{"Numero_Pedido": "REQ-001", "Cliente": "ACME"}])
+    assert indice.versao is None
@@ -0,0 +1,83 @@
+import threading
+import time
+from utils.cache_compartilhado import CacheCompartilhado, CacheVersionado
+
+
+class Contador:
+    """Carregador que conta quantas vezes foi chamado"""
+
+    def __init__(self):
+        self.chamadas = 0
+
+    def __call__(self):
+        self.chamadas += 1
+        return self.chamadas
+
+
+def test_valor_vale_ate_o_ttl(monkeypatch):
+    agora = [100.0]
+    monkeypatch.setattr(time, "monotonic", lambda: agora[0])
+    cache, carregar = CacheCompartilhado(ttl_segundos=60), Contador()
+
+    assert cache.obter(carregar) == 1
+    agora[0] += 59
+    assert cache.obter(carregar) == 1
+    agora[0] += 2
+    assert cache.obter(carregar) == 2
+    assert cache.versao == 2
+
+
+def test_invalidar_forca_recarga():
+    cache, carregar = CacheCompartilhado(ttl_segundos=60), Contador()
+    cache.obter(carregar)
+    cache.invalidar()
+    assert cache.obter(carregar) == 2
+
+
+def test_sessoes_simultaneas_carregam_uma_vez():
+    cache = CacheCompartilhado(ttl_segundos=60)
+    chamadas = []
+
+    def carregar():
+        chamadas.append(1)
+        time.sleep(0.05)
+        return "catalogo"
+
+    resultados = []
+    threads = [threading.Thread(target=lambda: resultados.append(cache.obter(carregar))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert resultados == ["catalogo"] * 8
+    assert len(chamadas) == 1
+
+
+def test_versionado_recarrega_so_quando_a_versao_muda():
+    cache, carregar = CacheVersionado(), Contador()
+    assert cache.obter("pedidos", 1, carregar) == 1
+    assert cache.obter("pedidos", 1, carregar) == 1
+    assert cache.obter("pedidos", 2, carregar) == 2
+    # Cada chave tem sua própria versão
+    assert cache.obter("itens", 2, carregar) == 3
+    cache.invalidar("pedidos")
+    assert cache.obter("pedidos", 2, carregar) == 4
+    assert cache.obter("itens", 2, carregar) == 3
+
+
+def test_versionado_permite_montar_um_valor_a_partir_de_outro():
+    cache = CacheVersionado()
+    indice = cache.obter("indice", 1, lambda: ["indice de"] + cache.obter("pedidos", 1, lambda: ["pedidos"]))
+    assert indice == ["indice de", "pedidos"]
+
+
+def test_versionado_descarta_as_chaves_usadas_ha_mais_tempo():
+    cache, carregar = CacheVersionado(max_chaves=2), Contador()
+    cache.obter("a", 1, carregar)
+    cache.obter("b", 1, carregar)
+    # Usar "a" de novo a torna a mais recente; "c" empurra "b" para fora
+    cache.obter("a", 1, carregar)
+    cache.obter("c", 1, carregar)
+    assert cache.obter("a", 1, carregar) == 1
+    assert cache.obter("b", 1, carregar) == 4
+    assert len(cache._valores) == 2
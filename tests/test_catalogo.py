@@ -0,0 +1,50 @@
+import pytest
+from models.catalogo import Catalogo, IndiceCatalogo, RecorteCatalogo
+
+CABECALHO = ['RACK', 'CÓD Yazaki', 'Codigo Cabo', 'Secção', 'Cor', 'Cliente', 'Locação', 'Projeto', 'Cod OES']
+
+
+def _linha(cliente, rack, locacao):
+    return [rack, "Y1", "C1", "0,35", "AZ", cliente, locacao, "P1", "OES"]
+
+
+@pytest.fixture
+def catalogo():
+    return Catalogo.de_valores([
+        CABECALHO,
+        _linha("ACME", "R1", "A-01"),
+        _linha("Zeta", "R1", "Z-01"),
+        _linha("acme ", "r2", "A-02"),
+        _linha("ACME", "R1", "A-03"),
+    ])
+
+
+def test_filtro_ignora_caixa_e_espacos(catalogo):
+    assert catalogo.filtrar(cliente="Acme").tolist() == [0, 2, 3]
+    assert catalogo.filtrar(cliente="ACME", rack="r1").tolist() == [0, 3]
+    assert catalogo.filtrar(rack="R2").tolist() == [2]
+    assert catalogo.filtrar(cliente="Nenhum").tolist() == []
+    assert catalogo.filtrar().tolist() == [0, 1, 2, 3]
+
+
+def test_filtro_repetido_vem_do_cache(catalogo):
+    assert catalogo.filtrar(cliente="acme") is catalogo.filtrar(cliente="ACME")
+
+
+def test_recorte_cria_pedidos_so_das_linhas_acessadas(catalogo):
+    recorte = catalogo.recorte(catalogo.filtrar(cliente="ACME"))
+    assert len(recorte) == 3
+    assert recorte[1].locacao == "A-02" and recorte[1].id == 3
+    pagina = recorte[1:]
+    assert isinstance(pagina, RecorteCatalogo)
+    assert [pedido.locacao for pedido in pagina] == ["A-02", "A-03"]
+    assert recorte.df["locacao"].tolist() == ["A-01", "A-02", "A-03"]
+
+
+def test_indice_responde_racks_locacoes_e_item(catalogo):
+    indice = IndiceCatalogo(catalogo)
+    assert indice.racks("acme") == ["R1", "r2"]
+    assert indice.posicoes("ACME", "r1") == ["A-01", "A-03"]
+    assert indice.item("Acme", "R1", "a-03").locacao == "A-03"
+    assert indice.item("ACME", "R1", "Z-01") is None
+    assert indice.racks("Nenhum") == [] and indice.posicoes("Nenhum", "R1") == []
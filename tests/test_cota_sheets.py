@@ -0,0 +1,74 @@
+import pytest
+from utils import cota_sheets
+from utils.cota_sheets import LimitadorCota
+
+
+class ErroHttp(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"[{status_code}]")
+        self.response = type("Resposta", (), {"status_code": status_code})()
+
+
+class Dormiu(Exception):
+    pass
+
+
+@pytest.fixture
+def sem_espera(monkeypatch):
+    esperas = []
+    monkeypatch.setattr(cota_sheets.time, "sleep", esperas.append)
+    return esperas
+
+
+def test_repete_erros_temporarios_ate_conseguir(sem_espera):
+    limitador = LimitadorCota(6000)
+    respostas = [ErroHttp(503), ErroHttp(500), "ok"]
+
+    def chamada():
+        resposta = respostas.pop(0)
+        if isinstance(resposta, Exception):
+            raise resposta
+        return resposta
+
+    assert limitador.executar(chamada) == "ok"
+    assert len(sem_espera) == 2
+
+
+def test_nao_repete_erro_definitivo(sem_espera):
+    limitador = LimitadorCota(6000)
+    chamadas = []
+
+    def chamada():
+        chamadas.append(1)
+        raise ErroHttp(403)
+
+    with pytest.raises(ErroHttp):
+        limitador.executar(chamada)
+    assert len(chamadas) == 1
+
+
+def test_desiste_depois_do_maximo_de_tentativas(sem_espera):
+    limitador = LimitadorCota(6000, max_tentativas=3)
+    chamadas = []
+
+    def chamada():
+        chamadas.append(1)
+        raise ErroHttp(429)
+
+    with pytest.raises(ErroHttp):
+        limitador.executar(chamada)
+    assert len(chamadas) == 3
+
+
+def test_segundo_plano_nao_usa_a_reserva_interativa(monkeypatch):
+    limitador = LimitadorCota(60, fracao_reservada=0.2)
+    limitador._fichas = 5.0  # abaixo de 1 + reserva (12)
+
+    def dormir(segundos):
+        raise Dormiu(segundos)
+
+    monkeypatch.setattr(cota_sheets.time, "sleep", dormir)
+    assert limitador.executar(lambda: "interativa") == "interativa"
+    with limitador.em_segundo_plano():
+        with pytest.raises(Dormiu):
+            limitador.executar(lambda: "segundo plano")
@@ -0,0 +1,114 @@
+import time
+import pytest
+from utils.fila_replicacao import FilaReplicacao
+
+
+class SheetsFalso:
+    """Registra o que foi replicado; falha as primeiras chamadas de cada tipo"""
+
+    def __init__(self, falhas_status: int = 0, falhas_itens: int = 0, ausentes=()):
+        self.falhas_status = falhas_status
+        self.falhas_itens = falhas_itens
+        self.ausentes = set(ausentes)
+        self.pedidos, self.itens, self.status = [], [], []
+
+    def adicionar_pedidos(self, pedidos, itens):
+        if itens and self.falhas_itens:
+            self.falhas_itens -= 1
+            return False, "Quota exceeded [429]"
+        self.pedidos.extend(pedido["Numero_Pedido"] for pedido in pedidos)
+        self.itens.extend(itens)
+        return True, "ok"
+
+    def aplicar_status_pedidos(self, atualizacoes):
+        if self.falhas_status:
+            self.falhas_status -= 1
+            return False, "Quota exceeded [429]", []
+        aplicadas = [a for a in atualizacoes if a["numero_pedido"] not in self.ausentes]
+        self.status.extend(aplicadas)
+        return True, "ok", [a["numero_pedido"] for a in atualizacoes if a["numero_pedido"] in self.ausentes]
+
+
+def _aguardar(condicao, limite=5.0):
+    fim = time.monotonic() + limite
+    while not condicao():
+        if time.monotonic() > fim:
+            pytest.fail("a fila não chegou ao estado esperado")
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def fila(tmp_path, monkeypatch):
+    monkeypatch.setattr(FilaReplicacao, "ESPERA_INICIAL", 0.01)
+    return FilaReplicacao(str(tmp_path / "replicacao.db"))
+
+
+def _status(numero, novo_status, urgente=False):
+    return {
+        "numero_pedido": numero, "novo_status": novo_status, "ultima_atualizacao": "12/03/2025 10:00",
+        "responsavel": "ana", "urgente_para_concluido_urgente": urgente,
+    }
+
+
+def test_agrupar_reduz_status_ao_ultimo_de_cada_pedido(fila):
+    fila.enfileirar_status([_status("REQ-001", "Concluído", urgente=True)])
+    fila.enfileirar_status([_status("REQ-001", "Pendente"), _status("REQ-002", "Concluído")])
+    pedidos, itens, status = fila._agrupar(fila._proximo_lote())
+    assert pedidos == [] and itens == []
+    assert [(s["numero_pedido"], s["novo_status"], s["urgente_para_concluido_urgente"]) for s in status] == [
+        ("REQ-001", "Pendente", True), ("REQ-002", "Concluído", False)
+    ]
+
+
+def test_mutacoes_pendentes_sobrevivem_a_um_reinicio(fila):
+    fila.enfileirar_pedido({"Numero_Pedido": "REQ-001"}, [{"Numero_Pedido": "REQ-001", "quantidade": 2}])
+    fila.enfileirar_status([_status("REQ-001", "Concluído")])
+    assert fila.profundidade == 2
+
+    nova = FilaReplicacao(fila.arquivo)
+    assert nova.profundidade == 2
+    sheets = SheetsFalso()
+    nova.iniciar(sheets)
+    _aguardar(lambda: nova.profundidade == 0)
+    assert sheets.pedidos == ["REQ-001"]
+    assert sheets.itens == [{"Numero_Pedido": "REQ-001", "quantidade": 2}]
+
+
+def test_falha_nao_descarta_o_lote_e_repete(fila):
+    sheets = SheetsFalso(falhas_status=3)
+    fila.enfileirar_pedido({"Numero_Pedido": "REQ-001"}, [])
+    fila.enfileirar_status([_status("REQ-001", "Concluído")])
+    fila.iniciar(sheets)
+
+    # Enquanto o status falha, ele continua pendente (e contado na profundidade)
+    _aguardar(lambda: fila.ultimo_erro is not None)
+    assert fila.profundidade >= 1
+    _aguardar(lambda: fila.profundidade == 0)
+    assert fila.ultimo_erro is None
+    assert [s["numero_pedido"] for s in sheets.status] == ["REQ-001"]
+    # O pedido já anexado não é anexado de novo nas retentativas do status
+    assert sheets.pedidos == ["REQ-001"]
+
+
+def test_falha_em_itens_nao_anexa_o_pedido_de_novo(fila):
+    sheets = SheetsFalso(falhas_itens=2)
+    fila.enfileirar_pedido({"Numero_Pedido": "REQ-001"}, [{"Numero_Pedido": "REQ-001", "quantidade": 2}])
+    fila.iniciar(sheets)
+
+    _aguardar(lambda: fila.profundidade == 0)
+    assert sheets.pedidos == ["REQ-001"]
+    assert sheets.itens == [{"Numero_Pedido": "REQ-001", "quantidade": 2}]
+
+
+def test_status_de_pedido_ausente_vai_para_descartadas(fila):
+    sheets = SheetsFalso(ausentes={"REQ-404"})
+    fila.enfileirar_status([_status("REQ-404", "Concluído"), _status("REQ-001", "Concluído")])
+    fila.iniciar(sheets)
+
+    # Não bloqueia a fila: o status aplicado sai e o permanente fica registrado à parte
+    _aguardar(lambda: fila.profundidade == 0)
+    assert [s["numero_pedido"] for s in sheets.status] == ["REQ-001"]
+    assert fila.quantidade_descartadas == 1
+    descartada = fila.descartadas()[0]
+    assert descartada["dados"]["numero_pedido"] == "REQ-404"
+    assert fila.ultimo_erro is None
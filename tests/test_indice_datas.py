@@ -0,0 +1,40 @@
+from datetime import datetime
+import pandas as pd
+from models.indice_datas import IndiceDatas, converter_datas
+
+
+def _pedidos():
+    return pd.DataFrame({
+        "Numero_Pedido": ["REQ-001", "REQ-002", "REQ-003", "REQ-004", "REQ-005"],
+        "Data": ["05/03/2025 10:00", "", "01/03/2025", "05/03/2025 10:00:30", "20/02/2025 09:15"],
+        "Ultima_Atualizacao": ["", "", "", "", ""],
+    }, index=[10, 11, 12, 13, 14])
+
+
+def test_converte_todos_os_formatos():
+    datas = converter_datas(pd.Series(["05/03/2025 10:00", "05/03/2025 10:00:30", "01/03/2025", "x"]))
+    assert list(datas[:3]) == [
+        pd.Timestamp(2025, 3, 5, 10, 0), pd.Timestamp(2025, 3, 5, 10, 0, 30), pd.Timestamp(2025, 3, 1)
+    ]
+    assert pd.isna(datas[3])
+
+
+def test_sem_limites_ordena_por_data_e_deixa_sem_data_no_fim():
+    indice = IndiceDatas(_pedidos())
+    assert list(indice.selecionar()) == [14, 12, 10, 13, 11]
+    assert list(indice.selecionar(crescente=False)) == [13, 10, 12, 14, 11]
+
+
+def test_periodo_igual_ao_filtro_direto():
+    df = _pedidos()
+    indice = IndiceDatas(df)
+    inicio, fim = datetime(2025, 3, 1), datetime(2025, 3, 5, 10, 0)
+    datas = converter_datas(df["Data"])
+    esperado = set(df.index[(datas >= inicio) & (datas <= fim)])
+    assert set(indice.selecionar(inicio, fim)) == esperado == {10, 12}
+
+
+def test_com_limite_exclui_pedidos_sem_data():
+    indice = IndiceDatas(_pedidos())
+    assert 11 not in indice.selecionar(inicio=datetime(2000, 1, 1))
+    assert 11 not in indice.selecionar(fim=datetime(2100, 1, 1))
@@ -0,0 +1,113 @@
+import re
+import gspread
+import pytest
+from utils.leitor_incremental import LeitorIncremental
+
+
+class PlanilhaFalsa:
+    """Uma aba em memória que responde às leituras usadas pelo leitor e as conta"""
+
+    id = "planilha"
+
+    def __init__(self, valores):
+        self.valores = valores
+        self.leituras_completas = 0
+        self.leituras_finais = 0
+        self.modificada_em = "2025-03-10T08:00:00Z"
+
+    def get_lastUpdateTime(self):
+        return self.modificada_em
+
+    def values_get(self, faixa):
+        self.leituras_completas += 1
+        return {"values": [list(linha) for linha in self.valores]}
+
+    def values_batch_get(self, faixas):
+        self.leituras_finais += 1
+        primeira = int(re.search(r"!A(\d+):", faixas[1]).group(1))
+        return {"valueRanges": [
+            {"values": [list(self.valores[0])]},
+            # A API omite as células vazias no fim de cada linha
+            {"values": [[c for c in linha if c] for linha in self.valores[primeira - 1:]]},
+        ]}
+
+
+def _pedido(numero, data="10/03/2025 08:00", status="Pendente"):
+    return [numero, data, status]
+
+
+@pytest.fixture
+def planilha():
+    return PlanilhaFalsa([["Numero_Pedido", "Data", "Status"], _pedido("REQ-001"), _pedido("REQ-002")])
+
+
+def test_segunda_leitura_traz_so_as_linhas_novas(planilha):
+    leitor = LeitorIncremental()
+    df, novas, completo = leitor.ler(planilha, "Pedidos")
+    assert (novas, completo) == (2, True)
+
+    planilha.valores.append(_pedido("REQ-003"))
+    df, novas, completo = leitor.ler(planilha, "Pedidos")
+    assert (novas, completo) == (1, False)
+    assert df["Numero_Pedido"].tolist() == ["REQ-001", "REQ-002", "REQ-003"]
+    assert planilha.leituras_completas == 1
+
+
+def test_mudanca_de_status_na_ultima_linha_nao_rele_a_aba(planilha):
+    leitor = LeitorIncremental()
+    leitor.ler(planilha, "Pedidos")
+    planilha.valores[-1] = _pedido("REQ-002", status="Concluído")
+    planilha.valores.append(_pedido("REQ-003"))
+    _, novas, completo = leitor.ler(planilha, "Pedidos")
+    assert (novas, completo) == (1, False)
+
+
+def test_linhas_apagadas_ou_cabecalho_alterado_forcam_leitura_completa(planilha):
+    leitor = LeitorIncremental()
+    leitor.ler(planilha, "Pedidos")
+    del planilha.valores[1]
+    df, _, completo = leitor.ler(planilha, "Pedidos")
+    assert completo and df["Numero_Pedido"].tolist() == ["REQ-002"]
+
+    planilha.valores[0] = ["Numero_Pedido", "Data", "Situacao"]
+    _, _, completo = leitor.ler(planilha, "Pedidos")
+    assert completo and planilha.leituras_completas == 3
+
+
+def test_aba_sem_colunas_de_conferencia_compara_a_linha_toda():
+    planilha = PlanilhaFalsa([["Local", "Rack"], ["A1", "R1"]])
+    leitor = LeitorIncremental()
+    leitor.ler(planilha, "Projeto")
+    planilha.valores[-1] = ["A1", "R2"]
+    _, _, completo = leitor.ler(planilha, "Projeto")
+    assert completo
+
+
+def test_versao_igual_devolve_o_cache_sem_rede(planilha):
+    leitor = LeitorIncremental()
+    versao = leitor.versao_remota(planilha)
+    leitor.ler(planilha, "Pedidos", versao)
+    _, novas, completo = leitor.ler(planilha, "Pedidos", leitor.versao_remota(planilha))
+    assert (novas, completo) == (0, False)
+    assert planilha.leituras_completas == 1 and planilha.leituras_finais == 0
+
+
+def test_sonda_recusada_deixa_de_ser_usada(planilha):
+    class Resposta:
+        status_code = 403
+        text = "Drive API disabled"
+
+        def json(self):
+            return {"error": {"code": 403, "message": "Drive API disabled", "status": "PERMISSION_DENIED"}}
+
+    chamadas = []
+
+    def recusar():
+        chamadas.append(1)
+        raise gspread.exceptions.APIError(Resposta())
+
+    planilha.get_lastUpdateTime = recusar
+    leitor = LeitorIncremental()
+    assert leitor.versao_remota(planilha) is None
+    assert leitor.versao_remota(planilha) is None
+    assert len(chamadas) == 1
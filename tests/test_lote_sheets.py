@@ -0,0 +1,44 @@
+from utils.lote_sheets import LoteSheets
+
+
+class PlanilhaFalsa:
+    def __init__(self):
+        self.lotes = []
+
+    def batch_update(self, corpo):
+        self.lotes.append(corpo)
+        return {"replies": [{} for _ in corpo["requests"]]}
+
+
+def test_varias_abas_em_uma_unica_chamada():
+    planilha = PlanilhaFalsa()
+    novo_id = LoteSheets.novo_id_aba([1, 2])
+    lote = (
+        LoteSheets()
+        .criar_aba("Itens", novo_id, 1, 6)
+        .formatar_cabecalho(novo_id, 6)
+        .redimensionar(1, 101, 11)
+        .formatar_cabecalho(1, 11)
+    )
+    resposta = lote.enviar(planilha)
+
+    assert len(planilha.lotes) == 1
+    tipos = [next(iter(requisicao)) for requisicao in planilha.lotes[0]["requests"]]
+    assert tipos == ["addSheet", "repeatCell", "updateSheetProperties", "updateSheetProperties",
+                     "repeatCell", "updateSheetProperties"]
+    assert len(resposta["replies"]) == 6
+    # O id escolhido antes do envio já serve às requisições seguintes do mesmo lote
+    assert planilha.lotes[0]["requests"][1]["repeatCell"]["range"]["sheetId"] == novo_id
+    assert not lote
+
+
+def test_lote_vazio_nao_faz_chamada():
+    planilha = PlanilhaFalsa()
+    assert LoteSheets().enviar(planilha) is None
+    assert planilha.lotes == []
+
+
+def test_novo_id_nao_repete_os_existentes(monkeypatch):
+    sorteios = iter([7, 7, 9])
+    monkeypatch.setattr("utils.lote_sheets.random.randint", lambda a, b: next(sorteios))
+    assert LoteSheets.novo_id_aba([7]) == 9
@@ -0,0 +1,85 @@
+import gspread
+import pytest
+from utils.metadados_sheets import MetadadosPlanilha
+
+
+class RespostaErro:
+    """Resposta HTTP mínima para montar um gspread APIError"""
+
+    def __init__(self, codigo):
+        self.status_code = codigo
+        self.text = "erro"
+
+    def json(self):
+        return {"error": {"code": self.status_code, "message": "erro", "status": "INVALID_ARGUMENT"}}
+
+
+def _aba(titulo, cabecalho):
+    return {
+        "properties": {"title": titulo, "sheetId": len(titulo), "gridProperties": {"rowCount": 10}},
+        "data": [{"rowData": [{"values": [{"formattedValue": valor} for valor in cabecalho]}]}],
+    }
+
+
+class PlanilhaFalsa:
+    id = "planilha"
+
+    def __init__(self, abas):
+        self.abas = abas
+        self.chamadas = []
+
+    def fetch_sheet_metadata(self, params):
+        self.chamadas.append(params)
+        titulos = {aba["properties"]["title"] for aba in self.abas}
+        faixas = params.get("ranges", [])
+        # Como a API: uma faixa de aba inexistente invalida a requisição inteira
+        if any(faixa.split("!")[0].strip("'") not in titulos for faixa in faixas if "!" in faixa):
+            raise gspread.exceptions.APIError(RespostaErro(400))
+        if "includeGridData" not in params:
+            return {"sheets": [{"properties": aba["properties"]} for aba in self.abas]}
+        return {"sheets": self.abas}
+
+
+@pytest.fixture
+def planilha():
+    return PlanilhaFalsa([
+        _aba("Pedidos", ["Numero_Pedido", "Data", "Status", ""]),
+        _aba("Itens", ["Numero_Pedido", "quantidade"]),
+        _aba("Projeto", ["RACK", "Cliente"]),
+    ])
+
+
+def test_metadados_sao_lidos_uma_vez(planilha):
+    metadados = MetadadosPlanilha()
+    assert metadados.coluna(planilha, "Pedidos", "Status") == 3
+    assert metadados.coluna(planilha, "Pedidos", "Urgente") is None
+    # Células vazias no fim do cabeçalho são descartadas
+    assert metadados.cabecalho(planilha, "Pedidos") == ["Numero_Pedido", "Data", "Status"]
+    assert metadados.cabecalho(planilha, "Itens") == ["Numero_Pedido", "quantidade"]
+    assert len(planilha.chamadas) == 1
+
+
+def test_aba_inexistente_busca_so_as_que_existem(planilha):
+    planilha.abas = [aba for aba in planilha.abas if aba["properties"]["title"] != "Itens"]
+    metadados = MetadadosPlanilha()
+    assert metadados.aba(planilha, "Itens") is None
+    assert metadados.coluna(planilha, "Projeto", "Cliente") == 2
+    assert len(planilha.chamadas) == 3
+
+
+def test_cabecalho_alterado_e_invalidacao(planilha):
+    metadados = MetadadosPlanilha()
+    assert not metadados.registrar_cabecalho(planilha, "Pedidos", ["Numero_Pedido", "Data", "Status"])
+    assert metadados.registrar_cabecalho(planilha, "Pedidos", ["Numero_Pedido", "Data", "Status", "Urgente"])
+    assert metadados.coluna(planilha, "Pedidos", "Urgente") == 4
+    metadados.invalidar(planilha)
+    assert metadados.coluna(planilha, "Pedidos", "Urgente") is None
+    assert len(planilha.chamadas) == 2
+
+
+def test_erro_que_nao_e_de_faixa_e_propagado(planilha):
+    def falhar(params):
+        raise gspread.exceptions.APIError(RespostaErro(403))
+    planilha.fetch_sheet_metadata = falhar
+    with pytest.raises(gspread.exceptions.APIError):
+        MetadadosPlanilha().abas(planilha)
@@ -0,0 +1,58 @@
+import json
+import threading
+import pandas as pd
+from tests.conftest import pedido
+from utils.numerador_pedidos import NumeradorPedidos, formatar_numero_pedido, numero_do_pedido, ordem_numerica
+
+
+def test_formato_e_parte_numerica():
+    assert formatar_numero_pedido(7) == "REQ-007"
+    assert formatar_numero_pedido(1000) == "REQ-1000"
+    assert numero_do_pedido("REQ-1000") == 1000
+    assert numero_do_pedido("sem número") is None
+
+
+def test_ordem_numerica_poe_req_1000_depois_de_req_999():
+    numeros = pd.Series(["REQ-1000", "REQ-999", "REQ-010", "x"])
+    assert numeros.sort_values(key=ordem_numerica).tolist() == ["REQ-010", "REQ-999", "REQ-1000", "x"]
+
+
+def test_continua_do_maior_numero_gravado(armazenamento):
+    armazenamento.inserir_pedido(pedido("REQ-999"), [])
+    armazenamento.inserir_pedido(pedido("REQ-1000"), [])
+    armazenamento.inserir_pedido(pedido("REQ-050"), [])
+    assert NumeradorPedidos(armazenamento).proximo() == "REQ-1001"
+
+
+def test_contador_antigo_so_serve_de_ponto_de_partida(armazenamento, tmp_path):
+    arquivo = tmp_path / "contador_pedidos.json"
+    arquivo.write_text(json.dumps({"ultimo_numero": 41}))
+    assert NumeradorPedidos(armazenamento, str(arquivo)).proximo() == "REQ-042"
+    arquivo.write_text(json.dumps({"ultimo_numero": 10}))
+    assert NumeradorPedidos(armazenamento, str(arquivo)).proximo() == "REQ-043"
+
+
+def test_reservas_concorrentes_nunca_repetem(armazenamento):
+    numerador = NumeradorPedidos(armazenamento)
+    emitidos = []
+
+    def reservar():
+        for _ in range(25):
+            emitidos.append(numerador.proximo())
+
+    threads = [threading.Thread(target=reservar) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(emitidos) == len(set(emitidos)) == 100
+
+
+def test_restaurar_backup_nao_reutiliza_numeros(armazenamento, tmp_path):
+    numerador = NumeradorPedidos(armazenamento)
+    numerador.proximo()
+    copia = str(tmp_path / "copia.db")
+    armazenamento.copiar_para(copia)
+    ultimo = [numerador.proximo() for _ in range(3)][-1]
+    armazenamento.restaurar_de(copia)
+    assert numero_do_pedido(numerador.proximo()) == numero_do_pedido(ultimo) + 1
@@ -0,0 +1,66 @@
+import pytest
+from datetime import date
+import utils.armazenamento as modulo_armazenamento
+import utils.backup_pedidos as modulo_backups
+from controllers.pedido_controller import PedidoController
+from tests.conftest import pedido
+from utils.cache_compartilhado import cache_dados, cache_historico
+
+
+@pytest.fixture
+def controller(tmp_path, monkeypatch, armazenamento):
+    # Sem Google Sheets configurado: o controlador trabalha só com o armazenamento local
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / ".streamlit").mkdir()
+    (tmp_path / ".streamlit" / "secrets.toml").write_text("# sem planilha configurada\n")
+    monkeypatch.setattr(modulo_armazenamento, "_armazenamento", armazenamento)
+    monkeypatch.setattr(modulo_backups, "_gerenciador", None)
+    # Bancos de testes diferentes repetem as mesmas versões dos dados
+    cache_dados.invalidar()
+    cache_historico.invalidar()
+    return PedidoController("localizacoes.xlsx")
+
+
+@pytest.fixture
+def historico(controller):
+    for numero, data, status, cliente in [
+        ("REQ-999", "10/03/2025 08:00", "Pendente", "Beta"),
+        ("REQ-1000", "12/03/2025 08:00", "Concluído", "Alfa"),
+        ("REQ-002", "11/03/2025 08:00", "Pendente", "Gama"),
+        ("REQ-003", "", "Pendente", "Delta"),
+    ]:
+        controller.armazenamento.inserir_pedido(pedido(numero, Data=data, Status=status, Cliente=cliente), [])
+    return controller
+
+
+def _numeros(controller, rotulos, inicio=0, tamanho=100):
+    return controller.pagina_pedidos(rotulos, inicio, tamanho)["Numero_Pedido"].tolist()
+
+
+def test_consulta_ordena_por_data_com_os_sem_data_no_fim(historico):
+    assert _numeros(historico, historico.consultar_pedidos()) == ["REQ-1000", "REQ-002", "REQ-999", "REQ-003"]
+    assert _numeros(historico, historico.consultar_pedidos(crescente=True)) == ["REQ-999", "REQ-002", "REQ-1000", "REQ-003"]
+
+
+def test_consulta_ordena_numero_pela_parte_numerica(historico):
+    rotulos = historico.consultar_pedidos(ordenar_por="Número", crescente=True)
+    assert _numeros(historico, rotulos) == ["REQ-002", "REQ-003", "REQ-999", "REQ-1000"]
+
+
+def test_consulta_filtra_status_e_periodo(historico):
+    rotulos = historico.consultar_pedidos(status="Pendente", data_inicial=date(2025, 3, 11), ordenar_por="Cliente")
+    assert _numeros(historico, rotulos) == ["REQ-002"]
+    assert len(historico.consultar_pedidos(status="Cancelado")) == 0
+
+
+def test_paginas_sao_recortes_da_mesma_ordem(historico):
+    rotulos = historico.consultar_pedidos(ordenar_por="Cliente", crescente=True)
+    assert _numeros(historico, rotulos, 0, 3) == ["REQ-1000", "REQ-999", "REQ-003"]
+    assert _numeros(historico, rotulos, 3, 3) == ["REQ-002"]
+
+
+def test_consulta_em_cache_acompanha_a_versao_dos_dados(historico):
+    antes = historico.consultar_pedidos(status="Concluído")
+    assert historico.consultar_pedidos(status="Concluído") is antes
+    historico.armazenamento.atualizar_status(["REQ-999"], "Concluído", "13/03/2025 10:00", "ana")
+    assert sorted(_numeros(historico, historico.consultar_pedidos(status="Concluído"))) == ["REQ-1000", "REQ-999"]
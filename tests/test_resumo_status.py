@@ -0,0 +1,70 @@
+import sqlite3
+import time
+from tests.conftest import pedido
+from utils.resumo_status import _REGISTRAR_CONCLUSOES
+
+
+def test_gravacoes_mantem_o_resumo_consistente(armazenamento):
+    armazenamento.inserir_pedido(pedido("REQ-001", Cliente="ACME", Urgente="Sim"), [])
+    armazenamento.inserir_pedido(pedido("REQ-002", Cliente="ACME"), [])
+    armazenamento.inserir_pedido(pedido("REQ-003", Cliente="Zeta", Data="11/03/2025 09:00"), [])
+    armazenamento.atualizar_status(["REQ-001", "REQ-003"], "Em Processamento", "12/03/2025 10:00", "ana")
+    armazenamento.atualizar_status(["REQ-001"], "Concluído", "12/03/2025 11:00", "ana")
+
+    assert armazenamento.verificar_resumo().empty
+    resumo = armazenamento.resumo_status()
+    contagens = {
+        (linha.Cliente, linha.Status): linha.Quantidade
+        for linha in resumo.groupby(["Cliente", "Status"], as_index=False)["Quantidade"].sum().itertuples()
+    }
+    assert contagens == {("ACME", "Concluído"): 1, ("ACME", "Pendente"): 1, ("Zeta", "Em Processamento"): 1}
+    # Chave que zerou não fica na tabela
+    assert (resumo["Quantidade"] > 0).all()
+
+
+def test_retirar_e_incluir_movem_o_pedido_de_chave(armazenamento):
+    armazenamento.inserir_pedido(pedido("REQ-001"), [])
+    with sqlite3.connect(armazenamento.arquivo) as conexao:
+        armazenamento.resumo.retirar(conexao, ["REQ-001"])
+        assert conexao.execute("SELECT COUNT(*) FROM resumo_status").fetchone()[0] == 0
+        conexao.execute("UPDATE pedidos SET Status = 'Concluído'")
+        armazenamento.resumo.incluir(conexao, ["REQ-001"])
+        assert conexao.execute("SELECT Status, Quantidade FROM resumo_status").fetchall() == [("Concluído", 1)]
+    assert armazenamento.verificar_resumo().empty
+
+
+def test_verificar_aponta_divergencia_e_reconstruir_corrige(armazenamento):
+    armazenamento.inserir_pedido(pedido("REQ-001"), [])
+    armazenamento.inserir_pedido(pedido("REQ-002"), [])
+    with sqlite3.connect(armazenamento.arquivo) as conexao:
+        conexao.execute("UPDATE resumo_status SET Quantidade = 5")
+    divergencias = armazenamento.verificar_resumo()
+    assert list(divergencias[["Pedidos", "Quantidade"]].iloc[0]) == [2, 5]
+    armazenamento.reconstruir_resumo()
+    assert armazenamento.verificar_resumo().empty
+
+
+def test_tempo_de_atendimento_conta_so_a_primeira_conclusao(armazenamento):
+    for numero in ("REQ-001", "REQ-002", "REQ-003"):
+        armazenamento.inserir_pedido(pedido(numero), [])
+    assert armazenamento.tempos_de_atendimento()["quantidade"] == 0
+    time.sleep(0.01)
+    armazenamento.atualizar_status(["REQ-001", "REQ-002"], "Concluído", "12/03/2025 11:00", "ana")
+    primeiro = armazenamento.tempos_de_atendimento()
+    armazenamento.atualizar_status(["REQ-001"], "Pendente", "12/03/2025 12:00", "ana")
+    armazenamento.atualizar_status(["REQ-001"], "Concluído", "12/03/2025 13:00", "ana")
+
+    tempos = armazenamento.tempos_de_atendimento()
+    assert tempos == primeiro
+    assert tempos["quantidade"] == 2 and tempos["media"] > 0
+    # A reconstrução pelo diário chega ao mesmo resultado
+    armazenamento.reconstruir_resumo()
+    assert armazenamento.tempos_de_atendimento()["quantidade"] == 2
+
+
+def test_registrar_conclusoes_nao_percorre_o_diario(armazenamento):
+    with sqlite3.connect(armazenamento.arquivo) as conexao:
+        plano = [linha[-1] for linha in conexao.execute("EXPLAIN QUERY PLAN " + _REGISTRAR_CONCLUSOES, (0,))]
+    # Só os eventos novos (pelo id) e a criação de cada pedido (pelo índice por número)
+    assert not [passo for passo in plano if passo.startswith("SCAN")], plano
+    assert any("idx_eventos_numero" in passo for passo in plano), plano
@@ -0,0 +1,568 @@
+import os
+import json
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+import pandas as pd
+from models.catalogo import COLUNAS_PLANILHA
+from models.indice_datas import FORMATOS_DATA
+from utils.diario_pedidos import ESQUEMA_DIARIO, DiarioPedidos
+from utils.resumo_status import ESQUEMA_RESUMO, ResumoStatus, TemposAtendimento
+from utils.numerador_pedidos import numero_do_pedido
+
+COLUNAS_PEDIDOS = [
+    "Numero_Pedido", "Data", "Cliente", "RACK", "Localizacao", "Solicitante",
+    "Observacoes", "Urgente", "Status", "Ultima_Atualizacao", "Responsavel_Atualizacao"
+]
+COLUNAS_ITENS = ["Numero_Pedido", "cod_yazaki", "codigo_cabo", "seccao", "cor", "quantidade"]
+COLUNAS_PROJETO = list(COLUNAS_PLANILHA.keys())
+
+def _data_iso(data: str) -> str:
+    """Converte a data do pedido (dd/mm/aaaa hh:mm) para um texto ordenável (aaaa-mm-dd hh:mm)"""
+    for formato in FORMATOS_DATA:
+        try:
+            return datetime.strptime(str(data).strip(), formato).strftime('%Y-%m-%d %H:%M')
+        except ValueError:
+            continue
+    return ''
+
+
+def _texto(valor) -> str:
+    return "" if valor is None or (isinstance(valor, float) and pd.isna(valor)) else str(valor)
+
+
+class ArmazenamentoPedidos(ABC):
+    """Armazenamento local de Pedidos, Itens e do catálogo Projeto (sistema de registro)"""
+
+    @abstractmethod
+    def vazio(self) -> bool:
+        """Indica se o armazenamento ainda não recebeu a carga inicial nem pedidos"""
+
+    @abstractmethod
+    def versao_dados(self) -> int:
+        """Número incrementado a cada escrita em Pedidos/Itens (chave dos caches compartilhados)"""
+
+    @abstractmethod
+    def ler_pedidos(self) -> pd.DataFrame:
+        pass
+
+    @abstractmethod
+    def ler_itens(self) -> pd.DataFrame:
+        pass
+
+    @abstractmethod
+    def reservar_numero_pedido(self, minimo: int = 0) -> int:
+        """Reserva atomicamente o próximo número de pedido (acima de minimo e de todos os já gravados)"""
+
+    @abstractmethod
+    def inserir_pedido(self, pedido: Dict, itens: List[Dict]):
+        pass
+
+    @abstractmethod
+    def atualizar_status(self, numeros_pedidos: List[str], novo_status: str,
+                         ultima_atualizacao: str, responsavel: str) -> Dict[str, bool]:
+        """
+        Atualiza o status dos pedidos encontrados.
+
+        Retorna numero → True se o pedido urgente passou a 'Concluido Urgente'.
+        """
+
+    @abstractmethod
+    def substituir_pedidos(self, df_pedidos: pd.DataFrame, df_itens: pd.DataFrame) -> List[str]:
+        """
+        Substitui todo o conteúdo de Pedidos e Itens (carga a partir do Google Sheets).
+
+        Números repetidos na carga ficam só com a primeira linha; retorna esses números.
+        """
+
+    @abstractmethod
+    def pedidos_repetidos(self) -> List[str]:
+        """Números que vieram repetidos na última carga completa"""
+
+    @abstractmethod
+    def mesclar_pedidos(self, df_pedidos: pd.DataFrame, df_itens: pd.DataFrame) -> int:
+        """
+        Inclui os pedidos que ainda não existem localmente e os itens de pedidos sem itens.
+
+        Retorna quantos pedidos foram incluídos; pedidos já existentes são ignorados.
+        """
+
+    @abstractmethod
+    def copiar_para(self, destino: str) -> Dict[str, int]:
+        """
+        Grava uma cópia consistente de todo o armazenamento no arquivo destino.
+
+        Retorna as contagens da cópia: pedidos, itens e versao_dados.
+        """
+
+    @abstractmethod
+    def restaurar_de(self, origem: str):
+        """Substitui todo o armazenamento pelo conteúdo de uma cópia feita por copiar_para"""
+
+    @abstractmethod
+    def eventos(self, numero_pedido: Optional[str] = None) -> pd.DataFrame:
+        """Eventos de criação e de mudança de status do diário (todos ou de um pedido)"""
+
+    @abstractmethod
+    def estado_em(self, momento: datetime) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """Pedidos e itens como estavam no momento, reconstruídos pelo diário"""
+
+    @abstractmethod
+    def restaurar_momento(self, momento: datetime):
+        """Volta pedidos e itens ao estado do momento (o diário registra a restauração)"""
+
+    @abstractmethod
+    def resumo_status(self, dia_inicio: Optional[str] = None, dia_fim: Optional[str] = None) -> pd.DataFrame:
+        """Contagem de pedidos por Cliente, Status, Urgente e Dia (aaaa-mm-dd), já agregada"""
+
+    @abstractmethod
+    def reconstruir_resumo(self):
+        """Recalcula o resumo de status (pelos pedidos) e os tempos de atendimento (pelo diário)"""
+
+    @abstractmethod
+    def tempos_de_atendimento(self) -> Dict[str, float]:
+        """Pedidos concluídos e média/mediana das horas entre criação e conclusão"""
+
+    @abstractmethod
+    def verificar_resumo(self) -> pd.DataFrame:
+        """Chaves em que o resumo difere da contagem direta (vazio se estiver consistente)"""
+
+    @abstractmethod
+    def ler_projeto(self) -> List[List[str]]:
+        """Linhas do catálogo Projeto, com o cabeçalho da planilha na primeira linha"""
+
+    @abstractmethod
+    def salvar_projeto(self, valores: List[List[str]], versao: Optional[str] = None):
+        pass
+
+    @abstractmethod
+    def versao_projeto(self) -> Optional[str]:
+        """Versão da planilha (modifiedTime) de onde veio a cópia local do catálogo"""
+
+
+class ArmazenamentoSQLite(ArmazenamentoPedidos):
+    """
+    Implementação em SQLite, com índices em Numero_Pedido, Status, Cliente e Data.
+
+    O banco usa journal WAL: cada gravação só acrescenta as páginas alteradas ao log
+    e o SQLite consolida o log no arquivo principal periodicamente (checkpoint automático
+    a cada 1000 páginas, o padrão), então o custo de salvar não cresce com o histórico.
+    """
+
+    def __init__(self, arquivo: str):
+        self.arquivo = arquivo
+        self.diario = DiarioPedidos(COLUNAS_PEDIDOS, COLUNAS_ITENS)
+        self.resumo = ResumoStatus()
+        self.tempos = TemposAtendimento()
+        self._snapshot_em_andamento = threading.Lock()
+        os.makedirs(os.path.dirname(arquivo) or '.', exist_ok=True)
+        self._criar_tabelas()
+
+    @contextmanager
+    def _conexao(self):
+        """Abre uma conexão por operação; o SQLite cuida do lock entre threads e processos"""
+        conexao = sqlite3.connect(self.arquivo, timeout=30)
+        # Em WAL, NORMAL só sincroniza no checkpoint e continua seguro contra queda do processo
+        conexao.execute("PRAGMA synchronous = NORMAL")
+        try:
+            with conexao:
+                yield conexao
+        finally:
+            conexao.close()
+
+    def _criar_tabelas(self):
+        colunas_pedidos = ", ".join(f'"{col}" TEXT NOT NULL DEFAULT \'\'' for col in COLUNAS_PEDIDOS[1:])
+        colunas_itens = ", ".join(f'"{col}" TEXT NOT NULL DEFAULT \'\'' for col in COLUNAS_ITENS[1:])
+        colunas_projeto = ", ".join(f'"{col}" TEXT NOT NULL DEFAULT \'\'' for col in COLUNAS_PROJETO)
+        with self._conexao() as conexao:
+            # O modo WAL fica gravado no arquivo e vale para todas as conexões seguintes
+            conexao.execute("PRAGMA journal_mode = WAL")
+            conexao.executescript(f"""
+                CREATE TABLE IF NOT EXISTS pedidos (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    Numero_Pedido TEXT NOT NULL UNIQUE,
+                    {colunas_pedidos},
+                    Data_ISO TEXT NOT NULL DEFAULT ''
+                );
+                CREATE INDEX IF NOT EXISTS idx_pedidos_status ON pedidos (Status);
+                CREATE INDEX IF NOT EXISTS idx_pedidos_cliente ON pedidos (Cliente);
+                CREATE INDEX IF NOT EXISTS idx_pedidos_data ON pedidos (Data_ISO);
+
+                CREATE TABLE IF NOT EXISTS itens (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    Numero_Pedido TEXT NOT NULL,
+                    {colunas_itens}
+                );
+                CREATE INDEX IF NOT EXISTS idx_itens_numero ON itens (Numero_Pedido);
+
+                CREATE TABLE IF NOT EXISTS projeto (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    {colunas_projeto}
+                );
+
+                CREATE TABLE IF NOT EXISTS meta (
+                    chave TEXT PRIMARY KEY,
+                    valor TEXT NOT NULL
+                );
+            """ + ESQUEMA_DIARIO + ESQUEMA_RESUMO)
+            self.diario.migrar(conexao)
+            self._garantir_resumo(conexao)
+
+    def _garantir_resumo(self, conexao):
+        """Monta o resumo de status em bancos (ou backups) criados antes dele existir"""
+        if conexao.execute("SELECT 1 FROM meta WHERE chave = 'resumo_status'").fetchone() is None:
+            conexao.executescript(ESQUEMA_RESUMO)
+            self.resumo.reconstruir(conexao)
+            conexao.execute("INSERT OR REPLACE INTO meta (chave, valor) VALUES ('resumo_status', '1')")
+        if conexao.execute("SELECT 1 FROM meta WHERE chave = 'tempos_atendimento'").fetchone() is None:
+            conexao.executescript(ESQUEMA_RESUMO)
+            self.tempos.reconstruir(conexao)
+            conexao.execute("INSERT OR REPLACE INTO meta (chave, valor) VALUES ('tempos_atendimento', '1')")
+
+    def _registrar_carga(self, conexao):
+        conexao.execute(
+            "INSERT OR REPLACE INTO meta (chave, valor) VALUES ('inicializado', ?)",
+            (datetime.now().isoformat(timespec='seconds'),)
+        )
+
+    def _registrar_alteracao(self, conexao):
+        conexao.execute(
+            "INSERT INTO meta (chave, valor) VALUES ('versao_dados', '1') "
+            "ON CONFLICT (chave) DO UPDATE SET valor = CAST(valor AS INTEGER) + 1"
+        )
+
+    def versao_dados(self) -> int:
+        with self._conexao() as conexao:
+            linha = conexao.execute("SELECT valor FROM meta WHERE chave = 'versao_dados'").fetchone()
+        return int(linha[0]) if linha else 0
+
+    def vazio(self) -> bool:
+        with self._conexao() as conexao:
+            return conexao.execute("SELECT 1 FROM meta WHERE chave = 'inicializado'").fetchone() is None
+
+    def _consultar(self, sql: str, parametros: tuple = ()) -> pd.DataFrame:
+        with self._conexao() as conexao:
+            return pd.read_sql_query(sql, conexao, params=parametros)
+
+    def _selecao_pedidos(self) -> str:
+        return "SELECT " + ", ".join(f'"{col}"' for col in COLUNAS_PEDIDOS) + " FROM pedidos"
+
+    def ler_pedidos(self) -> pd.DataFrame:
+        return self._consultar(self._selecao_pedidos() + " ORDER BY id")
+
+    def ler_itens(self) -> pd.DataFrame:
+        colunas = ", ".join(f'"{col}"' for col in COLUNAS_ITENS)
+        return self._consultar(f"SELECT {colunas} FROM itens ORDER BY id")
+
+    @staticmethod
+    def _separar_repetidos(pedidos: List[Dict]) -> Tuple[List[Dict], List[str]]:
+        """Mantém a primeira linha de cada número; retorna (pedidos, números repetidos)"""
+        vistos, unicos, repetidos = set(), [], []
+        for pedido in pedidos:
+            numero = _texto(pedido.get("Numero_Pedido"))
+            if numero in vistos:
+                repetidos.append(numero)
+            else:
+                vistos.add(numero)
+                unicos.append(pedido)
+        return unicos, list(dict.fromkeys(repetidos))
+
+    def _inserir_linhas(self, conexao, pedidos: List[Dict], itens: List[Dict]):
+        """Insere pedidos e itens; um número já existente gera sqlite3.IntegrityError (nada é substituído)"""
+        marcadores = ", ".join("?" for _ in range(len(COLUNAS_PEDIDOS) + 1))
+        conexao.executemany(
+            "INSERT INTO pedidos (" + ", ".join(f'"{col}"' for col in COLUNAS_PEDIDOS)
+            + f', Data_ISO) VALUES ({marcadores})',
+            [
+                [_texto(pedido.get(col)) for col in COLUNAS_PEDIDOS] + [_data_iso(pedido.get("Data", ""))]
+                for pedido in pedidos
+            ]
+        )
+        marcadores = ", ".join("?" for _ in COLUNAS_ITENS)
+        conexao.executemany(
+            "INSERT INTO itens (" + ", ".join(f'"{col}"' for col in COLUNAS_ITENS) + f") VALUES ({marcadores})",
+            [[_texto(item.get(col)) for col in COLUNAS_ITENS] for item in itens]
+        )
+
+    def _snapshot_periodico(self):
+        """
+        Grava o snapshot periódico do diário em segundo plano, depois da gravação que o venceu.
+
+        Fica fora da transação e da requisição; se um já estiver em andamento, nada é feito.
+        """
+        if not self._snapshot_em_andamento.acquire(blocking=False):
+            return
+
+        def executar():
+            try:
+                with self._conexao() as conexao:
+                    self.diario.registrar_snapshot_periodico(conexao)
+            finally:
+                self._snapshot_em_andamento.release()
+
+        threading.Thread(target=executar, name="snapshot-diario", daemon=True).start()
+
+    def reservar_numero_pedido(self, minimo: int = 0) -> int:
+        with self._conexao() as conexao:
+            conexao.execute("BEGIN IMMEDIATE")
+            linha = conexao.execute("SELECT valor FROM meta WHERE chave = 'ultimo_numero_pedido'").fetchone()
+            if linha is None:
+                # Primeira alocação: continua a partir do maior número já gravado (comparação numérica)
+                numeros = (numero_do_pedido(numero) for (numero,) in conexao.execute("SELECT Numero_Pedido FROM pedidos"))
+                atual = max((numero for numero in numeros if numero is not None), default=0)
+            else:
+                atual = int(linha[0])
+            numero = max(atual, minimo) + 1
+            conexao.execute(
+                "INSERT OR REPLACE INTO meta (chave, valor) VALUES ('ultimo_numero_pedido', ?)", (str(numero),)
+            )
+            return numero
+
+    def inserir_pedido(self, pedido: Dict, itens: List[Dict]):
+        with self._conexao() as conexao:
+            conexao.execute("BEGIN IMMEDIATE")
+            self.diario.garantir_base(conexao)
+            self._inserir_linhas(conexao, [pedido], itens)
+            self.resumo.incluir(conexao, [_texto(pedido.get("Numero_Pedido"))])
+            self.diario.registrar_criacoes(conexao, [pedido], itens)
+            # A partir daqui o armazenamento local é o registro, mesmo sem carga do Sheets
+            self._registrar_carga(conexao)
+            self._registrar_alteracao(conexao)
+            snapshot_pendente = self.diario.snapshot_pendente(conexao)
+        if snapshot_pendente:
+            self._snapshot_periodico()
+
+    def atualizar_status(self, numeros_pedidos: List[str], novo_status: str,
+                         ultima_atualizacao: str, responsavel: str) -> Dict[str, bool]:
+        if not numeros_pedidos:
+            return {}
+        marcadores = ", ".join("?" for _ in numeros_pedidos)
+        with self._conexao() as conexao:
+            conexao.execute("BEGIN IMMEDIATE")
+            self.diario.garantir_base(conexao)
+            encontrados = {
+                numero: novo_status == 'Concluído' and bool(urgente)
+                for numero, urgente in conexao.execute(
+                    f"SELECT Numero_Pedido, lower(trim(Urgente)) LIKE '%sim%' FROM pedidos "
+                    f"WHERE Numero_Pedido IN ({marcadores})",
+                    list(numeros_pedidos)
+                )
+            }
+            self.resumo.retirar(conexao, list(encontrados))
+            conexao.execute(
+                "UPDATE pedidos SET Status = ?, Ultima_Atualizacao = ?, Responsavel_Atualizacao = ? "
+                f"WHERE Numero_Pedido IN ({marcadores})",
+                [novo_status, ultima_atualizacao, responsavel] + list(numeros_pedidos)
+            )
+            urgentes = [numero for numero, urgente in encontrados.items() if urgente]
+            if urgentes:
+                conexao.execute(
+                    "UPDATE pedidos SET Urgente = 'Concluido Urgente' "
+                    f"WHERE Numero_Pedido IN ({', '.join('?' for _ in urgentes)})",
+                    urgentes
+                )
+            self.resumo.incluir(conexao, list(encontrados))
+            snapshot_pendente = False
+            if encontrados:
+                ultimo_evento = conexao.execute("SELECT COALESCE(MAX(id), 0) FROM eventos").fetchone()[0]
+                self.diario.registrar_status(conexao, encontrados, novo_status, ultima_atualizacao, responsavel)
+                if novo_status == 'Concluído':
+                    self.tempos.registrar_conclusoes(conexao, ultimo_evento)
+                self._registrar_alteracao(conexao)
+                snapshot_pendente = self.diario.snapshot_pendente(conexao)
+        if snapshot_pendente:
+            self._snapshot_periodico()
+        return encontrados
+
+    def substituir_pedidos(self, df_pedidos: pd.DataFrame, df_itens: pd.DataFrame) -> List[str]:
+        pedidos = df_pedidos[df_pedidos.get("Numero_Pedido", pd.Series(dtype=str)).astype(str) != ""]
+        pedidos, repetidos = self._separar_repetidos(pedidos.to_dict('records'))
+        with self._conexao() as conexao:
+            conexao.execute("BEGIN IMMEDIATE")
+            conexao.execute("DELETE FROM pedidos")
+            conexao.execute("DELETE FROM itens")
+            self._inserir_linhas(conexao, pedidos, df_itens.to_dict('records'))
+            self.resumo.reconstruir(conexao)
+            self.diario.registrar_restauracao(conexao, "carga completa do Google Sheets")
+            conexao.execute(
+                "INSERT OR REPLACE INTO meta (chave, valor) VALUES ('pedidos_repetidos', ?)", (json.dumps(repetidos),)
+            )
+            self._registrar_carga(conexao)
+            self._registrar_alteracao(conexao)
+        return repetidos
+
+    def pedidos_repetidos(self) -> List[str]:
+        with self._conexao() as conexao:
+            linha = conexao.execute("SELECT valor FROM meta WHERE chave = 'pedidos_repetidos'").fetchone()
+        return json.loads(linha[0]) if linha else []
+
+    def mesclar_pedidos(self, df_pedidos: pd.DataFrame, df_itens: pd.DataFrame) -> int:
+        with self._conexao() as conexao:
+            conexao.execute("BEGIN IMMEDIATE")
+            existentes = {linha[0] for linha in conexao.execute("SELECT Numero_Pedido FROM pedidos")}
+            com_itens = {linha[0] for linha in conexao.execute("SELECT DISTINCT Numero_Pedido FROM itens")}
+            pedidos, _ = self._separar_repetidos([
+                pedido for pedido in df_pedidos.to_dict('records')
+                if _texto(pedido.get("Numero_Pedido")) and _texto(pedido.get("Numero_Pedido")) not in existentes
+            ])
+            itens = [
+                item for item in df_itens.to_dict('records')
+                if _texto(item.get("Numero_Pedido")) not in com_itens
+            ]
+            if pedidos or itens:
+                self.diario.garantir_base(conexao)
+                self._inserir_linhas(conexao, pedidos, itens)
+                self.resumo.incluir(conexao, [_texto(pedido.get("Numero_Pedido")) for pedido in pedidos])
+                self.diario.registrar_criacoes(conexao, pedidos, itens)
+                novos = {_texto(pedido.get("Numero_Pedido")) for pedido in pedidos}
+                if any(_texto(item.get("Numero_Pedido")) not in novos for item in itens):
+                    # Itens de pedidos já existentes não cabem nos eventos de criação
+                    self.diario.registrar_snapshot(conexao)
+                self._registrar_alteracao(conexao)
+            snapshot_pendente = self.diario.snapshot_pendente(conexao)
+        if snapshot_pendente:
+            self._snapshot_periodico()
+        return len(pedidos)
+
+    @staticmethod
+    def _contagens(conexao) -> Dict[str, int]:
+        versao = conexao.execute("SELECT valor FROM meta WHERE chave = 'versao_dados'").fetchone()
+        return {
+            "pedidos": conexao.execute("SELECT COUNT(*) FROM pedidos").fetchone()[0],
+            "itens": conexao.execute("SELECT COUNT(*) FROM itens").fetchone()[0],
+            "versao_dados": int(versao[0]) if versao else 0
+        }
+
+    def copiar_para(self, destino: str) -> Dict[str, int]:
+        # API de backup do SQLite: inclui o que ainda está no WAL, sem bloquear as gravações
+        with self._conexao() as conexao:
+            copia = sqlite3.connect(destino)
+            try:
+                conexao.backup(copia)
+                return self._contagens(copia)
+            finally:
+                copia.close()
+
+    def _ultimo_numero_reservado(self) -> int:
+        with self._conexao() as conexao:
+            linha = conexao.execute("SELECT valor FROM meta WHERE chave = 'ultimo_numero_pedido'").fetchone()
+        return int(linha[0]) if linha else 0
+
+    def restaurar_de(self, origem: str):
+        versao_atual = self.versao_dados()
+        ultimo_numero = self._ultimo_numero_reservado()
+        copia = sqlite3.connect(origem)
+        try:
+            with self._conexao() as conexao:
+                copia.backup(conexao)
+        finally:
+            copia.close()
+        with self._conexao() as conexao:
+            conexao.execute("PRAGMA journal_mode = WAL")
+            self.diario.migrar(conexao)
+            self._garantir_resumo(conexao)
+            self.diario.registrar_restauracao(conexao, f"backup {os.path.basename(origem)}")
+            # A versão fica acima de qualquer uma já vista para que todos os caches recarreguem
+            versao = max(versao_atual, self._contagens(conexao)["versao_dados"]) + 1
+            conexao.execute(
+                "INSERT OR REPLACE INTO meta (chave, valor) VALUES ('versao_dados', ?)", (str(versao),)
+            )
+            # Números emitidos depois do backup já podem estar no Google Sheets: nunca voltam a ser usados
+            if ultimo_numero:
+                conexao.execute(
+                    "INSERT INTO meta (chave, valor) VALUES ('ultimo_numero_pedido', ?) "
+                    "ON CONFLICT(chave) DO UPDATE SET valor = max(CAST(valor AS INTEGER), CAST(excluded.valor AS INTEGER))",
+                    (str(ultimo_numero),)
+                )
+
+    def eventos(self, numero_pedido: Optional[str] = None) -> pd.DataFrame:
+        with self._conexao() as conexao:
+            return self.diario.eventos(conexao, numero_pedido)
+
+    def estado_em(self, momento: datetime) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        with self._conexao() as conexao:
+            return self.diario.estado_em(conexao, momento)
+
+    def restaurar_momento(self, momento: datetime):
+        with self._conexao() as conexao:
+            conexao.execute("BEGIN IMMEDIATE")
+            df_pedidos, df_itens = self.diario.estado_em(conexao, momento)
+            pedidos, _ = self._separar_repetidos(df_pedidos.to_dict('records'))
+            conexao.execute("DELETE FROM pedidos")
+            conexao.execute("DELETE FROM itens")
+            self._inserir_linhas(conexao, pedidos, df_itens.to_dict('records'))
+            self.resumo.reconstruir(conexao)
+            self.diario.registrar_restauracao(conexao, f"estado de {momento.strftime('%d/%m/%Y %H:%M')}")
+            self._registrar_alteracao(conexao)
+
+    def resumo_status(self, dia_inicio: Optional[str] = None, dia_fim: Optional[str] = None) -> pd.DataFrame:
+        with self._conexao() as conexao:
+            return self.resumo.ler(conexao, dia_inicio, dia_fim)
+
+    def reconstruir_resumo(self):
+        with self._conexao() as conexao:
+            conexao.execute("BEGIN IMMEDIATE")
+            self.resumo.reconstruir(conexao)
+            self.tempos.reconstruir(conexao)
+            self._registrar_alteracao(conexao)
+
+    def tempos_de_atendimento(self) -> Dict[str, float]:
+        with self._conexao() as conexao:
+            return self.tempos.ler(conexao)
+
+    def verificar_resumo(self) -> pd.DataFrame:
+        with self._conexao() as conexao:
+            return self.resumo.verificar(conexao)
+
+    def ler_projeto(self) -> List[List[str]]:
+        colunas = ", ".join(f'"{col}"' for col in COLUNAS_PROJETO)
+        with self._conexao() as conexao:
+            linhas = conexao.execute(f"SELECT {colunas} FROM projeto ORDER BY id").fetchall()
+        return [COLUNAS_PROJETO] + [list(linha) for linha in linhas] if linhas else []
+
+    def salvar_projeto(self, valores: List[List[str]], versao: Optional[str] = None):
+        if not valores:
+            return
+        cabecalho = valores[0]
+        posicoes = [cabecalho.index(col) if col in cabecalho else None for col in COLUNAS_PROJETO]
+        linhas = [
+            [_texto(linha[p]) if p is not None and p < len(linha) else "" for p in posicoes]
+            for linha in valores[1:]
+        ]
+        colunas = ", ".join(f'"{col}"' for col in COLUNAS_PROJETO)
+        marcadores = ", ".join("?" for _ in COLUNAS_PROJETO)
+        with self._conexao() as conexao:
+            conexao.execute("BEGIN IMMEDIATE")
+            conexao.execute("DELETE FROM projeto")
+            conexao.executemany(f"INSERT INTO projeto ({colunas}) VALUES ({marcadores})", linhas)
+            conexao.execute(
+                "INSERT OR REPLACE INTO meta (chave, valor) VALUES ('versao_projeto', ?)", (versao or "",)
+            )
+
+    def versao_projeto(self) -> Optional[str]:
+        with self._conexao() as conexao:
+            linha = conexao.execute("SELECT valor FROM meta WHERE chave = 'versao_projeto'").fetchone()
+        return linha[0] if linha and linha[0] else None
+
+
+# Implementações disponíveis, escolhidas pela variável ARMAZENAMENTO_PEDIDOS
+IMPLEMENTACOES = {
+    'sqlite': ArmazenamentoSQLite,
+}
+
+_armazenamento: Optional[ArmazenamentoPedidos] = None
+_lock_armazenamento = threading.Lock()
+
+
+def obter_armazenamento() -> ArmazenamentoPedidos:
+    """Retorna o armazenamento local do processo (criado na primeira chamada)"""
+    global _armazenamento
+    with _lock_armazenamento:
+        if _armazenamento is None:
+            tipo = os.getenv('ARMAZENAMENTO_PEDIDOS', 'sqlite')
+            arquivo = os.getenv('ARQUIVO_BANCO_LOCAL', os.path.join('pedidos', 'pedidos.db'))
+            _armazenamento = IMPLEMENTACOES[tipo](arquivo)
+        return _armazenamento
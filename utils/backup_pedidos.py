@@ -0,0 +1,161 @@
+import os
+import json
+import hashlib
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from utils.armazenamento import ArmazenamentoPedidos, obter_armazenamento
+
+
+def _sha256(arquivo: str) -> str:
+    resumo = hashlib.sha256()
+    with open(arquivo, 'rb') as f:
+        for bloco in iter(lambda: f.read(1024 * 1024), b''):
+            resumo.update(bloco)
+    return resumo.hexdigest()
+
+
+class GerenciadorBackups:
+    """
+    Backups do armazenamento local com manifesto e retenção por tempo.
+
+    Cada backup é uma cópia do banco feita pela API de backup do SQLite e registrada
+    no manifesto (data, quantidade de pedidos e itens, tamanho e SHA-256). Um backup
+    só é feito se os dados mudaram e se o anterior tem mais de `intervalo_minimo`,
+    então salvar um pedido não paga mais uma cópia completa a cada gravação.
+
+    Retenção: tudo das últimas `manter_todos_horas` horas, depois um backup por dia
+    até `retencao_dias`; o mais recente nunca é apagado.
+    """
+
+    ARQUIVO_MANIFESTO = "manifesto.json"
+
+    def __init__(self, armazenamento: ArmazenamentoPedidos, diretorio: str,
+                 intervalo_minimo: timedelta = timedelta(minutes=10),
+                 manter_todos_horas: int = 24, retencao_dias: int = 30):
+        self.armazenamento = armazenamento
+        self.diretorio = diretorio
+        self.intervalo_minimo = intervalo_minimo
+        self.manter_todos_horas = manter_todos_horas
+        self.retencao_dias = retencao_dias
+        self.arquivo_manifesto = os.path.join(diretorio, self.ARQUIVO_MANIFESTO)
+        self._lock = threading.Lock()
+        os.makedirs(diretorio, exist_ok=True)
+
+    def _ler_manifesto(self) -> List[Dict]:
+        if not os.path.exists(self.arquivo_manifesto):
+            return []
+        with open(self.arquivo_manifesto, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _gravar_manifesto(self, entradas: List[Dict]):
+        temporario = f"{self.arquivo_manifesto}.tmp"
+        with open(temporario, 'w', encoding='utf-8') as f:
+            json.dump(entradas, f, indent=2, ensure_ascii=False)
+        os.replace(temporario, self.arquivo_manifesto)
+
+    def listar(self) -> List[Dict]:
+        """Backups registrados no manifesto, do mais recente para o mais antigo"""
+        with self._lock:
+            return list(reversed(self._ler_manifesto()))
+
+    def fazer_backup(self, forcar: bool = False, motivo: str = "automático",
+                     preservar: Optional[str] = None) -> Optional[Dict]:
+        """
+        Faz um backup se os dados mudaram e o intervalo mínimo passou (ou se forcar=True).
+
+        preservar é um arquivo do manifesto que a retenção não pode apagar nesta passada
+        (o backup prestes a ser restaurado). Retorna a entrada do manifesto ou None se o
+        backup não foi necessário.
+        """
+        with self._lock:
+            entradas = self._ler_manifesto()
+            agora = datetime.now()
+            if entradas and not forcar:
+                ultimo = entradas[-1]
+                if ultimo.get("versao_dados") == self.armazenamento.versao_dados():
+                    return None
+                if agora - datetime.fromisoformat(ultimo["criado_em"]) < self.intervalo_minimo:
+                    return None
+
+            nome = f"pedidos_backup_{agora.strftime('%Y%m%d_%H%M%S_%f')}.db"
+            caminho = os.path.join(self.diretorio, nome)
+            contagens = self.armazenamento.copiar_para(caminho)
+            entrada = {
+                "arquivo": nome,
+                "criado_em": agora.isoformat(timespec='seconds'),
+                "motivo": motivo,
+                "pedidos": contagens["pedidos"],
+                "itens": contagens["itens"],
+                "versao_dados": contagens["versao_dados"],
+                "tamanho": os.path.getsize(caminho),
+                "sha256": _sha256(caminho)
+            }
+            entradas.append(entrada)
+            self._gravar_manifesto(self._aplicar_retencao(entradas, agora, preservar))
+            return entrada
+
+    def _aplicar_retencao(self, entradas: List[Dict], agora: datetime,
+                          preservar: Optional[str] = None) -> List[Dict]:
+        """Remove os arquivos fora da política de retenção e retorna as entradas mantidas"""
+        mantidas, dias_com_backup = [], set()
+        # Do mais recente para o mais antigo: no período diário fica o último backup de cada dia
+        for posicao, entrada in enumerate(reversed(entradas)):
+            criado_em = datetime.fromisoformat(entrada["criado_em"])
+            idade = agora - criado_em
+            manter = (
+                posicao == 0
+                or entrada["arquivo"] == preservar
+                or idade <= timedelta(hours=self.manter_todos_horas)
+                or (idade <= timedelta(days=self.retencao_dias) and criado_em.date() not in dias_com_backup)
+            )
+            if manter:
+                dias_com_backup.add(criado_em.date())
+                mantidas.append(entrada)
+            else:
+                caminho = os.path.join(self.diretorio, entrada["arquivo"])
+                if os.path.exists(caminho):
+                    os.remove(caminho)
+        return list(reversed(mantidas))
+
+    def restaurar(self, arquivo: str) -> Dict:
+        """
+        Restaura um backup do manifesto depois de conferir o SHA-256.
+
+        O estado atual é salvo antes em um novo backup, para que a restauração possa ser desfeita.
+        """
+        entrada = next((e for e in self._ler_manifesto() if e["arquivo"] == arquivo), None)
+        if entrada is None:
+            raise ValueError(f"Backup {arquivo} não está no manifesto.")
+        caminho = os.path.join(self.diretorio, arquivo)
+        if not os.path.exists(caminho):
+            raise ValueError(f"Arquivo do backup {arquivo} não encontrado.")
+        if _sha256(caminho) != entrada["sha256"]:
+            raise ValueError(f"Backup {arquivo} corrompido: o checksum não confere com o manifesto.")
+        self.fazer_backup(forcar=True, motivo=f"antes de restaurar {arquivo}", preservar=arquivo)
+        self.armazenamento.restaurar_de(caminho)
+        return entrada
+
+    def restaurar_momento(self, momento: datetime):
+        """Volta os pedidos ao estado de um momento pelo diário de eventos, salvando antes o estado atual"""
+        self.fazer_backup(forcar=True, motivo=f"antes de restaurar {momento.strftime('%d/%m/%Y %H:%M')}")
+        self.armazenamento.restaurar_momento(momento)
+
+
+_gerenciador: Optional[GerenciadorBackups] = None
+_lock_gerenciador = threading.Lock()
+
+
+def obter_backups() -> GerenciadorBackups:
+    """Retorna o gerenciador de backups do processo (criado na primeira chamada)"""
+    global _gerenciador
+    with _lock_gerenciador:
+        if _gerenciador is None:
+            _gerenciador = GerenciadorBackups(
+                obter_armazenamento(),
+                os.getenv('DIRETORIO_BACKUP', os.path.join('pedidos', 'backup')),
+                intervalo_minimo=timedelta(minutes=float(os.getenv('BACKUP_INTERVALO_MINUTOS', '10'))),
+                manter_todos_horas=int(os.getenv('BACKUP_MANTER_TODOS_HORAS', '24')),
+                retencao_dias=int(os.getenv('BACKUP_RETENCAO_DIAS', '30'))
+            )
+        return _gerenciador
@@ -0,0 +1,217 @@
+import bisect
+import heapq
+import re
+import threading
+import unicodedata
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+import pandas as pd
+
+# Campos pesquisados e o peso de cada um na relevância
+CAMPOS_BUSCA = {
+    "Numero_Pedido": 5,
+    "Cliente": 3,
+    "RACK": 3,
+    "Solicitante": 2,
+    "Localizacao": 2,
+    "Observacoes": 1,
+}
+
+# Qualidade da correspondência de um termo com uma palavra
+PALAVRA_EXATA, PREFIXO, TRECHO = 3, 2, 1
+
+_PALAVRA = re.compile(r"\w+")
+
+
+def normalizar(texto) -> str:
+    """Minúsculas e sem acentos, para a busca não depender de caixa nem de acentuação"""
+    texto = "" if texto is None else str(texto)
+    if texto.isascii():
+        return texto.lower()
+    texto = unicodedata.normalize("NFKD", texto)
+    return "".join(c for c in texto if not unicodedata.combining(c)).lower()
+
+
+def palavras(texto) -> List[str]:
+    return _PALAVRA.findall(normalizar(texto))
+
+
+def _trigramas(palavra: str) -> Set[str]:
+    return {palavra[i:i + 3] for i in range(len(palavra) - 2)}
+
+
+class IndiceBusca:
+    """
+    Índice invertido em memória para a busca de pedidos por texto.
+
+    Cada campo tem um índice palavra → pedidos (listas em ordem crescente), e o
+    vocabulário tem um índice de trigramas. Um termo da busca acha pelos trigramas as
+    palavras que o contêm e, por elas, os pedidos; termos de uma ou duas letras valem
+    como início de palavra, pelo vocabulário ordenado. Os termos são cruzados do mais
+    raro para o mais comum, e um termo comum só é conferido (busca binária) nos pedidos
+    que restaram. Pedidos novos entram no índice sem reconstruí-lo.
+
+    O índice vale para uma versão dos dados; `reconstruir` o refaz quando a versão
+    mudou por outro caminho (cargas, restaurações, outro processo).
+    """
+
+    def __init__(self):
+        self.versao = None
+        self._lock = threading.RLock()
+        self._limpar()
+
+    def _limpar(self):
+        self._numeros: List[str] = []
+        self._documentos: Dict[str, int] = {}
+        self._vocabulario: Dict[str, int] = {}
+        self._palavras: List[str] = []
+        self._ordenadas: List[str] = []
+        self._trigramas: Dict[str, List[int]] = {}
+        self._postagens: Dict[str, Dict[int, List[int]]] = {campo: {} for campo in CAMPOS_BUSCA}
+
+    def __len__(self) -> int:
+        return len(self._numeros)
+
+    def _id_palavra(self, palavra: str, manter_ordem: bool) -> int:
+        id_palavra = self._vocabulario.get(palavra)
+        if id_palavra is None:
+            id_palavra = len(self._palavras)
+            self._vocabulario[palavra] = id_palavra
+            self._palavras.append(palavra)
+            if manter_ordem:
+                bisect.insort(self._ordenadas, palavra)
+            for trigrama in _trigramas(palavra):
+                self._trigramas.setdefault(trigrama, []).append(id_palavra)
+        return id_palavra
+
+    def _indexar(self, registro: Dict, manter_ordem: bool = True) -> bool:
+        numero = str(registro.get("Numero_Pedido", ""))
+        if not numero or numero in self._documentos:
+            return False
+        documento = len(self._numeros)
+        self._numeros.append(numero)
+        self._documentos[numero] = documento
+        for campo, postagens in self._postagens.items():
+            for palavra in set(palavras(registro.get(campo))):
+                postagens.setdefault(self._id_palavra(palavra, manter_ordem), []).append(documento)
+        return True
+
+    def reconstruir(self, df_pedidos: pd.DataFrame, versao):
+        """Refaz o índice com todos os pedidos da versão (nada é feito se já estiver nela)"""
+        with self._lock:
+            if self.versao == versao:
+                return
+            self._limpar()
+            colunas = [col for col in ["Numero_Pedido"] + list(CAMPOS_BUSCA) if col in df_pedidos.columns]
+            for registro in df_pedidos[list(dict.fromkeys(colunas))].to_dict("records"):
+                self._indexar(registro, manter_ordem=False)
+            # Na carga completa o vocabulário é ordenado uma vez só, no fim
+            self._ordenadas = sorted(self._palavras)
+            self.versao = versao
+
+    def acompanhar(self, versao_anterior, versao_nova, novos_pedidos: Iterable[Dict] = ()):
+        """
+        Leva o índice à versão nova depois de uma gravação feita por este processo.
+
+        Só vale se o índice estava na versão anterior e a gravação foi a única mudança
+        (versão + 1); caso contrário ele fica desatualizado e é reconstruído na próxima busca.
+        Pedidos repetidos (regravados) também forçam a reconstrução.
+        """
+        with self._lock:
+            if versao_nova == versao_anterior and not novos_pedidos:
+                return
+            if self.versao is None or self.versao != versao_anterior or versao_nova != versao_anterior + 1:
+                self.versao = None
+                return
+            for registro in novos_pedidos:
+                if not self._indexar(registro):
+                    self.versao = None
+                    return
+            self.versao = versao_nova
+
+    def _palavras_com(self, termo: str) -> List[Tuple[int, int]]:
+        """Palavras do vocabulário que contêm o termo, com a qualidade da correspondência"""
+        if len(termo) >= 3:
+            candidatas: Optional[Set[int]] = None
+            # Começa pelo trigrama mais raro para a interseção ficar pequena
+            for trigrama in sorted(_trigramas(termo), key=lambda t: len(self._trigramas.get(t, ()))):
+                ids = self._trigramas.get(trigrama)
+                if not ids:
+                    return []
+                candidatas = set(ids) if candidatas is None else candidatas.intersection(ids)
+                if not candidatas:
+                    return []
+        else:
+            # Termos curtos não têm trigrama: só início de palavra, pelo vocabulário ordenado
+            inicio = bisect.bisect_left(self._ordenadas, termo)
+            fim = bisect.bisect_left(self._ordenadas, termo + "\uffff", inicio)
+            candidatas = [self._vocabulario[palavra] for palavra in self._ordenadas[inicio:fim]]
+        resultado = []
+        for id_palavra in candidatas:
+            palavra = self._palavras[id_palavra]
+            if palavra == termo:
+                resultado.append((id_palavra, PALAVRA_EXATA))
+            elif palavra.startswith(termo):
+                resultado.append((id_palavra, PREFIXO))
+            elif termo in palavra:
+                resultado.append((id_palavra, TRECHO))
+        return resultado
+
+    def buscar(self, consulta: str, limite: int = 100,
+               permitidos: Optional[Set[str]] = None) -> Tuple[List[Tuple[str, int]], int]:
+        """
+        Pedidos que contêm todos os termos da consulta, do mais relevante para o menos.
+
+        A relevância soma, para cada termo, a melhor correspondência (palavra exata,
+        início de palavra ou trecho) vezes o peso do campo; empates ficam com os mais recentes.
+        permitidos restringe a busca a esses números (ex.: um status) antes do corte em limite.
+        Retorna ([(Numero_Pedido, pontos)], total de pedidos encontrados antes do corte).
+        """
+        termos = list(dict.fromkeys(palavras(consulta)))
+        if not termos:
+            return [], 0
+        with self._lock:
+            # Para cada termo: (listas de pedidos, valor) de cada palavra e campo que casam
+            listas_por_termo = []
+            for termo in termos:
+                listas = []
+                for id_palavra, qualidade in self._palavras_com(termo):
+                    for campo, peso in CAMPOS_BUSCA.items():
+                        documentos = self._postagens[campo].get(id_palavra)
+                        if documentos:
+                            listas.append((documentos, peso * qualidade))
+                if not listas:
+                    return [], 0
+                listas_por_termo.append(listas)
+            listas_por_termo.sort(key=lambda listas: sum(len(documentos) for documentos, _ in listas))
+
+            pontos: Dict[int, int] = {}
+            for documentos, valor in listas_por_termo[0]:
+                for documento in documentos:
+                    if valor > pontos.get(documento, 0):
+                        pontos[documento] = valor
+            if permitidos is not None:
+                pontos = {documento: valor for documento, valor in pontos.items() if self._numeros[documento] in permitidos}
+            for listas in listas_por_termo[1:]:
+                pontos_termo: Dict[int, int] = {}
+                if len(pontos) * len(listas) < sum(len(documentos) for documentos, _ in listas):
+                    # Poucos pedidos restantes: confere cada um por busca binária nas listas
+                    for documento in pontos:
+                        for documentos, valor in listas:
+                            posicao = bisect.bisect_left(documentos, documento)
+                            if posicao < len(documentos) and documentos[posicao] == documento:
+                                if valor > pontos_termo.get(documento, 0):
+                                    pontos_termo[documento] = valor
+                else:
+                    for documentos, valor in listas:
+                        for documento in documentos:
+                            if documento in pontos and valor > pontos_termo.get(documento, 0):
+                                pontos_termo[documento] = valor
+                pontos = {documento: pontos[documento] + valor for documento, valor in pontos_termo.items()}
+                if not pontos:
+                    return [], 0
+            melhores = heapq.nlargest(limite, pontos.items(), key=lambda item: (item[1], item[0]))
+            return [(self._numeros[documento], valor) for documento, valor in melhores], len(pontos)
+
+
+# Índice único do processo, compartilhado por todas as sessões
+indice_busca = IndiceBusca()
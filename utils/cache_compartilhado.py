@@ -0,0 +1,115 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class CacheCompartilhado:
+    """
+    Cache em memória compartilhado por todas as sessões do processo do Streamlit.
+
+    O valor é recarregado quando o TTL expira ou após invalidar(). Enquanto uma
+    sessão recarrega, as demais aguardam o lock e reaproveitam o resultado, de
+    modo que N usuários custam uma única leitura por janela de TTL.
+    """
+
+    def __init__(self, ttl_segundos: float):
+        self.ttl_segundos = ttl_segundos
+        self.versao = 0
+        self._valor: Any = None
+        self._carregado_em: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def _expirado(self) -> bool:
+        if self._carregado_em is None:
+            return True
+        return time.monotonic() - self._carregado_em > self.ttl_segundos
+
+    def obter(self, carregar: Callable[[], Any]) -> Any:
+        """Retorna o valor em cache, chamando carregar() se estiver vencido"""
+        if not self._expirado():
+            return self._valor
+        with self._lock:
+            # Outra sessão pode ter recarregado enquanto esperávamos o lock
+            if self._expirado():
+                self._valor = carregar()
+                self._carregado_em = time.monotonic()
+                self.versao += 1
+            return self._valor
+
+    def invalidar(self):
+        """Descarta o valor atual; a próxima leitura recarrega da origem"""
+        with self._lock:
+            self._carregado_em = None
+
+
+class CacheVersionado:
+    """
+    Cache em memória compartilhado por todas as sessões, válido enquanto a versão não muda.
+
+    Cada chave guarda um único valor junto da versão dos dados de onde ele saiu. Quem
+    escreve incrementa a versão na origem; a próxima leitura de qualquer sessão vê a
+    versão nova e recarrega uma vez, reaproveitada pelas demais.
+
+    Com `max_chaves`, as chaves usadas há mais tempo são descartadas além desse limite
+    (para caches com muitas chaves, como páginas de consulta por filtro).
+    """
+
+    def __init__(self, max_chaves: Optional[int] = None):
+        self.max_chaves = max_chaves
+        self._valores: "OrderedDict[Hashable, Tuple[Any, Any]]" = OrderedDict()
+        self._locks: Dict[Hashable, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def _lock_da_chave(self, chave: Hashable) -> threading.Lock:
+        # Um lock por chave: um valor pode ser montado a partir de outro (ex.: índice sobre os pedidos)
+        with self._lock:
+            return self._locks.setdefault(chave, threading.Lock())
+
+    def obter(self, chave: Hashable, versao: Any, carregar: Callable[[], Any]) -> Any:
+        """Retorna o valor da chave para a versão, chamando carregar() se a versão mudou"""
+        atual = self._valores.get(chave)
+        if atual is not None and atual[0] == versao:
+            if self.max_chaves:
+                self._marcar_uso(chave)
+            return atual[1]
+        with self._lock_da_chave(chave):
+            atual = self._valores.get(chave)
+            if atual is None or atual[0] != versao:
+                atual = (versao, carregar())
+                self._valores[chave] = atual
+                if self.max_chaves:
+                    self._marcar_uso(chave)
+            return atual[1]
+
+    def _marcar_uso(self, chave: Hashable):
+        """Move a chave para o fim da fila de uso e descarta as mais antigas além do limite"""
+        with self._lock:
+            if chave in self._valores:
+                self._valores.move_to_end(chave)
+            while len(self._valores) > self.max_chaves:
+                antiga, _ = self._valores.popitem(last=False)
+                self._locks.pop(antiga, None)
+
+    def invalidar(self, chave: Hashable = None):
+        """Descarta o valor da chave (ou todos); a próxima leitura recarrega da origem"""
+        with self._lock:
+            if chave is None:
+                self._valores.clear()
+            else:
+                self._valores.pop(chave, None)
+
+
+# Catálogo de localizações (aba "Projeto"), compartilhado por todas as sessões
+cache_catalogo = CacheCompartilhado(
+    ttl_segundos=float(os.getenv('CATALOGO_TTL_SEGUNDOS', '300'))
+)
+
+# Pedidos e itens do armazenamento local, pela versão dos dados gravada no banco
+cache_dados = CacheVersionado()
+
+# Consultas e páginas do histórico, por filtro/ordenação e pela versão dos dados
+cache_historico = CacheVersionado(
+    max_chaves=int(os.getenv('HISTORICO_PAGINAS_EM_CACHE', '256'))
+)
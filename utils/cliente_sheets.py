@@ -0,0 +1,64 @@
+import hashlib
+import json
+import threading
+from typing import Callable, Dict, Tuple
+import gspread
+from oauth2client.service_account import ServiceAccountCredentials
+
+ESCOPOS = [
+    'https://spreadsheets.google.com/feeds',
+    'https://www.googleapis.com/auth/drive'
+]
+
+
+class RegistroClientesSheets:
+    """
+    Clientes gspread autorizados e planilhas abertas, compartilhados por todo o processo.
+
+    A autorização acontece uma vez por conjunto de credenciais e a planilha é aberta uma
+    vez por URL. O token de acesso é renovado pela sessão autorizada do google-auth
+    apenas quando expira, então os reruns do Streamlit não refazem o OAuth.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._clientes: Dict[str, gspread.Client] = {}
+        self._planilhas: Dict[Tuple[str, str], gspread.Spreadsheet] = {}
+
+    @staticmethod
+    def _chave(creds: dict) -> str:
+        return hashlib.sha256(json.dumps(creds, sort_keys=True).encode()).hexdigest()
+
+    def obter_cliente(self, creds: dict) -> gspread.Client:
+        """Retorna o cliente autorizado para as credenciais, autorizando só na primeira vez"""
+        chave = self._chave(creds)
+        with self._lock:
+            cliente = self._clientes.get(chave)
+            if cliente is None:
+                cliente = gspread.authorize(
+                    ServiceAccountCredentials.from_json_keyfile_dict(creds, scopes=ESCOPOS)
+                )
+                self._clientes[chave] = cliente
+            return cliente
+
+    def obter_planilha(self, cliente: gspread.Client, url: str,
+                       abrir: Callable[[str], gspread.Spreadsheet]) -> gspread.Spreadsheet:
+        """Retorna a planilha já aberta para o cliente/URL; abrir(url) só roda na primeira vez"""
+        chave = (str(id(cliente)), url)
+        with self._lock:
+            planilha = self._planilhas.get(chave)
+        if planilha is None:
+            planilha = abrir(url)
+            with self._lock:
+                planilha = self._planilhas.setdefault(chave, planilha)
+        return planilha
+
+    def invalidar_planilha(self, url: str):
+        """Descarta as planilhas abertas para a URL (ex.: após testar a conexão ou trocar a URL)"""
+        with self._lock:
+            for chave in [chave for chave in self._planilhas if chave[1] == url]:
+                del self._planilhas[chave]
+
+
+# Registro único do processo
+registro_sheets = RegistroClientesSheets()
@@ -0,0 +1,96 @@
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable
+
+# Códigos HTTP que indicam falha temporária da API do Google Sheets
+CODIGOS_RETENTAVEIS = {429, 500, 502, 503, 504}
+
+
+def erro_retentavel(erro: Exception) -> bool:
+    """Indica se vale repetir a chamada (cota excedida, erro 5xx ou falha de rede)"""
+    status = getattr(getattr(erro, 'response', None), 'status_code', None)
+    if status is not None:
+        return status in CODIGOS_RETENTAVEIS
+    return isinstance(erro, OSError) or "[429]" in str(erro)
+
+
+class LimitadorCota:
+    """
+    Token bucket para as chamadas ao Google Sheets, com prioridade e retentativas.
+
+    O balde guarda até `requisicoes_por_minuto` fichas e é reabastecido continuamente.
+    Chamadas em segundo plano (fila de replicação) só consomem fichas acima da reserva
+    das leituras interativas, que assim não ficam esperando atrás de escritas.
+    Erros 429/5xx são repetidos com espera exponencial com jitter.
+    """
+
+    INTERATIVA = "interativa"
+    SEGUNDO_PLANO = "segundo_plano"
+
+    def __init__(self, requisicoes_por_minuto: float, fracao_reservada: float = 0.2,
+                 max_tentativas: int = 5, espera_base: float = 1.0, espera_maxima: float = 32.0):
+        self.capacidade = float(requisicoes_por_minuto)
+        self.reserva_interativa = self.capacidade * fracao_reservada
+        self.max_tentativas = max_tentativas
+        self.espera_base = espera_base
+        self.espera_maxima = espera_maxima
+        self._fichas = self.capacidade
+        self._atualizado_em = time.monotonic()
+        self._lock = threading.Lock()
+        self._contexto = threading.local()
+
+    @contextmanager
+    def em_segundo_plano(self):
+        """Marca as chamadas feitas nesta thread como de baixa prioridade"""
+        anterior = getattr(self._contexto, 'prioridade', self.INTERATIVA)
+        self._contexto.prioridade = self.SEGUNDO_PLANO
+        try:
+            yield
+        finally:
+            self._contexto.prioridade = anterior
+
+    def _reabastecer(self):
+        agora = time.monotonic()
+        self._fichas = min(
+            self.capacidade,
+            self._fichas + (agora - self._atualizado_em) * self.capacidade / 60.0
+        )
+        self._atualizado_em = agora
+
+    def _adquirir(self):
+        """Bloqueia até haver ficha disponível para a prioridade da thread atual"""
+        prioridade = getattr(self._contexto, 'prioridade', self.INTERATIVA)
+        minimo = 1.0 if prioridade == self.INTERATIVA else 1.0 + self.reserva_interativa
+        while True:
+            with self._lock:
+                self._reabastecer()
+                if self._fichas >= minimo:
+                    self._fichas -= 1.0
+                    return
+                espera = (minimo - self._fichas) * 60.0 / self.capacidade
+            time.sleep(espera)
+
+    def executar(self, funcao: Callable[..., Any], *args, **kwargs) -> Any:
+        """Executa a chamada respeitando a cota e repetindo falhas temporárias"""
+        for tentativa in range(1, self.max_tentativas + 1):
+            self._adquirir()
+            try:
+                return funcao(*args, **kwargs)
+            except Exception as e:
+                if tentativa == self.max_tentativas or not erro_retentavel(e):
+                    raise
+                if getattr(getattr(e, 'response', None), 'status_code', None) == 429:
+                    # A cota do minuto acabou: esvazia o balde para todas as threads
+                    with self._lock:
+                        self._fichas = min(self._fichas, 0.0)
+                limite = min(self.espera_maxima, self.espera_base * 2 ** (tentativa - 1))
+                time.sleep(random.uniform(limite / 2, limite))
+
+
+# Limitador único do processo; a cota do Google é por projeto/usuário, não por sessão
+limitador_sheets = LimitadorCota(
+    requisicoes_por_minuto=float(os.getenv('SHEETS_REQUISICOES_POR_MINUTO', '50'))
+)
@@ -0,0 +1,230 @@
+import json
+import zlib
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+import pandas as pd
+
+# Tipos de evento do diário
+EVENTO_CRIACAO = "criacao"
+EVENTO_STATUS = "status"
+EVENTO_RESTAURACAO = "restauracao"
+
+ESQUEMA_DIARIO = """
+    CREATE TABLE IF NOT EXISTS eventos (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        momento TEXT NOT NULL,
+        tipo TEXT NOT NULL,
+        Numero_Pedido TEXT NOT NULL DEFAULT '',
+        Status TEXT NOT NULL DEFAULT '',
+        Responsavel TEXT NOT NULL DEFAULT '',
+        dados TEXT NOT NULL DEFAULT ''
+    );
+    CREATE INDEX IF NOT EXISTS idx_eventos_momento ON eventos (momento);
+    CREATE INDEX IF NOT EXISTS idx_eventos_numero ON eventos (Numero_Pedido);
+
+    CREATE TABLE IF NOT EXISTS snapshots (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        momento TEXT NOT NULL,
+        ultimo_evento INTEGER NOT NULL,
+        conteudo BLOB NOT NULL,
+        periodico INTEGER NOT NULL DEFAULT 0
+    );
+"""
+
+
+def _agora() -> str:
+    return datetime.now().isoformat(timespec='microseconds')
+
+
+def _json(valor) -> str:
+    return json.dumps(valor, ensure_ascii=False, separators=(',', ':'))
+
+
+class DiarioPedidos:
+    """
+    Diário de eventos dos pedidos (somente inclusão) com snapshots periódicos.
+
+    Cada criação e cada mudança de status vira uma linha em `eventos`, gravada na
+    mesma transação da alteração. A cada `eventos_por_snapshot` eventos o estado
+    completo é guardado comprimido em `snapshots`; o estado em qualquer momento é
+    o último snapshot anterior a ele mais os eventos seguintes até o momento.
+    Cargas e restaurações, que substituem o estado inteiro, sempre geram um snapshot.
+
+    O snapshot periódico não entra na transação da gravação: `snapshot_pendente` só
+    avisa que ele venceu e `registrar_snapshot_periodico` o grava depois, em transações
+    próprias. Snapshots periódicos são só atalhos (os eventos bastam para refazer o
+    estado), então ficam os `snapshots_recentes` mais novos e o último de cada dia;
+    os demais (base, cargas, restaurações) nunca são apagados.
+    """
+
+    def __init__(self, colunas_pedidos: List[str], colunas_itens: List[str], eventos_por_snapshot: int = 500,
+                 snapshots_recentes: int = 10):
+        self.colunas_pedidos = colunas_pedidos
+        self.colunas_itens = colunas_itens
+        self.eventos_por_snapshot = eventos_por_snapshot
+        self.snapshots_recentes = snapshots_recentes
+
+    @staticmethod
+    def migrar(conexao):
+        """Acrescenta a coluna `periodico` em bancos (ou backups) anteriores a ela"""
+        colunas = {linha[1] for linha in conexao.execute("PRAGMA table_info(snapshots)")}
+        if "periodico" not in colunas:
+            conexao.execute("ALTER TABLE snapshots ADD COLUMN periodico INTEGER NOT NULL DEFAULT 0")
+
+    def _ultimo_evento(self, conexao) -> int:
+        return conexao.execute("SELECT COALESCE(MAX(id), 0) FROM eventos").fetchone()[0]
+
+    def _estado_comprimido(self, conexao) -> bytes:
+        colunas_pedidos = ", ".join(f'"{col}"' for col in self.colunas_pedidos)
+        colunas_itens = ", ".join(f'"{col}"' for col in self.colunas_itens)
+        conteudo = {
+            "pedidos": [list(linha) for linha in conexao.execute(f"SELECT {colunas_pedidos} FROM pedidos ORDER BY id")],
+            "itens": [list(linha) for linha in conexao.execute(f"SELECT {colunas_itens} FROM itens ORDER BY id")]
+        }
+        return zlib.compress(_json(conteudo).encode('utf-8'))
+
+    def registrar_snapshot(self, conexao):
+        """Guarda o estado atual das tabelas pedidos/itens, associado ao último evento"""
+        conexao.execute(
+            "INSERT INTO snapshots (momento, ultimo_evento, conteudo) VALUES (?, ?, ?)",
+            (_agora(), self._ultimo_evento(conexao), self._estado_comprimido(conexao))
+        )
+
+    def garantir_base(self, conexao):
+        """Antes do primeiro evento, guarda o estado existente como snapshot inicial do diário"""
+        if conexao.execute("SELECT 1 FROM snapshots LIMIT 1").fetchone() is None:
+            self.registrar_snapshot(conexao)
+
+    def snapshot_pendente(self, conexao) -> bool:
+        """Se já passaram `eventos_por_snapshot` eventos desde o último snapshot (consulta barata)"""
+        ultimo_snapshot = conexao.execute("SELECT COALESCE(MAX(ultimo_evento), 0) FROM snapshots").fetchone()[0]
+        return self._ultimo_evento(conexao) - ultimo_snapshot >= self.eventos_por_snapshot
+
+    def registrar_snapshot_periodico(self, conexao):
+        """
+        Grava o snapshot periódico, se ainda pendente, e apaga os periódicos que saíram da retenção.
+
+        O estado é lido em uma transação de leitura (o WAL não bloqueia as gravações) e
+        comprimido fora de qualquer transação; só a inclusão e a limpeza pegam o lock de escrita.
+        """
+        conexao.execute("BEGIN")
+        if not self.snapshot_pendente(conexao):
+            conexao.commit()
+            return
+        momento, ultimo_evento, conteudo = _agora(), self._ultimo_evento(conexao), self._estado_comprimido(conexao)
+        conexao.commit()
+        conexao.execute("BEGIN IMMEDIATE")
+        # Outro processo pode ter gravado um snapshot mais novo enquanto este era montado
+        mais_novo = conexao.execute("SELECT COALESCE(MAX(ultimo_evento), 0) FROM snapshots").fetchone()[0]
+        if mais_novo < ultimo_evento:
+            conexao.execute(
+                "INSERT INTO snapshots (momento, ultimo_evento, conteudo, periodico) VALUES (?, ?, ?, 1)",
+                (momento, ultimo_evento, conteudo)
+            )
+        conexao.execute(
+            "DELETE FROM snapshots WHERE periodico = 1 "
+            "AND id NOT IN (SELECT id FROM snapshots WHERE periodico = 1 ORDER BY id DESC LIMIT ?) "
+            "AND id NOT IN (SELECT MAX(id) FROM snapshots WHERE periodico = 1 GROUP BY substr(momento, 1, 10))",
+            (self.snapshots_recentes,)
+        )
+        conexao.commit()
+
+    def registrar_criacoes(self, conexao, pedidos: List[Dict], itens: List[Dict]):
+        """Um evento de criação por pedido, com o registro e os itens do pedido"""
+        itens_por_pedido: Dict[str, List[Dict]] = {}
+        for item in itens:
+            itens_por_pedido.setdefault(str(item.get("Numero_Pedido", "")), []).append(item)
+        momento = _agora()
+        conexao.executemany(
+            "INSERT INTO eventos (momento, tipo, Numero_Pedido, Status, Responsavel, dados) VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    momento, EVENTO_CRIACAO, str(pedido["Numero_Pedido"]), str(pedido.get("Status", "")),
+                    str(pedido.get("Responsavel_Atualizacao", "")),
+                    _json({
+                        "pedido": [pedido.get(col, "") for col in self.colunas_pedidos],
+                        "itens": [
+                            [item.get(col, "") for col in self.colunas_itens]
+                            for item in itens_por_pedido.get(str(pedido["Numero_Pedido"]), [])
+                        ]
+                    })
+                )
+                for pedido in pedidos
+            ]
+        )
+
+    def registrar_status(self, conexao, mudancas: Dict[str, bool], novo_status: str,
+                         ultima_atualizacao: str, responsavel: str):
+        """Um evento por pedido alterado; mudancas é numero → se o urgente virou 'Concluido Urgente'"""
+        momento = _agora()
+        conexao.executemany(
+            "INSERT INTO eventos (momento, tipo, Numero_Pedido, Status, Responsavel, dados) VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    momento, EVENTO_STATUS, numero, novo_status, responsavel,
+                    _json({"ultima_atualizacao": ultima_atualizacao, "concluido_urgente": urgente})
+                )
+                for numero, urgente in mudancas.items()
+            ]
+        )
+
+    def registrar_restauracao(self, conexao, descricao: str):
+        """Marca no diário uma substituição completa do estado e guarda o novo estado"""
+        conexao.execute(
+            "INSERT INTO eventos (momento, tipo, dados) VALUES (?, ?, ?)",
+            (_agora(), EVENTO_RESTAURACAO, _json({"descricao": descricao}))
+        )
+        self.registrar_snapshot(conexao)
+
+    def estado_em(self, conexao, momento: datetime) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """Reconstrói pedidos e itens como estavam no momento (snapshot + eventos seguintes)"""
+        limite = momento.isoformat(timespec='microseconds')
+        snapshot = conexao.execute(
+            "SELECT ultimo_evento, conteudo FROM snapshots WHERE momento <= ? ORDER BY id DESC LIMIT 1",
+            (limite,)
+        ).fetchone()
+        if snapshot is None:
+            inicio = conexao.execute("SELECT MIN(momento) FROM snapshots").fetchone()[0]
+            raise ValueError(
+                f"O diário começa em {datetime.fromisoformat(inicio).strftime('%d/%m/%Y %H:%M')}."
+                if inicio else "O diário de pedidos ainda não tem registros."
+            )
+        ultimo_evento, conteudo = snapshot
+        conteudo = json.loads(zlib.decompress(conteudo).decode('utf-8'))
+        posicao = self.colunas_pedidos.index
+        pedidos = {linha[0]: list(linha) for linha in conteudo["pedidos"]}
+        itens = [list(linha) for linha in conteudo["itens"]]
+
+        for tipo, numero, status, responsavel, dados in conexao.execute(
+            "SELECT tipo, Numero_Pedido, Status, Responsavel, dados FROM eventos "
+            "WHERE id > ? AND momento <= ? ORDER BY id",
+            (ultimo_evento, limite)
+        ):
+            dados = json.loads(dados) if dados else {}
+            if tipo == EVENTO_CRIACAO:
+                pedidos[numero] = [str(valor) for valor in dados["pedido"]]
+                itens.extend([str(valor) for valor in item] for item in dados["itens"])
+            elif tipo == EVENTO_STATUS and numero in pedidos:
+                pedido = pedidos[numero]
+                pedido[posicao("Status")] = status
+                pedido[posicao("Ultima_Atualizacao")] = dados.get("ultima_atualizacao", "")
+                pedido[posicao("Responsavel_Atualizacao")] = responsavel
+                if dados.get("concluido_urgente"):
+                    pedido[posicao("Urgente")] = "Concluido Urgente"
+        return (
+            pd.DataFrame(list(pedidos.values()), columns=self.colunas_pedidos),
+            pd.DataFrame(itens, columns=self.colunas_itens)
+        )
+
+    def eventos(self, conexao, numero_pedido: Optional[str] = None) -> pd.DataFrame:
+        """Eventos de criação e de status (todos ou de um pedido), em ordem"""
+        sql = (
+            "SELECT id, momento, tipo, Numero_Pedido, Status, Responsavel FROM eventos "
+            f"WHERE tipo IN ('{EVENTO_CRIACAO}', '{EVENTO_STATUS}')"
+        )
+        parametros: tuple = ()
+        if numero_pedido:
+            sql += " AND Numero_Pedido = ?"
+            parametros = (numero_pedido,)
+        return pd.read_sql_query(sql + " ORDER BY id", conexao, params=parametros)
+
@@ -0,0 +1,239 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from utils.cota_sheets import limitador_sheets
+
+ESQUEMA_SAIDA = """
+    CREATE TABLE IF NOT EXISTS saida (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        tipo TEXT NOT NULL,
+        dados TEXT NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS descartadas (
+        id INTEGER PRIMARY KEY,
+        tipo TEXT NOT NULL,
+        dados TEXT NOT NULL,
+        motivo TEXT NOT NULL,
+        momento TEXT NOT NULL
+    );
+"""
+
+
+class FilaReplicacao:
+    """
+    Fila de replicação para o Google Sheets processada por uma thread em segundo plano.
+
+    A interface só grava as mutações (novos pedidos e mudanças de status) em uma tabela
+    de saída no SQLite e segue adiante. A thread junta tudo o que estiver pendente em no
+    máximo três chamadas (um append na aba Pedidos, um na aba Itens e um batch de status)
+    e cada etapa só sai da tabela depois que o Google Sheets a aceitou: um pedido cujo
+    append em Pedidos passou fica na tabela só com os itens, para que a retentativa não
+    o anexe de novo. Uma falha transitória não descarta nada: o lote continua na tabela
+    (e na profundidade) e é tentado de novo com espera crescente, inclusive depois de um
+    reinício do servidor.
+
+    Mudanças de status de pedidos que não existem na aba são permanentes (repetir não os
+    faz aparecer) e vão para a tabela de descartadas, exibida no painel de replicação,
+    em vez de bloquear a fila.
+
+    A tabela fica em um arquivo próprio, fora do armazenamento dos pedidos, para que
+    backups e restaurações não tragam de volta mutações já replicadas.
+    """
+
+    MAX_MUTACOES_POR_LOTE = 500
+    ESPERA_INICIAL = 2.0
+    ESPERA_MAXIMA = 60.0
+
+    def __init__(self, arquivo: str):
+        self.arquivo = arquivo
+        self._sheets_sync = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._aviso = threading.Event()
+        self._tabela_pronta = False
+        self.ultima_sincronizacao: Optional[datetime] = None
+        self.ultimo_erro: Optional[str] = None
+
+    @contextmanager
+    def _conexao(self):
+        """Abre uma conexão por operação; a tabela é criada no primeiro uso"""
+        if not self._tabela_pronta:
+            os.makedirs(os.path.dirname(self.arquivo) or '.', exist_ok=True)
+        conexao = sqlite3.connect(self.arquivo, timeout=30)
+        try:
+            if not self._tabela_pronta:
+                conexao.execute("PRAGMA journal_mode = WAL")
+                conexao.executescript(ESQUEMA_SAIDA)
+                self._tabela_pronta = True
+            with conexao:
+                yield conexao
+        finally:
+            conexao.close()
+
+    def iniciar(self, sheets_sync):
+        """Define o cliente usado pela thread e a inicia se ainda não estiver rodando"""
+        with self._lock:
+            self._sheets_sync = sheets_sync
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._executar, name="fila-replicacao", daemon=True)
+                self._thread.start()
+
+    def _gravar(self, mutacoes: List[Tuple[str, Dict]]):
+        with self._conexao() as conexao:
+            conexao.executemany(
+                "INSERT INTO saida (tipo, dados) VALUES (?, ?)",
+                [(tipo, json.dumps(dados, ensure_ascii=False)) for tipo, dados in mutacoes]
+            )
+        self._aviso.set()
+
+    def enfileirar_pedido(self, pedido: Dict, itens: List[Dict]):
+        self._gravar([("pedido", {"pedido": pedido, "itens": itens})])
+
+    def enfileirar_status(self, atualizacoes: List[Dict]):
+        self._gravar([("status", atualizacao) for atualizacao in atualizacoes])
+
+    @property
+    def profundidade(self) -> int:
+        """Quantidade de mutações ainda não replicadas (inclusive as do lote em envio ou com falha)"""
+        with self._conexao() as conexao:
+            return conexao.execute("SELECT count(*) FROM saida").fetchone()[0]
+
+    def descartadas(self, limite: int = 100) -> List[Dict]:
+        """Mutações que não podem ser replicadas, das mais recentes para as mais antigas"""
+        with self._conexao() as conexao:
+            linhas = conexao.execute(
+                "SELECT tipo, dados, motivo, momento FROM descartadas ORDER BY id DESC LIMIT ?", (limite,)
+            ).fetchall()
+        return [
+            {"tipo": tipo, "dados": json.loads(dados), "motivo": motivo, "momento": momento}
+            for tipo, dados, motivo, momento in linhas
+        ]
+
+    @property
+    def quantidade_descartadas(self) -> int:
+        with self._conexao() as conexao:
+            return conexao.execute("SELECT count(*) FROM descartadas").fetchone()[0]
+
+    def _proximo_lote(self) -> List[Tuple[int, str, Dict]]:
+        """As mutações pendentes mais antigas, na ordem em que foram gravadas"""
+        with self._conexao() as conexao:
+            linhas = conexao.execute(
+                "SELECT id, tipo, dados FROM saida ORDER BY id LIMIT ?", (self.MAX_MUTACOES_POR_LOTE,)
+            ).fetchall()
+        return [(id_mutacao, tipo, json.loads(dados)) for id_mutacao, tipo, dados in linhas]
+
+    def _concluir(self, ids: List[int]):
+        """Remove da tabela de saída as mutações já aceitas pelo Google Sheets"""
+        if not ids:
+            return
+        with self._conexao() as conexao:
+            conexao.execute(f"DELETE FROM saida WHERE id IN ({', '.join('?' for _ in ids)})", ids)
+
+    def _concluir_pedidos(self, lote: List[Tuple[int, str, Dict]]):
+        """Depois do append em Pedidos, cada pedido fica na tabela só com os itens a anexar"""
+        with self._conexao() as conexao:
+            for id_mutacao, tipo, dados in lote:
+                if tipo != "pedido":
+                    continue
+                if dados["itens"]:
+                    conexao.execute(
+                        "UPDATE saida SET tipo = 'itens', dados = ? WHERE id = ?",
+                        (json.dumps({"itens": dados["itens"]}, ensure_ascii=False), id_mutacao)
+                    )
+                else:
+                    conexao.execute("DELETE FROM saida WHERE id = ?", (id_mutacao,))
+
+    def _descartar(self, mutacoes: List[Tuple[int, str, Dict]], motivo: str):
+        """Move para as descartadas mutações que o Google Sheets nunca vai aceitar"""
+        if not mutacoes:
+            return
+        momento = datetime.now().strftime('%d/%m/%Y %H:%M:%S')
+        with self._conexao() as conexao:
+            conexao.executemany(
+                "INSERT INTO descartadas (id, tipo, dados, motivo, momento) VALUES (?, ?, ?, ?, ?)",
+                [(id_mutacao, tipo, json.dumps(dados, ensure_ascii=False), motivo, momento)
+                 for id_mutacao, tipo, dados in mutacoes]
+            )
+            conexao.executemany("DELETE FROM saida WHERE id = ?", [(id_mutacao,) for id_mutacao, _, _ in mutacoes])
+
+    @staticmethod
+    def _agrupar(lote: List[Tuple[int, str, Dict]]) -> Tuple[list, list, list]:
+        """Separa pedidos e itens novos e reduz as mudanças de status à última de cada pedido"""
+        pedidos, itens = [], []
+        status: Dict[str, Dict] = {}
+        for _, tipo, dados in lote:
+            if tipo == "pedido":
+                pedidos.append(dados["pedido"])
+                itens.extend(dados["itens"])
+            elif tipo == "itens":
+                # Pedido já anexado em uma tentativa anterior; faltam só os itens
+                itens.extend(dados["itens"])
+            else:
+                atualizacao = dict(dados)
+                anterior = status.get(atualizacao["numero_pedido"])
+                if anterior and anterior.get("urgente_para_concluido_urgente"):
+                    atualizacao["urgente_para_concluido_urgente"] = True
+                status[atualizacao["numero_pedido"]] = atualizacao
+        return pedidos, itens, list(status.values())
+
+    def _enviar(self, lote: List[Tuple[int, str, Dict]]):
+        """Replica um lote; cada etapa sai da tabela assim que o Google Sheets a aceita"""
+        pedidos, itens, status = self._agrupar(lote)
+        # Pedidos primeiro: uma mudança de status pode se referir a um pedido do mesmo lote.
+        # Cada aba é uma etapa: uma falha em Itens não pode fazer os pedidos serem anexados de novo
+        if pedidos:
+            success, message = self._sheets_sync.adicionar_pedidos(pedidos, [])
+            if not success:
+                raise RuntimeError(message)
+            self._concluir_pedidos(lote)
+        if itens:
+            success, message = self._sheets_sync.adicionar_pedidos([], itens)
+            if not success:
+                raise RuntimeError(message)
+            self._concluir([id_mutacao for id_mutacao, tipo, _ in lote if tipo in ("pedido", "itens")])
+        if status:
+            success, message, nao_encontrados = self._sheets_sync.aplicar_status_pedidos(status)
+            if not success:
+                raise RuntimeError(message)
+            mutacoes_status = [mutacao for mutacao in lote if mutacao[1] == "status"]
+            ausentes = set(nao_encontrados)
+            self._descartar(
+                [mutacao for mutacao in mutacoes_status if mutacao[2]["numero_pedido"] in ausentes],
+                "Pedido não encontrado na aba Pedidos"
+            )
+            self._concluir([mutacao[0] for mutacao in mutacoes_status if mutacao[2]["numero_pedido"] not in ausentes])
+
+    def _executar(self):
+        # Escritas em segundo plano cedem a cota às leituras interativas
+        with limitador_sheets.em_segundo_plano():
+            self._processar()
+
+    def _processar(self):
+        espera = self.ESPERA_INICIAL
+        while True:
+            self._aviso.clear()
+            try:
+                lote = self._proximo_lote()
+                if not lote:
+                    self._aviso.wait()
+                    continue
+                self._enviar(lote)
+                self.ultima_sincronizacao = datetime.now()
+                self.ultimo_erro = None
+                espera = self.ESPERA_INICIAL
+            except Exception as e:
+                # O lote continua na tabela de saída e é tentado de novo depois da espera
+                self.ultimo_erro = str(e)
+                time.sleep(espera)
+                espera = min(espera * 2, self.ESPERA_MAXIMA)
+
+
+# Fila única do processo, compartilhada por todas as sessões
+fila_replicacao = FilaReplicacao(
+    os.getenv('ARQUIVO_FILA_REPLICACAO', os.path.join('pedidos', 'replicacao.db'))
+)
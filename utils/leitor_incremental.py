@@ -0,0 +1,143 @@
+import threading
+from typing import Dict, List, Optional, Tuple
+import pandas as pd
+import gspread
+from gspread.utils import fill_gaps, rowcol_to_a1
+from utils.cota_sheets import limitador_sheets
+
+
+class EstadoAba:
+    """Conteúdo já carregado de uma aba: cabeçalho, linhas (sem o cabeçalho), DataFrame e versão"""
+
+    def __init__(self, cabecalho: List[str], linhas: List[List[str]], df: pd.DataFrame = None):
+        self.cabecalho = cabecalho
+        self.linhas = linhas
+        self.df = pd.DataFrame(linhas, columns=cabecalho) if df is None else df
+        self.versao: Optional[str] = None
+
+
+class LeitorIncremental:
+    """
+    Leitura incremental das abas do Google Sheets, que só crescem pelo final.
+
+    Para cada aba guarda quantas linhas já foram carregadas; a próxima leitura busca
+    o cabeçalho e, da última linha conhecida em diante, as linhas novas, em uma única
+    chamada. A última linha conhecida serve de conferência: se as colunas que a
+    identificam (COLUNAS_CONFERENCIA, ou a linha toda se a aba não as tiver) ou o
+    cabeçalho mudaram (aba regravada, linhas apagadas), a aba é lida de novo por
+    inteiro. Colunas que mudam em uso normal, como o status do último pedido, não
+    forçam a releitura.
+
+    Antes de ler, uma sonda barata (modifiedTime do arquivo no Drive) indica se a
+    planilha mudou; se a versão é a mesma da última leitura, nada é baixado.
+    """
+
+    # Colunas imutáveis de uma linha já gravada
+    COLUNAS_CONFERENCIA = ("Numero_Pedido", "Data")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._estados: Dict[Tuple[str, str], EstadoAba] = {}
+        self._sonda_disponivel = True
+
+    def versao_remota(self, sheet: gspread.Spreadsheet) -> Optional[str]:
+        """
+        Versão atual da planilha (modifiedTime do Drive) em uma requisição pequena.
+
+        Retorna None se não for possível consultar; nesse caso as leituras seguem sem a sonda.
+        Se a API do Drive recusar a consulta (ex.: API desativada), a sonda deixa de ser usada.
+        """
+        if not self._sonda_disponivel:
+            return None
+        try:
+            return limitador_sheets.executar(sheet.get_lastUpdateTime)
+        except gspread.exceptions.APIError:
+            self._sonda_disponivel = False
+            return None
+        except Exception:
+            return None
+
+    @staticmethod
+    def _normalizar(linhas: List[List[str]], largura: int) -> List[List[str]]:
+        """Completa/corta as linhas na largura do cabeçalho (a API omite células vazias no final)"""
+        return [(list(linha) + [""] * largura)[:largura] for linha in linhas]
+
+    def _ler_tudo(self, sheet: gspread.Spreadsheet, nome_aba: str) -> EstadoAba:
+        valores = fill_gaps(limitador_sheets.executar(sheet.values_get, f"'{nome_aba}'").get("values", []))
+        if not valores:
+            return EstadoAba([], [])
+        return EstadoAba(valores[0], self._normalizar(valores[1:], len(valores[0])))
+
+    def _mesma_linha(self, estado: EstadoAba, linha: List[str]) -> bool:
+        """Se a linha lida na posição da última linha conhecida ainda é a mesma"""
+        if not estado.linhas:
+            return linha == estado.cabecalho
+        posicoes = [estado.cabecalho.index(coluna) for coluna in self.COLUNAS_CONFERENCIA
+                    if coluna in estado.cabecalho]
+        if not posicoes:
+            return linha == estado.linhas[-1]
+        return all(linha[posicao] == estado.linhas[-1][posicao] for posicao in posicoes)
+
+    def _ler_final(self, sheet: gspread.Spreadsheet, nome_aba: str, estado: EstadoAba) -> Optional[EstadoAba]:
+        """Busca as linhas novas; retorna None se for preciso reler a aba inteira"""
+        largura = len(estado.cabecalho)
+        ultima_linha = len(estado.linhas) + 1
+        ultima_coluna = rowcol_to_a1(1, largura)[:-1]
+        resposta = limitador_sheets.executar(
+            sheet.values_batch_get,
+            [f"'{nome_aba}'!1:1", f"'{nome_aba}'!A{ultima_linha}:{ultima_coluna}"]
+        )
+        cabecalho, final = [faixa.get("values", []) for faixa in resposta["valueRanges"]]
+        if self._normalizar(cabecalho, largura + 1) != [estado.cabecalho + [""]]:
+            return None
+        final = self._normalizar(final, largura)
+        if not final or not self._mesma_linha(estado, final[0]):
+            return None
+        novas = final[1:]
+        if not novas:
+            return estado
+        return EstadoAba(
+            estado.cabecalho,
+            estado.linhas + novas,
+            pd.concat([estado.df, pd.DataFrame(novas, columns=estado.cabecalho)], ignore_index=True)
+        )
+
+    def ler(self, sheet: gspread.Spreadsheet, nome_aba: str,
+            versao: Optional[str] = None) -> Tuple[pd.DataFrame, int, bool]:
+        """
+        Retorna (conteúdo da aba, quantidade de linhas novas, se houve releitura completa).
+
+        Na primeira leitura todas as linhas contam como novas e a releitura é completa.
+        versao é o resultado de versao_remota() obtido antes da leitura (uma sonda pode
+        servir a várias abas); se igual à da última leitura, o cache é devolvido sem rede.
+        """
+        chave = (sheet.id, nome_aba)
+        with self._lock:
+            estado = self._estados.get(chave)
+        if estado is not None and versao is not None and estado.versao == versao:
+            return estado.df, 0, False
+        atualizado = None
+        if estado is not None and estado.cabecalho:
+            atualizado = self._ler_final(sheet, nome_aba, estado)
+        completo = atualizado is None
+        if completo:
+            atualizado = self._ler_tudo(sheet, nome_aba)
+        # A versão é a sondada antes da leitura: uma escrita concorrente gera nova versão e nova leitura
+        atualizado.versao = versao
+        with self._lock:
+            self._estados[chave] = atualizado
+        novas = len(atualizado.linhas) if completo else len(atualizado.linhas) - len(estado.linhas)
+        return atualizado.df, novas, completo
+
+    def invalidar(self, sheet: gspread.Spreadsheet = None):
+        """Esquece o que já foi carregado; a próxima leitura é completa"""
+        with self._lock:
+            if sheet is None:
+                self._estados.clear()
+            else:
+                for chave in [chave for chave in self._estados if chave[0] == sheet.id]:
+                    del self._estados[chave]
+
+
+# Leitor único do processo, compartilhado por todas as sessões
+leitor_incremental = LeitorIncremental()
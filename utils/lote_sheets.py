@@ -0,0 +1,74 @@
+import random
+from typing import Any, Dict, List, Optional
+import gspread
+from utils.cota_sheets import limitador_sheets
+
+# Formatação do cabeçalho das abas (cinza, centralizado e em negrito)
+FORMATO_CABECALHO = {
+    "backgroundColor": {"red": 0.8, "green": 0.8, "blue": 0.8},
+    "horizontalAlignment": "CENTER",
+    "textFormat": {"bold": True}
+}
+
+
+class LoteSheets:
+    """
+    Monta as requisições de um spreadsheets.batchUpdate e as envia em uma única chamada.
+
+    Criação de abas, redimensionamento, congelamento e formatação de várias abas
+    viram uma requisição HTTP; a API aplica o lote inteiro ou nenhuma parte dele.
+    """
+
+    def __init__(self):
+        self.requisicoes: List[Dict[str, Any]] = []
+
+    def __bool__(self) -> bool:
+        return bool(self.requisicoes)
+
+    @staticmethod
+    def novo_id_aba(ids_existentes) -> int:
+        """Id para uma aba nova, escolhido aqui para ser usado no mesmo lote em que ela é criada"""
+        ids_existentes = set(ids_existentes)
+        while True:
+            sheet_id = random.randint(1, 2 ** 31 - 1)
+            if sheet_id not in ids_existentes:
+                return sheet_id
+
+    def criar_aba(self, titulo: str, sheet_id: int, linhas: int, colunas: int) -> "LoteSheets":
+        self.requisicoes.append({"addSheet": {"properties": {
+            "title": titulo,
+            "sheetId": sheet_id,
+            "sheetType": "GRID",
+            "gridProperties": {"rowCount": linhas, "columnCount": colunas}
+        }}})
+        return self
+
+    def redimensionar(self, sheet_id: int, linhas: int, colunas: int) -> "LoteSheets":
+        """Ajusta a grade ao tamanho exato (linhas/colunas além dele são removidas)"""
+        self.requisicoes.append({"updateSheetProperties": {
+            "properties": {"sheetId": sheet_id, "gridProperties": {"rowCount": linhas, "columnCount": colunas}},
+            "fields": "gridProperties.rowCount,gridProperties.columnCount"
+        }})
+        return self
+
+    def formatar_cabecalho(self, sheet_id: int, colunas: int) -> "LoteSheets":
+        """Formata a primeira linha e a mantém congelada"""
+        self.requisicoes.append({"repeatCell": {
+            "range": {"sheetId": sheet_id, "startRowIndex": 0, "endRowIndex": 1,
+                      "startColumnIndex": 0, "endColumnIndex": colunas},
+            "cell": {"userEnteredFormat": FORMATO_CABECALHO},
+            "fields": "userEnteredFormat(backgroundColor,horizontalAlignment,textFormat)"
+        }})
+        self.requisicoes.append({"updateSheetProperties": {
+            "properties": {"sheetId": sheet_id, "gridProperties": {"frozenRowCount": 1}},
+            "fields": "gridProperties.frozenRowCount"
+        }})
+        return self
+
+    def enviar(self, sheet: gspread.Spreadsheet) -> Optional[Dict[str, Any]]:
+        """Envia o lote (uma chamada pelo limitador de cota); nada é enviado se estiver vazio"""
+        if not self.requisicoes:
+            return None
+        resposta = limitador_sheets.executar(sheet.batch_update, {"requests": self.requisicoes})
+        self.requisicoes = []
+        return resposta
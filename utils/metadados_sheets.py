@@ -0,0 +1,123 @@
+import threading
+from typing import Dict, List, Optional
+import gspread
+from utils.cota_sheets import limitador_sheets
+
+# Abas cujo cabeçalho é lido junto com os metadados
+ABAS_CONHECIDAS = ("Pedidos", "Itens", "Projeto")
+
+# Propriedades de todas as abas e apenas a primeira linha de cada aba pedida
+CAMPOS_METADADOS = "sheets(properties,data(rowData(values(formattedValue))))"
+
+
+def _cabecalho_da_aba(aba: dict) -> List[str]:
+    """Extrai a linha 1 da resposta com includeGridData (sem as células vazias do final)"""
+    linhas = (aba.get("data") or [{}])[0].get("rowData") or [{}]
+    cabecalho = [celula.get("formattedValue", "") for celula in linhas[0].get("values", [])]
+    while cabecalho and not cabecalho[-1]:
+        cabecalho.pop()
+    return cabecalho
+
+
+class MetadadosPlanilha:
+    """
+    Metadados das abas (id, tamanho e cabeçalho) de cada planilha, em cache no processo.
+
+    Tudo é lido em uma única chamada spreadsheets.get e reaproveitado por leituras e
+    escritas: abrir uma aba e localizar colunas deixa de custar requisições. O cache só
+    é descartado quando uma mudança de estrutura é detectada (aba ou cabeçalho diferente).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._abas: Dict[str, Dict[str, dict]] = {}
+
+    def _buscar(self, planilha: gspread.Spreadsheet) -> Dict[str, dict]:
+        try:
+            resposta = limitador_sheets.executar(planilha.fetch_sheet_metadata, params={
+                "includeGridData": "true",
+                "ranges": [f"'{titulo}'!1:1" for titulo in ABAS_CONHECIDAS],
+                "fields": CAMPOS_METADADOS
+            })
+        except gspread.exceptions.APIError as e:
+            if getattr(e.response, "status_code", None) != 400:
+                raise
+            # Alguma aba conhecida ainda não existe: pede só os cabeçalhos das que existem
+            propriedades = limitador_sheets.executar(
+                planilha.fetch_sheet_metadata, params={"fields": "sheets(properties(title))"}
+            )
+            titulos = {aba["properties"]["title"] for aba in propriedades.get("sheets", [])}
+            existentes = [titulo for titulo in ABAS_CONHECIDAS if titulo in titulos]
+            resposta = limitador_sheets.executar(planilha.fetch_sheet_metadata, params={
+                "includeGridData": "true",
+                "ranges": [f"'{titulo}'!1:1" for titulo in existentes] or ["A1"],
+                "fields": CAMPOS_METADADOS
+            })
+        return {
+            aba["properties"]["title"]: {
+                "propriedades": aba["properties"],
+                "cabecalho": _cabecalho_da_aba(aba)
+            }
+            for aba in resposta.get("sheets", [])
+        }
+
+    def abas(self, planilha: gspread.Spreadsheet) -> Dict[str, dict]:
+        """Metadados de todas as abas, buscados na primeira vez e servidos do cache depois"""
+        with self._lock:
+            abas = self._abas.get(planilha.id)
+        if abas is None:
+            abas = self._buscar(planilha)
+            with self._lock:
+                abas = self._abas.setdefault(planilha.id, abas)
+        return abas
+
+    def aba(self, planilha: gspread.Spreadsheet, titulo: str) -> Optional[dict]:
+        return self.abas(planilha).get(titulo)
+
+    def worksheet(self, planilha: gspread.Spreadsheet, titulo: str) -> Optional[gspread.Worksheet]:
+        """Worksheet montada a partir do cache, sem a chamada de metadados de planilha.worksheet()"""
+        aba = self.aba(planilha, titulo)
+        if aba is None:
+            return None
+        return gspread.Worksheet(planilha, aba["propriedades"], planilha.id, planilha.client)
+
+    def cabecalho(self, planilha: gspread.Spreadsheet, titulo: str) -> List[str]:
+        aba = self.aba(planilha, titulo)
+        return list(aba["cabecalho"]) if aba else []
+
+    def coluna(self, planilha: gspread.Spreadsheet, titulo: str, nome: str) -> Optional[int]:
+        """Posição (a partir de 1) da coluna no cabeçalho da aba; None se não existir"""
+        cabecalho = self.cabecalho(planilha, titulo)
+        return cabecalho.index(nome) + 1 if nome in cabecalho else None
+
+    def registrar_aba(self, planilha: gspread.Spreadsheet, propriedades: dict, cabecalho: List[str] = None):
+        """Inclui no cache uma aba recém-criada (propriedades como devolvidas pelo addSheet)"""
+        abas = self.abas(planilha)
+        with self._lock:
+            abas[propriedades["title"]] = {"propriedades": dict(propriedades), "cabecalho": list(cabecalho or [])}
+
+    def registrar_cabecalho(self, planilha: gspread.Spreadsheet, titulo: str, cabecalho: List[str]) -> bool:
+        """Atualiza o cabeçalho conhecido da aba; retorna True se ele havia mudado"""
+        cabecalho = list(cabecalho)
+        while cabecalho and not cabecalho[-1]:
+            cabecalho.pop()
+        aba = self.aba(planilha, titulo)
+        if aba is None:
+            self.invalidar(planilha)
+            return True
+        with self._lock:
+            alterado = aba["cabecalho"] != cabecalho
+            aba["cabecalho"] = cabecalho
+        return alterado
+
+    def invalidar(self, planilha: gspread.Spreadsheet = None):
+        """Descarta os metadados da planilha (ou de todas) para serem relidos na próxima chamada"""
+        with self._lock:
+            if planilha is None:
+                self._abas.clear()
+            else:
+                self._abas.pop(planilha.id, None)
+
+
+# Cache único do processo, compartilhado por todas as sessões
+metadados_sheets = MetadadosPlanilha()
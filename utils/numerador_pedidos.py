@@ -0,0 +1,58 @@
+import os
+import json
+import re
+from typing import Optional
+
+import pandas as pd
+
+PREFIXO_PEDIDO = "REQ-"
+
+
+def numero_do_pedido(numero_pedido: str) -> Optional[int]:
+    """Extrai a parte numérica de um número de pedido (REQ-1234 → 1234)"""
+    encontrado = re.search(r'(\d+)\s*$', str(numero_pedido))
+    return int(encontrado.group(1)) if encontrado else None
+
+
+def formatar_numero_pedido(numero: int) -> str:
+    """
+    Formata o número do pedido mantendo ao menos 3 dígitos (REQ-001, REQ-1000).
+
+    O formato é o mesmo dos pedidos já gravados no Google Sheets; como texto, REQ-1000
+    fica antes de REQ-999, então toda ordenação por número usa `ordem_numerica`.
+    """
+    return f"{PREFIXO_PEDIDO}{numero:03d}"
+
+
+def ordem_numerica(numeros_pedidos: pd.Series) -> pd.Series:
+    """Chave de ordenação pela parte numérica (para sort_values(key=...)); sem número vai para o fim"""
+    return numeros_pedidos.astype(str).str.extract(r'(\d+)\s*$', expand=False).astype(float)
+
+
+class NumeradorPedidos:
+    """
+    Aloca números de pedido de forma atômica entre sessões e processos.
+
+    O último número emitido fica no armazenamento local e é reservado em uma transação
+    BEGIN IMMEDIATE, que o SQLite serializa entre threads e processos; o valor é gravado
+    antes de ser devolvido, então reinícios nunca reutilizam números. O antigo arquivo
+    contador, se existir, só serve de ponto de partida na primeira alocação.
+    """
+
+    def __init__(self, armazenamento, arquivo_contador_legado: Optional[str] = None):
+        self.armazenamento = armazenamento
+        self._ultimo_legado = self._ler_legado(arquivo_contador_legado)
+
+    @staticmethod
+    def _ler_legado(arquivo: Optional[str]) -> int:
+        if not arquivo or not os.path.exists(arquivo):
+            return 0
+        try:
+            with open(arquivo, 'r') as f:
+                return int(json.load(f)['ultimo_numero'])
+        except (ValueError, KeyError, OSError):
+            return 0
+
+    def proximo(self) -> str:
+        """Reserva e retorna o próximo número de pedido"""
+        return formatar_numero_pedido(self.armazenamento.reservar_numero_pedido(self._ultimo_legado))
@@ -0,0 +1,160 @@
+from typing import Dict, Iterable, List, Optional
+import pandas as pd
+
+ESQUEMA_RESUMO = """
+    CREATE TABLE IF NOT EXISTS resumo_status (
+        Cliente TEXT NOT NULL,
+        Status TEXT NOT NULL,
+        Urgente INTEGER NOT NULL,
+        Dia TEXT NOT NULL,
+        Quantidade INTEGER NOT NULL,
+        PRIMARY KEY (Cliente, Status, Urgente, Dia)
+    ) WITHOUT ROWID;
+
+    CREATE TABLE IF NOT EXISTS tempos_atendimento (
+        Numero_Pedido TEXT PRIMARY KEY,
+        Horas REAL NOT NULL
+    ) WITHOUT ROWID;
+    CREATE INDEX IF NOT EXISTS idx_tempos_horas ON tempos_atendimento (Horas);
+"""
+
+# Chave do resumo calculada sobre uma linha de pedidos (Dia vem da data já normalizada)
+CHAVE_RESUMO = "Cliente, Status, lower(trim(Urgente)) = 'sim', substr(Data_ISO, 1, 10)"
+
+COLUNAS_CHAVE = ["Cliente", "Status", "Urgente", "Dia"]
+
+
+class ResumoStatus:
+    """
+    Contagem materializada de pedidos por cliente × status × urgência × dia.
+
+    Cada gravação ajusta só as chaves dos pedidos que mudaram: retira a chave antiga
+    antes da alteração e inclui a nova depois, na mesma transação. Assim o dashboard
+    lê algumas centenas de linhas em vez de agregar todos os pedidos. Cargas completas
+    reconstroem a tabela, e `verificar` compara o resumo com a contagem direta.
+    """
+
+    def _chaves(self, conexao, numeros_pedidos: List[str]) -> List[tuple]:
+        if not numeros_pedidos:
+            return []
+        marcadores = ", ".join("?" for _ in numeros_pedidos)
+        return conexao.execute(
+            f"SELECT {CHAVE_RESUMO} FROM pedidos WHERE Numero_Pedido IN ({marcadores})",
+            list(numeros_pedidos)
+        ).fetchall()
+
+    def _ajustar(self, conexao, chaves: Iterable[tuple], delta: int):
+        chaves = list(chaves)
+        conexao.executemany(
+            "INSERT INTO resumo_status (Cliente, Status, Urgente, Dia, Quantidade) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT (Cliente, Status, Urgente, Dia) DO UPDATE SET Quantidade = Quantidade + excluded.Quantidade",
+            [tuple(chave) + (delta,) for chave in chaves]
+        )
+        if delta < 0:
+            conexao.executemany(
+                "DELETE FROM resumo_status WHERE Cliente = ? AND Status = ? AND Urgente = ? AND Dia = ? "
+                "AND Quantidade <= 0",
+                chaves
+            )
+
+    def retirar(self, conexao, numeros_pedidos: List[str]):
+        """Antes de alterar pedidos: desconta-os das chaves em que estão agora"""
+        self._ajustar(conexao, self._chaves(conexao, numeros_pedidos), -1)
+
+    def incluir(self, conexao, numeros_pedidos: List[str]):
+        """Depois de gravar pedidos: conta-os nas chaves do estado novo"""
+        self._ajustar(conexao, self._chaves(conexao, numeros_pedidos), 1)
+
+    def reconstruir(self, conexao):
+        """Recalcula o resumo inteiro a partir da tabela de pedidos"""
+        conexao.execute("DELETE FROM resumo_status")
+        conexao.execute(
+            "INSERT INTO resumo_status (Cliente, Status, Urgente, Dia, Quantidade) "
+            f"SELECT {CHAVE_RESUMO}, COUNT(*) FROM pedidos GROUP BY 1, 2, 3, 4"
+        )
+
+    def ler(self, conexao, dia_inicio: Optional[str] = None, dia_fim: Optional[str] = None) -> pd.DataFrame:
+        """Linhas do resumo (Cliente, Status, Urgente, Dia, Quantidade), opcionalmente entre dois dias aaaa-mm-dd"""
+        condicoes, parametros = [], []
+        if dia_inicio:
+            condicoes.append("Dia >= ?")
+            parametros.append(dia_inicio)
+        if dia_fim:
+            condicoes.append("Dia <= ?")
+            parametros.append(dia_fim)
+        sql = "SELECT Cliente, Status, Urgente, Dia, Quantidade FROM resumo_status"
+        if condicoes:
+            sql += " WHERE " + " AND ".join(condicoes)
+        return pd.read_sql_query(sql, conexao, params=tuple(parametros))
+
+    def verificar(self, conexao) -> pd.DataFrame:
+        """Chaves em que o resumo difere da contagem direta dos pedidos (vazio se estiver consistente)"""
+        direto = pd.read_sql_query(
+            f"SELECT {CHAVE_RESUMO}, COUNT(*) FROM pedidos GROUP BY 1, 2, 3, 4", conexao
+        )
+        direto.columns = COLUNAS_CHAVE + ["Pedidos"]
+        resumo = self.ler(conexao)
+        comparacao = direto.merge(resumo, on=COLUNAS_CHAVE, how="outer").fillna({"Pedidos": 0, "Quantidade": 0})
+        divergentes = comparacao[comparacao["Pedidos"] != comparacao["Quantidade"]]
+        return divergentes.astype({"Pedidos": "int64", "Quantidade": "int64"}).reset_index(drop=True)
+
+
+# Horas entre a criação e a conclusão, pelos momentos (ISO) dos eventos do diário
+_HORAS = "(julianday(conclusao.momento) - julianday(criacao.momento)) * 24"
+
+# Conclusões recentes (id > ?) com o tempo desde a criação do próprio pedido; a criação é
+# buscada por número (idx_eventos_numero), então o custo não cresce com o diário
+_REGISTRAR_CONCLUSOES = (
+    "INSERT OR IGNORE INTO tempos_atendimento (Numero_Pedido, Horas) "
+    "SELECT Numero_Pedido, Horas FROM ("
+    "  SELECT conclusao.id, conclusao.Numero_Pedido, (julianday(conclusao.momento) - julianday("
+    "    (SELECT MIN(criacao.momento) FROM eventos AS criacao "
+    "     WHERE criacao.Numero_Pedido = conclusao.Numero_Pedido AND criacao.tipo = 'criacao')"
+    "  )) * 24 AS Horas FROM eventos AS conclusao "
+    "  WHERE conclusao.id > ? AND conclusao.tipo = 'status' AND conclusao.Status = 'Concluído'"
+    ") WHERE Horas IS NOT NULL ORDER BY id"
+)
+
+
+class TemposAtendimento:
+    """
+    Tempo de atendimento (criação → primeira conclusão) de cada pedido, materializado.
+
+    Quando pedidos passam a "Concluído", os eventos de status recém-gravados entram na
+    tabela junto com o evento de criação de cada um, na mesma transação; conclusões
+    seguintes do mesmo pedido são ignoradas. Assim o dashboard lê só as horas dos
+    pedidos concluídos (média e mediana pelo índice) em vez de todo o diário.
+    """
+
+    def registrar_conclusoes(self, conexao, apos_evento: int):
+        """Inclui os pedidos concluídos pelos eventos de status com id maior que apos_evento"""
+        conexao.execute(_REGISTRAR_CONCLUSOES, (apos_evento,))
+
+    def reconstruir(self, conexao):
+        """Recalcula todos os tempos a partir do diário"""
+        conexao.execute("DELETE FROM tempos_atendimento")
+        conexao.execute(
+            f"INSERT INTO tempos_atendimento (Numero_Pedido, Horas) "
+            f"SELECT criacao.Numero_Pedido, {_HORAS} FROM "
+            "(SELECT Numero_Pedido, MIN(momento) AS momento FROM eventos "
+            " WHERE tipo = 'criacao' GROUP BY Numero_Pedido) AS criacao "
+            "JOIN (SELECT Numero_Pedido, MIN(momento) AS momento FROM eventos "
+            "      WHERE tipo = 'status' AND Status = 'Concluído' GROUP BY Numero_Pedido) AS conclusao "
+            "  ON conclusao.Numero_Pedido = criacao.Numero_Pedido"
+        )
+
+    def ler(self, conexao) -> Dict[str, float]:
+        """Quantidade de pedidos concluídos e média/mediana das horas (NaN sem pedidos)"""
+        quantidade, media = conexao.execute("SELECT COUNT(*), AVG(Horas) FROM tempos_atendimento").fetchone()
+        mediana = None
+        if quantidade:
+            # Um ou dois valores do meio, pelo índice em Horas
+            mediana = conexao.execute(
+                "SELECT AVG(Horas) FROM (SELECT Horas FROM tempos_atendimento ORDER BY Horas LIMIT ? OFFSET ?)",
+                (2 - quantidade % 2, (quantidade - 1) // 2)
+            ).fetchone()[0]
+        return {
+            "quantidade": quantidade,
+            "media": float("nan") if media is None else media,
+            "mediana": float("nan") if mediana is None else mediana,
+        }
@@ -5,7 +5,14 @@ import streamlit as st
 from googleapiclient.discovery import build
 from datetime import datetime
 import gspread
-from oauth2client.service_account import ServiceAccountCredentials
+from gspread.utils import fill_gaps, rowcol_to_a1
+from utils.cliente_sheets import registro_sheets
+from utils.metadados_sheets import metadados_sheets
+from utils.leitor_incremental import leitor_incremental
+from utils.cache_compartilhado import cache_catalogo
+from utils.armazenamento import obter_armazenamento
+from utils.cota_sheets import limitador_sheets
+from utils.lote_sheets import LoteSheets
 
 class SheetsPedidosSync:
     def __init__(self):
@@ -63,14 +70,11 @@ class SheetsPedidosSync:
                     self.client = None
                     return
                 
-                self.client = gspread.authorize(ServiceAccountCredentials.from_json_keyfile_dict(
-                    creds,
-                    scopes=['https://spreadsheets.google.com/feeds', 
-                           'https://www.googleapis.com/auth/drive']
-                ))
-                # Testar conexão
+                # Cliente e planilha compartilhados pelo processo: autoriza e abre uma vez só
+                self.client = registro_sheets.obter_cliente(creds)
+                # Testar conexão (só acessa a API na primeira abertura da planilha)
                 try:
-                    self.client.open_by_url(self.SPREADSHEET_URL)
+                    self._planilha()
                 except Exception as e:
                     st.warning(f"Erro ao acessar planilha: {str(e)}")
                     self.client = None
@@ -78,15 +82,115 @@ class SheetsPedidosSync:
             st.error(f"Erro ao inicializar cliente do Google Sheets: {str(e)}")
             self.client = None
 
+    def _planilha(self) -> gspread.Spreadsheet:
+        """Retorna a planilha configurada, aberta uma vez e reaproveitada entre reruns"""
+        return registro_sheets.obter_planilha(
+            self.client, self.SPREADSHEET_URL,
+            lambda url: self._api(self.client.open_by_url, url)
+        )
+
+    def _api(self, funcao, *args, **kwargs):
+        """Executa uma chamada ao gspread pelo limitador de cota (token bucket + retentativas)"""
+        return limitador_sheets.executar(funcao, *args, **kwargs)
+
     def _get_or_create_worksheet(self, sheet, name, rows=100, cols=20):
-        """Obtém ou cria uma aba na planilha"""
+        """Obtém (pelos metadados em cache) ou cria uma aba na planilha"""
+        worksheet = metadados_sheets.worksheet(sheet, name)
+        if worksheet is None:
+            worksheet = self._api(sheet.add_worksheet, title=name, rows=rows, cols=cols)
+            metadados_sheets.registrar_aba(sheet, worksheet._properties)
+        return worksheet
+
+    def versao_planilha(self):
+        """Versão atual da planilha (modifiedTime), ou None se a sonda não estiver disponível"""
+        return leitor_incremental.versao_remota(self._planilha())
+
+    def ler_valores(self, nome_aba: str) -> list[list[str]]:
+        """Lê uma aba inteira como texto (cabeçalho na primeira linha); lista vazia se a aba não existir"""
+        if not self.client or not self.SPREADSHEET_URL:
+            raise ValueError("Cliente do Google Sheets não configurado. Verifique as credenciais.")
+        sheet = self._planilha()
+        if metadados_sheets.aba(sheet, nome_aba) is None:
+            return []
         try:
-            return sheet.worksheet(name)
-        except gspread.exceptions.WorksheetNotFound:
-            return sheet.add_worksheet(title=name, rows=rows, cols=cols)
-
-    def salvar_pedido_completo(self, df_pedidos: pd.DataFrame, df_itens: pd.DataFrame) -> tuple[bool, str]:
-        """Salva pedidos e itens em abas separadas no Google Sheets"""
+            valores = fill_gaps(self._api(sheet.values_get, f"'{nome_aba}'").get("values", []))
+        except gspread.exceptions.APIError:
+            metadados_sheets.invalidar(sheet)
+            raise
+        if valores:
+            # A leitura completa já traz o cabeçalho: mantém o cache em dia sem custo extra
+            metadados_sheets.registrar_cabecalho(sheet, nome_aba, valores[0])
+        return valores
+
+    def ler_aba(self, nome_aba: str) -> pd.DataFrame:
+        """Lê uma aba inteira como DataFrame de texto; vazio se a aba não existir"""
+        valores = self.ler_valores(nome_aba)
+        if not valores:
+            return pd.DataFrame()
+        return pd.DataFrame(valores[1:], columns=valores[0])
+
+    def ler_abas_incremental(self, nomes_abas: list[str]) -> dict[str, tuple[pd.DataFrame, int, bool]]:
+        """
+        Lê abas de pedidos buscando só as linhas acrescentadas desde a última leitura.
+
+        Uma única sonda de versão vale para todas as abas: se a planilha não mudou, nada é
+        baixado. Para cada aba retorna (conteúdo completo, linhas novas, se foi relida por inteiro).
+        """
+        if not self.client or not self.SPREADSHEET_URL:
+            raise ValueError("Cliente do Google Sheets não configurado. Verifique as credenciais.")
+        sheet = self._planilha()
+        versao = leitor_incremental.versao_remota(sheet)
+        return {
+            nome_aba: (
+                leitor_incremental.ler(sheet, nome_aba, versao)
+                if metadados_sheets.aba(sheet, nome_aba) is not None
+                else (pd.DataFrame(), 0, True)
+            )
+            for nome_aba in nomes_abas
+        }
+
+    def _garantir_cabecalho(self, sheet, nome_aba: str, colunas: list) -> tuple[list, bool]:
+        """Garante que o cabeçalho da aba contenha as colunas; retorna a ordem final e se foi alterado"""
+        cabecalho = metadados_sheets.cabecalho(sheet, nome_aba)
+        faltantes = [col for col in colunas if col not in cabecalho]
+        if faltantes:
+            cabecalho = cabecalho + faltantes
+            self._api(
+                sheet.values_update,
+                f"'{nome_aba}'!A1",
+                params={"valueInputOption": "RAW"},
+                body={"values": [cabecalho]}
+            )
+            metadados_sheets.registrar_cabecalho(sheet, nome_aba, cabecalho)
+        return cabecalho, bool(faltantes)
+
+    def _anexar_linhas(self, sheet, nome_aba: str, registros: list[dict]) -> bool:
+        """Anexa registros ao final da aba, alinhados pelo cabeçalho; retorna se o cabeçalho mudou"""
+        try:
+            self._get_or_create_worksheet(sheet, nome_aba)
+            cabecalho, cabecalho_alterado = self._garantir_cabecalho(sheet, nome_aba, list(registros[0].keys()))
+            linhas = [
+                ["" if registro.get(col) is None else str(registro.get(col)) for col in cabecalho]
+                for registro in registros
+            ]
+            self._api(
+                sheet.values_append,
+                f"'{nome_aba}'!A1",
+                params={"valueInputOption": "USER_ENTERED", "insertDataOption": "INSERT_ROWS"},
+                body={"values": linhas}
+            )
+        except gspread.exceptions.APIError:
+            # A aba pode ter sido renomeada/removida fora do app: relê os metadados na próxima tentativa
+            metadados_sheets.invalidar(sheet)
+            raise
+        return cabecalho_alterado
+
+    def adicionar_pedido(self, pedido: dict, itens: list[dict]) -> tuple[bool, str]:
+        """Anexa somente a linha do novo pedido e as linhas dos seus itens no Google Sheets"""
+        return self.adicionar_pedidos([pedido], itens)
+
+    def adicionar_pedidos(self, pedidos: list[dict], itens: list[dict]) -> tuple[bool, str]:
+        """Anexa vários pedidos novos e seus itens com um append por aba"""
         try:
             if not self.client:
                 raise ValueError("Cliente do Google Sheets não configurado. Verifique as credenciais.")
@@ -94,61 +198,162 @@ class SheetsPedidosSync:
             if not self.SPREADSHEET_URL:
                 raise ValueError("URL da planilha não configurada.")
 
-            # Abrir a planilha pelo URL
             try:
-                sheet = self.client.open_by_url(self.SPREADSHEET_URL)
+                sheet = self._planilha()
             except Exception as e:
                 raise ValueError(f"Erro ao abrir planilha: {str(e)}")
 
-            # Preparar os dados dos pedidos
-            df_pedidos = df_pedidos.fillna("")
-            pedidos_values = [df_pedidos.columns.tolist()] + df_pedidos.values.tolist()
-            pedidos_values = [[str(cell) if pd.notna(cell) else "" for cell in row] for row in pedidos_values]
+            alteradas = [
+                nome_aba for nome_aba, registros in (("Pedidos", pedidos), ("Itens", itens))
+                if registros and self._anexar_linhas(sheet, nome_aba, registros)
+            ]
 
-            # Preparar os dados dos itens
-            df_itens = df_itens.fillna("")
-            itens_values = [df_itens.columns.tolist()] + df_itens.values.tolist()
-            itens_values = [[str(cell) if pd.notna(cell) else "" for cell in row] for row in itens_values]
+            # Formatação só é necessária nas abas que ganharam cabeçalho novo
+            aviso = self._formatar_cabecalhos(sheet, alteradas) if alteradas else None
+
+            mensagem = f"{len(pedidos)} pedido(s) salvo(s) com sucesso no Google Sheets!"
+            return True, f"{mensagem} {aviso}" if aviso else mensagem
+        except Exception as e:
+            return False, f"Erro ao salvar no Google Sheets: {str(e)}"
+
+    def salvar_pedido_completo(self, df_pedidos: pd.DataFrame, df_itens: pd.DataFrame) -> tuple[bool, str]:
+        """Reconstrói as abas Pedidos e Itens regravando todas as linhas (operação de manutenção)"""
+        try:
+            if not self.client:
+                raise ValueError("Cliente do Google Sheets não configurado. Verifique as credenciais.")
 
-            # Atualizar aba de Pedidos
-            worksheet_pedidos = self._get_or_create_worksheet(sheet, "Pedidos")
-            worksheet_pedidos.clear()
-            worksheet_pedidos.append_rows(pedidos_values, value_input_option="USER_ENTERED")
+            if not self.SPREADSHEET_URL:
+                raise ValueError("URL da planilha não configurada.")
 
-            # Atualizar aba de Itens
-            worksheet_itens = self._get_or_create_worksheet(sheet, "Itens")
-            worksheet_itens.clear()
-            worksheet_itens.append_rows(itens_values, value_input_option="USER_ENTERED")
+            # Abrir a planilha pelo URL
+            try:
+                sheet = self._planilha()
+            except Exception as e:
+                raise ValueError(f"Erro ao abrir planilha: {str(e)}")
 
-            # Formatar as abas
-            self._format_worksheets(sheet)
+            # Regravar as duas abas (estrutura, formatação e valores em lote)
+            self._regravar_abas(sheet, {
+                "Pedidos": self._valores_do_dataframe(df_pedidos),
+                "Itens": self._valores_do_dataframe(df_itens)
+            })
 
             return True, "Pedido salvo com sucesso no Google Sheets!"
         except Exception as e:
             return False, f"Erro ao salvar no Google Sheets: {str(e)}"
 
-    def _format_worksheets(self, sheet):
-        """Aplica formatação básica nas abas"""
+    def reconstruir_pedidos(self) -> tuple[bool, str]:
+        """Regrava as abas Pedidos e Itens a partir do armazenamento local"""
         try:
-            # Formatar aba de Pedidos
-            ws_pedidos = sheet.worksheet("Pedidos")
-            ws_pedidos.format('A1:Z1', {
-                "backgroundColor": {"red": 0.8, "green": 0.8, "blue": 0.8},
-                "horizontalAlignment": "CENTER",
-                "textFormat": {"bold": True}
-            })
-            ws_pedidos.freeze(rows=1)
-
-            # Formatar aba de Itens
-            ws_itens = sheet.worksheet("Itens")
-            ws_itens.format('A1:Z1', {
-                "backgroundColor": {"red": 0.8, "green": 0.8, "blue": 0.8},
-                "horizontalAlignment": "CENTER",
-                "textFormat": {"bold": True}
-            })
-            ws_itens.freeze(rows=1)
+            armazenamento = obter_armazenamento()
+            df_pedidos = armazenamento.ler_pedidos()
+            df_itens = armazenamento.ler_itens()
+        except Exception as e:
+            return False, f"Erro ao ler pedidos locais: {str(e)}"
+        return self.salvar_pedido_completo(df_pedidos, df_itens)
+
+    def carregar_pedidos_do_sheets(self) -> tuple[pd.DataFrame, pd.DataFrame]:
+        """Lê as abas Pedidos e Itens inteiras (e prepara as leituras incrementais seguintes)"""
+        leitor_incremental.invalidar()
+        abas = self.ler_abas_incremental(["Pedidos", "Itens"])
+        return abas["Pedidos"][0], abas["Itens"][0]
+
+    def recarregar_do_sheets(self) -> tuple[bool, str]:
+        """Substitui os pedidos locais pelo conteúdo atual das abas Pedidos e Itens"""
+        try:
+            obter_armazenamento().substituir_pedidos(*self.carregar_pedidos_do_sheets())
+            return True, "Pedidos recarregados do Google Sheets!"
         except Exception as e:
-            st.warning(f"Aviso: Não foi possível aplicar a formatação: {str(e)}")
+            return False, f"Erro ao recarregar pedidos do Google Sheets: {str(e)}"
+
+    def buscar_novos_do_sheets(self) -> tuple[bool, str]:
+        """Inclui no armazenamento local os pedidos acrescentados no Google Sheets desde a última leitura"""
+        try:
+            abas = self.ler_abas_incremental(["Pedidos", "Itens"])
+            df_pedidos, novos_pedidos, _ = abas["Pedidos"]
+            df_itens, novos_itens, _ = abas["Itens"]
+            if not novos_pedidos and not novos_itens:
+                return True, "Nenhum pedido novo no Google Sheets."
+            # Só as linhas novas são mescladas; pedidos que já existem localmente são ignorados
+            incluidos = obter_armazenamento().mesclar_pedidos(
+                df_pedidos.tail(novos_pedidos), df_itens.tail(novos_itens)
+            )
+            return True, f"{incluidos} pedido(s) novo(s) incluído(s) a partir do Google Sheets."
+        except Exception as e:
+            return False, f"Erro ao buscar novos pedidos do Google Sheets: {str(e)}"
+
+    @staticmethod
+    def _valores_do_dataframe(df: pd.DataFrame) -> list[list[str]]:
+        """Cabeçalho e linhas do DataFrame como texto, com vazios no lugar de nulos"""
+        df = df.fillna("")
+        values = [df.columns.tolist()] + df.values.tolist()
+        return [[str(cell) if pd.notna(cell) else "" for cell in row] for row in values]
+
+    def _formatar_cabecalhos(self, sheet, nomes_abas: list[str]) -> str | None:
+        """
+        Formata e congela o cabeçalho das abas indicadas em uma única chamada.
+
+        Roda também na thread de replicação, então não usa a interface: uma falha
+        (só estética) volta como aviso no texto, sem desfazer as linhas já gravadas.
+        """
+        try:
+            lote = LoteSheets()
+            for nome_aba in nomes_abas:
+                aba = metadados_sheets.aba(sheet, nome_aba)
+                if aba is not None:
+                    lote.formatar_cabecalho(aba["propriedades"]["sheetId"], max(len(aba["cabecalho"]), 1))
+            lote.enviar(sheet)
+            return None
+        except Exception as e:
+            return f"Aviso: Não foi possível aplicar a formatação: {str(e)}"
+
+    def _regravar_abas(self, sheet, conteudos: dict[str, list[list[str]]]):
+        """
+        Substitui o conteúdo inteiro das abas (cabeçalho na primeira linha de cada lista).
+
+        São duas chamadas para todas as abas juntas: um spreadsheets.batchUpdate que cria
+        as abas que faltam, ajusta o tamanho da grade e formata só os cabeçalhos novos ou
+        alterados; e um values.batchUpdate com os valores (USER_ENTERED, como antes).
+        """
+        try:
+            abas = metadados_sheets.abas(sheet)
+            ids = [aba["propriedades"]["sheetId"] for aba in abas.values()]
+            lote = LoteSheets()
+            dados = []
+            for nome_aba, valores in conteudos.items():
+                largura = max(max(len(linha) for linha in valores), 1)
+                # Uma linha vazia a mais: a grade nunca fica só com a linha congelada
+                linhas = len(valores) + 1
+                cabecalho = list(valores[0])
+                while cabecalho and not cabecalho[-1]:
+                    cabecalho.pop()
+                aba = abas.get(nome_aba)
+                if aba is None:
+                    sheet_id = lote.novo_id_aba(ids)
+                    ids.append(sheet_id)
+                    lote.criar_aba(nome_aba, sheet_id, linhas, largura)
+                    lote.formatar_cabecalho(sheet_id, largura)
+                else:
+                    sheet_id = aba["propriedades"]["sheetId"]
+                    # Reduzir a grade apaga as linhas antigas que sobrariam, sem um clear separado
+                    lote.redimensionar(sheet_id, linhas, largura)
+                    if aba["cabecalho"] != cabecalho:
+                        lote.formatar_cabecalho(sheet_id, largura)
+                dados.append({
+                    "range": f"'{nome_aba}'!A1",
+                    "values": [linha + [""] * (largura - len(linha)) for linha in valores] + [[""] * largura]
+                })
+
+            resposta = lote.enviar(sheet)
+            for resultado in (resposta or {}).get("replies", []):
+                if "addSheet" in resultado:
+                    metadados_sheets.registrar_aba(sheet, resultado["addSheet"]["properties"])
+            self._api(sheet.values_batch_update, {"valueInputOption": "USER_ENTERED", "data": dados})
+        except gspread.exceptions.APIError:
+            metadados_sheets.invalidar(sheet)
+            raise
+        for nome_aba, valores in conteudos.items():
+            metadados_sheets.registrar_cabecalho(sheet, nome_aba, valores[0])
+        leitor_incremental.invalidar(sheet)
 
     def sincronizar_mapeamento(self, arquivo_mapeamento: str) -> tuple[bool, str]:
         """Sincroniza o arquivo de mapeamento com o Google Sheets"""
@@ -181,27 +386,17 @@ class SheetsPedidosSync:
 
             # Abrir a planilha do Google Sheets
             try:
-                sheet = self.client.open_by_url(self.SPREADSHEET_URL)
+                sheet = self._planilha()
             except Exception as e:
                 raise ValueError(f"Erro ao abrir planilha: {str(e)}")
 
-            # Preparar os dados
-            df = df.fillna("")
-            values = [df.columns.tolist()] + df.values.tolist()
-            values = [[str(cell) if pd.notna(cell) else "" for cell in row] for row in values]
-
-            # Atualizar ou criar a aba Projeto
-            worksheet = self._get_or_create_worksheet(sheet, "Projeto", rows=len(values)+100, cols=len(values[0])+5)
-            worksheet.clear()
-            worksheet.append_rows(values, value_input_option="USER_ENTERED")
-
-            # Formatar a aba
-            worksheet.format('A1:Z1', {
-                "backgroundColor": {"red": 0.8, "green": 0.8, "blue": 0.8},
-                "horizontalAlignment": "CENTER",
-                "textFormat": {"bold": True}
-            })
-            worksheet.freeze(rows=1)
+            # Atualizar ou criar a aba Projeto (estrutura, formatação e valores em lote)
+            values = self._valores_do_dataframe(df)
+            self._regravar_abas(sheet, {"Projeto": values})
+
+            # Guardar a cópia local e fazer todas as sessões recarregarem o catálogo
+            obter_armazenamento().salvar_projeto(values, leitor_incremental.versao_remota(sheet))
+            cache_catalogo.invalidar()
 
             return True, "Mapeamento sincronizado com sucesso!"
         except Exception as e:
@@ -219,6 +414,7 @@ class SheetsPedidosSync:
         )
         if st.button("💾 Salvar URL") and sheets_url:
             self.config['sheets_url'] = sheets_url
+            registro_sheets.invalidar_planilha(self.SPREADSHEET_URL)
             self.SPREADSHEET_URL = sheets_url
             self.save_config()
             st.success("✅ URL salva com sucesso!")
@@ -230,7 +426,9 @@ class SheetsPedidosSync:
             st.success("✅ Conectado ao Google Sheets")
             if st.button("🔄 Testar Conexão"):
                 try:
-                    self.client.open_by_url(self.SPREADSHEET_URL)
+                    registro_sheets.invalidar_planilha(self.SPREADSHEET_URL)
+                    metadados_sheets.invalidar()
+                    self._planilha()
                     st.success("✅ Conexão testada com sucesso!")
                 except Exception as e:
                     st.error(f"❌ Erro na conexão: {str(e)}")
@@ -249,6 +447,37 @@ class SheetsPedidosSync:
                 else:
                     st.error("Arquivo de mapeamento não encontrado!")
 
+            # Manutenção: reconstrução completa das abas de pedidos
+            st.markdown("### Reconstruir Abas de Pedidos")
+            st.caption("Regrava as abas Pedidos e Itens a partir dos pedidos locais. Use apenas se a planilha estiver inconsistente.")
+            if st.button("🛠️ Reconstruir Pedidos e Itens", key="reconstruir_btn"):
+                with st.spinner("Reconstruindo abas..."):
+                    success, message = self.reconstruir_pedidos()
+                    if success:
+                        st.success("Abas Pedidos e Itens reconstruídas com sucesso!")
+                    else:
+                        st.error(message)
+
+            st.markdown("### Buscar Novos Pedidos do Google Sheets")
+            st.caption("Inclui os pedidos acrescentados diretamente nas abas Pedidos e Itens, lendo só as linhas novas (nada é lido se a planilha não mudou).")
+            if st.button("➕ Buscar Novos Pedidos", key="buscar_novos_btn"):
+                with st.spinner("Buscando novos pedidos..."):
+                    success, message = self.buscar_novos_do_sheets()
+                    if success:
+                        st.success(message)
+                    else:
+                        st.error(message)
+
+            st.markdown("### Recarregar Pedidos do Google Sheets")
+            st.caption("Substitui os pedidos locais pelo conteúdo das abas Pedidos e Itens. Pedidos ainda não replicados serão perdidos.")
+            if st.button("⬇️ Recarregar do Google Sheets", key="recarregar_btn"):
+                with st.spinner("Recarregando pedidos..."):
+                    success, message = self.recarregar_do_sheets()
+                    if success:
+                        st.success(message)
+                    else:
+                        st.error(message)
+
             # NOVO: Importação manual de XLSX para aba Projeto
             st.markdown("### Importar Localizações (sobrescreve aba Projeto no Google Sheets)")
             arquivo_xlsx = st.file_uploader("Selecione o arquivo XLSX com a aba 'Projeto'", type=["xlsx"], key="importar_xlsx")
@@ -270,88 +499,93 @@ class SheetsPedidosSync:
             st.error("❌ Não conectado ao Google Sheets")
             st.info("Configure as credenciais nas configurações para conectar.")
 
-    def get_pedido_detalhes(self, numero_pedido: str) -> dict:
-        """Busca os detalhes de um pedido pelo número diretamente do Google Sheets."""
-        try:
-            if not self.client:
-                st.warning("Por favor, recarregue a página e aguarde um minuto antes de tentar novamente.")
-                return {}
-            if not self.SPREADSHEET_URL:
-                st.warning("Por favor, recarregue a página e aguarde um minuto antes de tentar novamente.")
-                return {}
-            
-            sheet = self.client.open_by_url(self.SPREADSHEET_URL)
-            ws_pedidos = sheet.worksheet("Pedidos")
-            ws_itens = sheet.worksheet("Itens")
-            
-            # Buscar pedido na aba Pedidos
-            pedidos_data = ws_pedidos.get_all_records()
-            pedido = next((p for p in pedidos_data if p.get("Numero_Pedido") == numero_pedido), None)
-            if not pedido:
-                return {}
-            
-            # Buscar itens na aba Itens
-            itens_data = ws_itens.get_all_records()
-            itens = [item for item in itens_data if item.get("Numero_Pedido") == numero_pedido]
-            
-            # Converter pedido para dicionário
-            info_dict = {
-                "Numero_Pedido": pedido.get("Numero_Pedido", ""),
-                "Data": pedido.get("Data", ""),
-                "Cliente": pedido.get("Cliente", ""),
-                "RACK": pedido.get("RACK", ""),
-                "Localizacao": pedido.get("Localizacao", ""),
-                "Solicitante": pedido.get("Solicitante", ""),
-                "Observacoes": pedido.get("Observacoes", ""),
-                "Ultima_Atualizacao": pedido.get("Ultima_Atualizacao", ""),
-                "Responsavel_Atualizacao": pedido.get("Responsavel_Atualizacao", "")
-            }
-            
-            return {
-                "info": info_dict,
-                "itens": itens,
-                "status": pedido.get("Status", "")
-            }
-        except Exception as e:
-            if "Quota exceeded" in str(e) or "[429]" in str(e):
-                st.warning("Por favor, recarregue a página e aguarde um minuto antes de tentar novamente.")
-            return {}
-
     def atualizar_status_pedido_sheets(self, numero_pedido: str, novo_status: str, ultima_atualizacao: str, responsavel: str, urgente_para_concluido_urgente: bool = False) -> tuple[bool, str]:
         """Atualiza o status de um pedido diretamente no Google Sheets. Se urgente_para_concluido_urgente=True, também atualiza o campo 'Urgente'."""
+        return self.atualizar_status_pedidos_sheets([{
+            "numero_pedido": numero_pedido,
+            "novo_status": novo_status,
+            "ultima_atualizacao": ultima_atualizacao,
+            "responsavel": responsavel,
+            "urgente_para_concluido_urgente": urgente_para_concluido_urgente
+        }])
+
+    def atualizar_status_pedidos_sheets(self, atualizacoes: list[dict]) -> tuple[bool, str]:
+        """
+        Atualiza o status de vários pedidos em uma única requisição de escrita.
+
+        Cada atualização tem as chaves numero_pedido, novo_status, ultima_atualizacao,
+        responsavel e urgente_para_concluido_urgente (como em atualizar_status_pedido_sheets).
+        """
+        success, message, nao_encontrados = self.aplicar_status_pedidos(atualizacoes)
+        if success and nao_encontrados:
+            return False, f"Pedidos não encontrados na coluna 'Numero_Pedido' da aba Pedidos: {', '.join(nao_encontrados)}"
+        return success, message
+
+    def aplicar_status_pedidos(self, atualizacoes: list[dict]) -> tuple[bool, str, list[str]]:
+        """
+        Como atualizar_status_pedidos_sheets, mas devolve à parte os números ausentes da aba.
+
+        As linhas encontradas são gravadas mesmo quando há números ausentes; nesse caso o
+        sucesso é True e os ausentes vêm na lista, já que repetir a escrita não os faria aparecer.
+        """
         try:
             if not self.client:
-                return False, "Cliente do Google Sheets não configurado."
+                return False, "Cliente do Google Sheets não configurado.", []
             if not self.SPREADSHEET_URL:
-                return False, "URL da planilha não configurada."
-
-            sheet = self.client.open_by_url(self.SPREADSHEET_URL)
-            ws_pedidos = sheet.worksheet("Pedidos")
-
-            # Encontrar a linha do pedido pelo Numero_Pedido
-            numeros_pedidos_col = ws_pedidos.col_values(1)
-            try:
-                row_index = numeros_pedidos_col[1:].index(numero_pedido) + 2
-            except ValueError:
-                return False, f"Pedido {numero_pedido} não encontrado na coluna 'Numero_Pedido' da aba Pedidos."
-
-            # Encontrar índices das colunas
-            headers = ws_pedidos.row_values(1)
-            try:
-                status_col_index = headers.index("Status") + 1
-                ultima_atualizacao_col_index = headers.index("Ultima_Atualizacao") + 1
-                responsavel_col_index = headers.index("Responsavel_Atualizacao") + 1
-                urgente_col_index = headers.index("Urgente") + 1 if urgente_para_concluido_urgente else None
-            except ValueError as e:
-                return False, f"Colunas necessárias não encontradas na aba Pedidos: {e}"
-
-            # Atualizar as células
-            ws_pedidos.update_cell(row_index, status_col_index, novo_status)
-            ws_pedidos.update_cell(row_index, ultima_atualizacao_col_index, ultima_atualizacao)
-            ws_pedidos.update_cell(row_index, responsavel_col_index, responsavel)
-            if urgente_para_concluido_urgente and urgente_col_index:
-                ws_pedidos.update_cell(row_index, urgente_col_index, "Concluido Urgente")
-
-            return True, "Status atualizado com sucesso no Google Sheets!"
+                return False, "URL da planilha não configurada.", []
+            if not atualizacoes:
+                return True, "Nenhum pedido para atualizar.", []
+
+            sheet = self._planilha()
+
+            # Posições das colunas vêm dos metadados em cache; se faltar alguma, o cabeçalho
+            # mudou fora do app e os metadados são relidos uma vez
+            nomes = ["Numero_Pedido", "Status", "Ultima_Atualizacao", "Responsavel_Atualizacao"]
+            colunas = {nome: metadados_sheets.coluna(sheet, "Pedidos", nome) for nome in nomes + ["Urgente"]}
+            if not all(colunas[nome] for nome in nomes):
+                metadados_sheets.invalidar(sheet)
+                colunas = {nome: metadados_sheets.coluna(sheet, "Pedidos", nome) for nome in nomes + ["Urgente"]}
+            faltantes = [nome for nome in nomes if not colunas[nome]]
+            if faltantes:
+                return False, f"Colunas necessárias não encontradas na aba Pedidos: {', '.join(faltantes)}", []
+            status_col_index = colunas["Status"]
+            ultima_atualizacao_col_index = colunas["Ultima_Atualizacao"]
+            responsavel_col_index = colunas["Responsavel_Atualizacao"]
+            urgente_col_index = colunas["Urgente"]
+
+            # Só a coluna de números é lida para localizar as linhas
+            letra_numero = rowcol_to_a1(1, colunas["Numero_Pedido"])[:-1]
+            resposta = self._api(sheet.values_get, f"'Pedidos'!{letra_numero}:{letra_numero}")
+            numeros = [linha[0] if linha else "" for linha in resposta.get("values", [])]
+            linhas_por_numero = {}
+            for row_index, numero in enumerate(numeros[1:], start=2):
+                linhas_por_numero.setdefault(numero, row_index)
+
+            dados = []
+            nao_encontrados = []
+            for atualizacao in atualizacoes:
+                row_index = linhas_por_numero.get(atualizacao["numero_pedido"])
+                if row_index is None:
+                    nao_encontrados.append(atualizacao["numero_pedido"])
+                    continue
+                celulas = [
+                    (status_col_index, atualizacao["novo_status"]),
+                    (ultima_atualizacao_col_index, atualizacao["ultima_atualizacao"]),
+                    (responsavel_col_index, atualizacao["responsavel"])
+                ]
+                if atualizacao.get("urgente_para_concluido_urgente") and urgente_col_index:
+                    celulas.append((urgente_col_index, "Concluido Urgente"))
+                for col_index, valor in celulas:
+                    dados.append({
+                        "range": f"'Pedidos'!{rowcol_to_a1(row_index, col_index)}",
+                        "values": [[valor]]
+                    })
+
+            if dados:
+                self._api(sheet.values_batch_update, {"valueInputOption": "USER_ENTERED", "data": dados})
+
+            return True, "Status atualizado com sucesso no Google Sheets!", nao_encontrados
         except Exception as e:
-            return False, f"Erro ao atualizar status no Google Sheets: {str(e)}"
+            if isinstance(e, gspread.exceptions.APIError):
+                metadados_sheets.invalidar()
+            return False, f"Erro ao atualizar status no Google Sheets: {str(e)}", []
@@ -1,8 +1,12 @@
 import streamlit as st
+import pandas as pd
 import os
 from datetime import datetime
 import platform
 from utils.sheets_pedidos_sync import SheetsPedidosSync
+from utils.fila_replicacao import fila_replicacao
+from utils.backup_pedidos import obter_backups
+from utils.armazenamento import obter_armazenamento
 
 class ConfiguracoesView:
     def __init__(self):
@@ -12,7 +16,7 @@ class ConfiguracoesView:
             "Solicitação",
             "Pedidos"
         )
-        self.arquivo_backup = os.path.join(self.base_dir, "backup")
+        self.backups = obter_backups()
         self.sheets_sync = SheetsPedidosSync()
 
     def mostrar_interface(self):
@@ -58,52 +62,131 @@ class ConfiguracoesView:
         st.markdown("#### 📁 Localização dos Arquivos")
         st.markdown(f"""
         **Pasta Principal:** {self.base_dir}  
-        **Pasta de Backup:** {self.arquivo_backup}        """)
+        **Pasta de Backup:** {os.path.abspath(self.backups.diretorio)}        """)
+
+        st.markdown("---")
+        self._mostrar_resumo_status()
+        self._mostrar_pedidos_repetidos()
+
+    def _mostrar_pedidos_repetidos(self):
+        # Números repetidos na aba Pedidos: só a primeira linha de cada foi carregada
+        repetidos = obter_armazenamento().pedidos_repetidos()
+        if repetidos:
+            st.warning(
+                f"{len(repetidos)} número(s) de pedido repetido(s) na aba Pedidos do Google Sheets; "
+                f"só a primeira linha de cada foi carregada: {', '.join(repetidos)}"
+            )
+
+    def _mostrar_resumo_status(self):
+        # Resumo de status usado pelo dashboard: conferência e reconstrução
+        st.markdown("#### 📊 Resumo de Status dos Pedidos")
+        armazenamento = obter_armazenamento()
+        col1, col2 = st.columns(2)
+        with col1:
+            if st.button("🔎 Verificar Resumo", key="verificar_resumo"):
+                divergencias = armazenamento.verificar_resumo()
+                if divergencias.empty:
+                    st.success("Resumo consistente com os pedidos.")
+                else:
+                    st.warning(f"{len(divergencias)} contagem(ns) divergente(s). Reconstrua o resumo.")
+                    st.dataframe(divergencias, hide_index=True)
+        with col2:
+            if st.button("🔧 Reconstruir Resumo", key="reconstruir_resumo"):
+                armazenamento.reconstruir_resumo()
+                st.success("Resumo reconstruído a partir dos pedidos.")
 
     def _mostrar_config_sheets(self):
+        self._mostrar_status_replicacao()
         self.sheets_sync.render_config_page()
 
+    def _mostrar_status_replicacao(self):
+        # Situação da fila de replicação para o Google Sheets
+        st.markdown("#### 🔁 Replicação para o Google Sheets")
+        ultima = fila_replicacao.ultima_sincronizacao
+        st.markdown(f"""
+        - **Alterações pendentes:** {fila_replicacao.profundidade}
+        - **Última sincronização:** {ultima.strftime('%d/%m/%Y %H:%M:%S') if ultima else "Nenhuma desde o início do servidor"}
+        """)
+        if fila_replicacao.ultimo_erro:
+            st.warning(f"Último erro de replicação: {fila_replicacao.ultimo_erro}")
+        descartadas = fila_replicacao.quantidade_descartadas
+        if descartadas:
+            st.error(f"{descartadas} alteração(ões) descartada(s): o Google Sheets não pode aceitá-las.")
+            with st.expander("Ver alterações descartadas"):
+                st.dataframe(pd.DataFrame([
+                    {
+                        "Momento": mutacao["momento"],
+                        "Pedido": mutacao["dados"].get("numero_pedido", ""),
+                        "Status": mutacao["dados"].get("novo_status", ""),
+                        "Motivo": mutacao["motivo"],
+                    }
+                    for mutacao in fila_replicacao.descartadas()
+                ]), hide_index=True)
+        st.markdown("---")
+
     def _mostrar_backups(self):
-        # Mostrar backups disponíveis
+        # Mostrar backups registrados no manifesto
         st.markdown("#### 💾 Backups Disponíveis")
-        
-        if not os.path.exists(self.arquivo_backup):
-            os.makedirs(self.arquivo_backup, exist_ok=True)
-            
-        backups = sorted([
-            f for f in os.listdir(self.arquivo_backup)
-            if f.endswith('.xlsx')
-        ], reverse=True)
-        
+
+        if st.button("💾 Fazer Backup Agora", key="backup_agora"):
+            try:
+                entrada = self.backups.fazer_backup(forcar=True, motivo="manual")
+                st.success(f"Backup {entrada['arquivo']} criado com sucesso!")
+            except Exception as e:
+                st.error(f"Erro ao criar backup: {str(e)}")
+
+        backups = self.backups.listar()
         if not backups:
             st.info("Nenhum backup encontrado")
         else:
             for backup in backups:
                 col1, col2 = st.columns([3, 1])
                 with col1:
-                    st.text(backup)
+                    criado_em = datetime.fromisoformat(backup["criado_em"]).strftime('%d/%m/%Y %H:%M:%S')
+                    st.markdown(
+                        f"**{criado_em}** ({backup['motivo']}) — {backup['pedidos']} pedidos, "
+                        f"{backup['itens']} itens, {backup['tamanho'] / 1024:.0f} KB  \n"
+                        f"`{backup['arquivo']}` · SHA-256 `{backup['sha256'][:12]}`"
+                    )
                 with col2:
-                    if st.button("📥 Restaurar", key=f"restore_{backup}"):
+                    if st.button("📥 Restaurar", key=f"restore_{backup['arquivo']}"):
                         try:
-                            # Restaurar backup                            backup_path = os.path.join(self.arquivo_backup, backup)
-                            os.replace(backup_path, self.arquivo_pedidos)
+                            self.backups.restaurar(backup["arquivo"])
                             st.success("Backup restaurado com sucesso!")
                             st.rerun()
                         except Exception as e:
                             st.error(f"Erro ao restaurar backup: {str(e)}")
         
+        # Restauração para um momento pelo diário de eventos
+        st.markdown("#### 🕒 Restaurar para Data e Hora")
+        st.caption("Reconstrói os pedidos como estavam no momento escolhido, a partir do diário de eventos.")
+        col_data, col_hora, col_botao = st.columns([2, 2, 1])
+        with col_data:
+            data_restauracao = st.date_input("Data", key="data_restauracao")
+        with col_hora:
+            hora_restauracao = st.time_input("Hora", key="hora_restauracao")
+        with col_botao:
+            if st.button("🕒 Restaurar", key="restaurar_momento"):
+                try:
+                    momento = datetime.combine(data_restauracao, hora_restauracao)
+                    self.backups.restaurar_momento(momento)
+                    st.success(f"Pedidos restaurados para {momento.strftime('%d/%m/%Y %H:%M')}!")
+                    st.rerun()
+                except Exception as e:
+                    st.error(f"Erro ao restaurar: {str(e)}")
+
         # Informações sobre backups
         st.markdown("#### ℹ️ Informações")
-        st.markdown("""
-        - O sistema mantém automaticamente os últimos 10 backups
-        - Um novo backup é criado sempre que há alterações nos pedidos
-        - Os backups são nomeados com data e hora para fácil identificação
-        - Use o botão "Restaurar" para voltar a uma versão anterior dos dados
+        st.markdown(f"""
+        - Um backup é criado antes de uma alteração nos pedidos, no máximo a cada {self.backups.intervalo_minimo.total_seconds() / 60:.0f} minutos e só se os dados mudaram
+        - São mantidos todos os backups das últimas {self.backups.manter_todos_horas} horas e um por dia até {self.backups.retencao_dias} dias
+        - O manifesto guarda a data, a quantidade de pedidos e itens e o checksum de cada backup
+        - Use o botão "Restaurar" para voltar a uma versão anterior dos dados; o estado atual é salvo em um novo backup antes
         """)
         
         # Aviso importante
         st.warning("""
         **⚠️ Atenção!**  
-        Ao restaurar um backup, a versão atual dos dados será substituída.
-        Certifique-se de que deseja realmente fazer isso antes de prosseguir.
-        """)
\ No newline at end of file
+        Ao restaurar um backup, a versão atual dos dados locais será substituída.
+        O Google Sheets não é alterado: use "Reconstruir Pedidos e Itens" na aba Google Sheets para replicar a versão restaurada.
+        """)
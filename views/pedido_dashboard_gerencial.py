@@ -1,61 +1,77 @@
+import html
 import streamlit as st
 import pandas as pd
+from utils.cache_compartilhado import cache_dados
+
+ESTILO_DASHBOARD = """
+<style>
+.dashboard-cards {display: flex; gap: 18px; margin-bottom: 24px; flex-wrap: wrap;}
+.dashboard-card {
+    background: #fff; border-radius: 8px; padding: 22px 28px; min-width: 220px;
+    box-shadow: 0 2px 4px rgba(0,0,0,0.08); text-align: center; font-size: 17px;
+    font-weight: 500; border: 1px solid #eee; flex: 1 1 220px;
+}
+.card-total {background: #2c3e50; color: #fff;}
+.card-concluido {background: #90EE90;}
+.card-processando {background: #87CEEB;}
+.card-pendente {background: #ffd700;}
+.card-urgente {background: #ff7f7f; color: #fff;}
+</style>
+"""
+
+
+def _cartoes(cartoes, tamanho: int) -> str:
+    """Uma fileira de cartões: (classe css, rótulo, valor)"""
+    return "<div class=\"dashboard-cards\">" + "".join(
+        f"<div class=\"dashboard-card {classe}\">{rotulo}<br><span style='font-size:{tamanho}px'>{valor}</span></div>"
+        for classe, rotulo, valor in cartoes
+    ) + "</div>"
+
+
+def _montar_html(resumo: pd.DataFrame, tempos: dict) -> str:
+    """HTML completo do dashboard (totais gerais, tempo de atendimento e cartões por cliente)"""
+    totais = resumo.sum()
+    partes = [ESTILO_DASHBOARD, _cartoes([
+        ("card-total", "TOTAL PEDIDOS", totais["Total"]),
+        ("card-concluido", "CONCLUÍDO", totais["Concluído"]),
+        ("card-processando", "PROCESSO", totais["Em Processamento"]),
+        ("card-pendente", "PENDENTE", totais["Pendente"]),
+        ("card-urgente", "URGENTE", totais["Urgente"]),
+    ], 28)]
+
+    if tempos["quantidade"]:
+        partes.append(
+            f"<p><b>⏱️ Tempo de atendimento:</b> média {tempos['media']:.1f} h · "
+            f"mediana {tempos['mediana']:.1f} h · {tempos['quantidade']} pedidos concluídos</p>"
+        )
+
+    partes.append("<div style='margin-bottom: 10px;'></div>")
+    for cliente, linha in resumo.iterrows():
+        partes.append(f"<div style='margin-bottom: 8px; font-weight: bold; font-size: 19px;'>{html.escape(str(cliente))}</div>")
+        partes.append(_cartoes([
+            ("card-concluido", "Concluído", linha["Concluído"]),
+            ("card-processando", "Em Processo", linha["Em Processamento"]),
+            ("card-pendente", "Pendente", linha["Pendente"]),
+            ("card-urgente", "Urgente", linha["Urgente"]),
+        ], 24))
+    return "".join(partes)
+
 
 def mostrar_dashboard_gerencial(controller):
     """
     Exibe um dashboard gerencial com totais gerais e por cliente.
     controller: instância de PedidoController
+
+    Os totais vêm do resumo de status materializado no armazenamento local e o HTML é
+    montado uma vez por versão dos dados, então o custo não cresce com o número de pedidos.
     """
-    # Buscar todos os pedidos
-    df_pedidos = controller.buscar_pedidos(status=None)
-    if df_pedidos.empty:
+    versao = controller.versao_dados()
+    resumo = controller.resumo_por_cliente()
+    if resumo.empty:
         return
 
-    # --- TOTAIS GERAIS ---
-    total_pedidos = len(df_pedidos)
-    total_concluido = len(df_pedidos[df_pedidos['Status'] == 'Concluído'])
-    total_processando = len(df_pedidos[df_pedidos['Status'] == 'Em Processamento'])
-    total_pendente = len(df_pedidos[df_pedidos['Status'] == 'Pendente'])
-    total_urgente_pendente = len(df_pedidos[(df_pedidos['Status'] == 'Pendente') & (df_pedidos['Urgente'].str.strip().str.lower() == 'sim')])
-
-    st.markdown(f"""
-    <style>
-    .dashboard-cards {{display: flex; gap: 18px; margin-bottom: 24px; flex-wrap: wrap;}}
-    .dashboard-card {{
-        background: #fff; border-radius: 8px; padding: 22px 28px; min-width: 220px;
-        box-shadow: 0 2px 4px rgba(0,0,0,0.08); text-align: center; font-size: 17px;
-        font-weight: 500; border: 1px solid #eee; flex: 1 1 220px;
-    }}
-    .card-total {{background: #2c3e50; color: #fff;}}
-    .card-concluido {{background: #90EE90;}}
-    .card-processando {{background: #87CEEB;}}
-    .card-pendente {{background: #ffd700;}}
-    .card-urgente {{background: #ff7f7f; color: #fff;}}
-    </style>
-    <div class="dashboard-cards">
-        <div class="dashboard-card card-total">TOTAL PEDIDOS<br><span style='font-size:28px'>{total_pedidos}</span></div>
-        <div class="dashboard-card card-concluido">CONCLUÍDO<br><span style='font-size:28px'>{total_concluido}</span></div>
-        <div class="dashboard-card card-processando">PROCESSO<br><span style='font-size:28px'>{total_processando}</span></div>
-        <div class="dashboard-card card-pendente">PENDENTE<br><span style='font-size:28px'>{total_pendente}</span></div>
-        <div class="dashboard-card card-urgente">URGENTE<br><span style='font-size:28px'>{total_urgente_pendente}</span></div>
-    </div>
-    """, unsafe_allow_html=True)
-
-    # --- POR CLIENTE ---
-    st.markdown("<div style='margin-bottom: 10px;'></div>", unsafe_allow_html=True)
-    clientes = sorted(df_pedidos['Cliente'].unique())
-    for cliente in clientes:
-        df_cliente = df_pedidos[df_pedidos['Cliente'] == cliente]
-        total_concluido = len(df_cliente[df_cliente['Status'] == 'Concluído'])
-        total_processando = len(df_cliente[df_cliente['Status'] == 'Em Processamento'])
-        total_pendente = len(df_cliente[df_cliente['Status'] == 'Pendente'])
-        total_urgente = len(df_cliente[(df_cliente['Status'] == 'Pendente') & (df_cliente['Urgente'].str.strip().str.lower() == 'sim')])
-        st.markdown(f"""
-        <div style='margin-bottom: 8px; font-weight: bold; font-size: 19px;'>{cliente}</div>
-        <div class="dashboard-cards">
-            <div class="dashboard-card card-concluido">Concluído<br><span style='font-size:24px'>{total_concluido}</span></div>
-            <div class="dashboard-card card-processando">Em Processo<br><span style='font-size:24px'>{total_processando}</span></div>
-            <div class="dashboard-card card-pendente">Pendente<br><span style='font-size:24px'>{total_pendente}</span></div>
-            <div class="dashboard-card card-urgente">Urgente<br><span style='font-size:24px'>{total_urgente}</span></div>
-        </div>
-        """, unsafe_allow_html=True) 
\ No newline at end of file
+    conteudo = cache_dados.obter(
+        "dashboard_gerencial_html", versao,
+        lambda: _montar_html(resumo, controller.tempos_de_atendimento())
+    )
+    st.markdown(conteudo, unsafe_allow_html=True)
@@ -1,14 +1,58 @@
 import streamlit as st
 from controllers.pedido_controller import PedidoController
 from datetime import datetime
+import math
+import numpy as np
 import pandas as pd
 import os
 import tempfile
 import time
 from fpdf import FPDF
 from utils.print_manager import PrintManager
+from utils.cache_compartilhado import cache_historico
 import shutil
 
+# Colunas da tabela do histórico: coluna do pedido → título exibido
+COLUNAS_TABELA = {
+    "Numero_Pedido": "Número", "Data": "Data", "Cliente": "Cliente", "RACK": "RACK",
+    "Localizacao": "Localização", "Solicitante": "Solicitante", "Urgente": "Urgente", "Status": "Status",
+    "Ultima_Atualizacao": "Última Atualização", "Responsavel_Atualizacao": "Responsável"
+}
+CLASSES_STATUS = {
+    "Pendente": "status-pendente",
+    "Concluído": "status-concluido",
+    "Em Processamento": "status-processando"
+}
+SELO_URGENTE = '<span style="color:white;background-color:#d9534f;font-weight:bold;padding:2px 8px;border-radius:4px;">URGENTE</span>'
+SELO_NAO_URGENTE = '<span style="color:#222;background-color:#eee;padding:2px 8px;border-radius:4px;">Não</span>'
+
+# Opções de pedidos por página (o padrão vem de HISTORICO_PEDIDOS_POR_PAGINA)
+PEDIDOS_POR_PAGINA = int(os.getenv('HISTORICO_PEDIDOS_POR_PAGINA', '50'))
+TAMANHOS_PAGINA = sorted({25, 50, 100, 200, PEDIDOS_POR_PAGINA})
+
+
+def _escapar(serie: pd.Series) -> pd.Series:
+    """Escapa HTML de uma coluna inteira de uma vez"""
+    return (
+        serie.str.replace("&", "&amp;", regex=False)
+        .str.replace("<", "&lt;", regex=False)
+        .str.replace(">", "&gt;", regex=False)
+        .str.replace('"', "&quot;", regex=False)
+    )
+
+
+def html_tabela_pedidos(df_pagina: pd.DataFrame) -> str:
+    """HTML da tabela de uma página do histórico, com os selos de status e urgência montados por coluna"""
+    tabela = df_pagina[list(COLUNAS_TABELA)].fillna("").astype(str)
+    status = tabela["Status"]
+    urgente = tabela["Urgente"].str.strip().str.lower() == "sim"
+    tabela = tabela.apply(_escapar)
+    tabela["Status"] = '<span class="' + status.map(CLASSES_STATUS).fillna("") + '">' + tabela["Status"] + "</span>"
+    tabela["Urgente"] = np.where(urgente, SELO_URGENTE, SELO_NAO_URGENTE)
+    tabela.columns = list(COLUNAS_TABELA.values())
+    return f'<div class="tabela-pedidos">{tabela.to_html(escape=False, index=False)}</div>'
+
+
 class PedidoHistoricoView:
     def __init__(self, controller: PedidoController):
         self.controller = controller
@@ -204,6 +248,13 @@ class PedidoHistoricoView:
         try:
             st.markdown("### 📋 Histórico de Pedidos")
 
+            # Busca por texto (índice invertido): substitui o período e a ordenação por relevância
+            busca = st.text_input(
+                "🔎 Buscar pedidos",
+                placeholder="Número, cliente, solicitante, RACK, localização ou observações",
+                key="historico_busca"
+            ).strip()
+
             # Filtro de Status
             status_filtro = st.selectbox(
                 "Status do Pedido",
@@ -214,79 +265,139 @@ class PedidoHistoricoView:
             # Filtro por Data
             col_data1, col_data2 = st.columns(2)
             with col_data1:
-                data_inicial = st.date_input("Data inicial", value=None, key="filtro_data_inicial")
+                data_inicial = st.date_input("Data inicial", value=None, key="filtro_data_inicial", disabled=bool(busca))
             with col_data2:
-                data_final = st.date_input("Data final", value=None, key="filtro_data_final")
-
-            # Buscar pedidos já filtrando pelo status selecionado
-            df_pedidos = self.controller.buscar_pedidos(status=status_filtro if status_filtro != "Todos" else None)
+                data_final = st.date_input("Data final", value=None, key="filtro_data_final", disabled=bool(busca))
+
+            # Ordenação e tamanho da página (feitas no servidor)
+            col_ordem1, col_ordem2, col_ordem3 = st.columns(3)
+            with col_ordem1:
+                ordenar_por = st.selectbox(
+                    "Ordenar por", list(PedidoController.ORDENACOES_HISTORICO), key="historico_ordenar_por",
+                    disabled=bool(busca)
+                )
+            with col_ordem2:
+                ordem = st.selectbox("Ordem", ["Decrescente", "Crescente"], key="historico_ordem", disabled=bool(busca))
+            with col_ordem3:
+                tamanho_pagina = st.selectbox(
+                    "Pedidos por página", TAMANHOS_PAGINA,
+                    index=TAMANHOS_PAGINA.index(PEDIDOS_POR_PAGINA), key="historico_tamanho_pagina"
+                )
 
-            # Aplicar filtro de data se selecionado
-            if not df_pedidos.empty and (data_inicial or data_final):
-                df_pedidos["Data_dt"] = pd.to_datetime(df_pedidos["Data"], format="%d/%m/%Y %H:%M", errors="coerce")
-                if data_inicial:
-                    df_pedidos = df_pedidos[df_pedidos["Data_dt"] >= pd.to_datetime(data_inicial)]
-                if data_final:
-                    df_pedidos = df_pedidos[df_pedidos["Data_dt"] <= pd.to_datetime(data_final) + pd.Timedelta(days=1)]
-                df_pedidos = df_pedidos.drop(columns=["Data_dt"])
+            if busca:
+                # Resultados da busca por relevância, só com o filtro de status
+                filtros = ("busca", busca, status_filtro)
+                df_pedidos, encontrados = self.controller.buscar_texto(
+                    busca, status_filtro if status_filtro != "Todos" else None
+                )
+                quantidade = len(df_pedidos)
+            else:
+                # Rótulos filtrados e ordenados (em cache por filtro e versão dos dados);
+                # só as linhas da página visível são lidas dos pedidos
+                filtros = (
+                    status_filtro if status_filtro != "Todos" else None,
+                    data_inicial, data_final, ordenar_por, ordem == "Crescente"
+                )
+                rotulos = self.controller.consultar_pedidos(*filtros)
+                quantidade = len(rotulos)
 
-            if df_pedidos.empty:
+            if quantidade == 0:
                 st.warning("Nenhum pedido encontrado com os filtros selecionados.")
                 return
 
-            # Mostrar total de pedidos
-            # st.write(f"Total: {len(df_pedidos)} pedidos encontrados")
-            # Removido para não mostrar debug ao usuário
-
-            # Formatar DataFrame para exibição
-            df_display = df_pedidos[[
-                "Numero_Pedido", "Data", "Cliente", "RACK", 
-                "Localizacao", "Solicitante", "Urgente", "Status",
-                "Ultima_Atualizacao", "Responsavel_Atualizacao"
-            ]].copy()
-
-            # Renomear colunas
-            df_display.columns = [
-                "Número", "Data", "Cliente", "RACK",
-                "Localização", "Solicitante", "Urgente", "Status",
-                "Última Atualização", "Responsável"
-            ]
-
-            # Formatar status com cores
-            def formatar_status(status):
-                cores = {
-                    "Pendente": "status-pendente",
-                    "Concluído": "status-concluido",
-                    "Em Processamento": "status-processando"
-                }
-                classe = cores.get(status, "")
-                return f'<span class="{classe}">{status}</span>'
-
-            df_display["Status"] = df_display["Status"].apply(formatar_status)
-
-            # Formatar urgente com cores
-            def formatar_urgente(urgente):
-                if urgente.strip().lower() == "sim":
-                    return '<span style="color:white;background-color:#d9534f;font-weight:bold;padding:2px 8px;border-radius:4px;">URGENTE</span>'
-                else:
-                    return '<span style="color:#222;background-color:#eee;padding:2px 8px;border-radius:4px;">Não</span>'
-
-            df_display["Urgente"] = df_display["Urgente"].apply(formatar_urgente)
+            total_paginas = max(1, math.ceil(quantidade / tamanho_pagina))
+            if st.session_state.get("historico_pagina", 1) > total_paginas:
+                st.session_state["historico_pagina"] = 1
 
-            # Mostrar tabela dentro de um expander
+            # Mostrar tabela dentro de um expander: só a página visível é enviada ao navegador
             with st.expander("Ver pedidos", expanded=True):
+                col_pagina, col_total = st.columns([1, 3])
+                with col_pagina:
+                    pagina = st.number_input(
+                        "Página", min_value=1, max_value=total_paginas, step=1, key="historico_pagina"
+                    )
+                with col_total:
+                    if busca and encontrados > quantidade:
+                        st.caption(
+                            f"{encontrados} pedidos encontrados, mostrando os {quantidade} mais relevantes "
+                            f"(refine a busca para ver os demais) · página {pagina} de {total_paginas}"
+                        )
+                    else:
+                        st.caption(f"{quantidade} pedidos · página {pagina} de {total_paginas}")
+                inicio = (pagina - 1) * tamanho_pagina
+                if busca:
+                    df_pagina = df_pedidos.iloc[inicio:inicio + tamanho_pagina]
+                else:
+                    df_pagina = self.controller.pagina_pedidos(rotulos, inicio, tamanho_pagina)
                 st.markdown(
-                    f'<div class="tabela-pedidos">{df_display.to_html(escape=False, index=False)}</div>',
+                    cache_historico.obter(
+                        ("pagina",) + filtros + (tamanho_pagina, pagina),
+                        self.controller.versao_dados(),
+                        lambda: html_tabela_pedidos(df_pagina)
+                    ),
                     unsafe_allow_html=True
                 )
 
+            # Atualização de status em lote
+            with st.expander("Atualizar status em lote"):
+                pedidos_lote = st.multiselect(
+                    "Pedidos (da página atual)",
+                    df_pagina["Numero_Pedido"].tolist(),
+                    key="pedidos_lote"
+                )
+                col_lote1, col_lote2 = st.columns(2)
+                with col_lote1:
+                    status_lote = st.selectbox(
+                        "Novo Status",
+                        ["Pendente", "Em Processamento", "Concluído"],
+                        key="status_lote"
+                    )
+                with col_lote2:
+                    responsavel_lote = st.text_input(
+                        "Responsável",
+                        value=st.session_state.get('nome_usuario', ''),
+                        placeholder="Digite seu nome",
+                        key="responsavel_lote"
+                    )
+                if st.button("Atualizar Selecionados", use_container_width=True, key="atualizar_lote"):
+                    if not pedidos_lote:
+                        st.error("Selecione ao menos um pedido!")
+                    elif not responsavel_lote:
+                        st.error("Por favor, informe o nome do responsável!")
+                    else:
+                        st.session_state['nome_usuario'] = responsavel_lote
+                        success, message = self.controller.atualizar_status_pedidos(
+                            pedidos_lote,
+                            status_lote,
+                            responsavel_lote
+                        )
+                        if success:
+                            st.success(f"{len(pedidos_lote)} pedido(s) atualizado(s) para {status_lote}!")
+                            st.rerun()
+                        else:
+                            st.warning(f"Aviso: {message}")
+
+            # Exportação sob demanda para Excel (o arquivo não é mais regravado a cada alteração)
+            with st.expander("Exportar pedidos para Excel"):
+                if st.button("📤 Gerar arquivo Excel", key="gerar_excel"):
+                    st.session_state['exportar_excel'] = True
+                if st.session_state.get('exportar_excel'):
+                    st.download_button(
+                        "⬇️ Baixar pedidos.xlsx",
+                        data=self.controller.exportar_excel(),
+                        file_name=f"pedidos_{datetime.now().strftime('%Y%m%d_%H%M')}.xlsx",
+                        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                        on_click=lambda: st.session_state.pop('exportar_excel', None),
+                        key="baixar_excel"
+                    )
+
             # Detalhes do Pedido
             st.markdown("### Detalhes do Pedido")
 
             # Seleção do pedido
             pedido_selecionado = st.selectbox(
-                "Selecione um pedido",
-                [""] + df_pedidos["Numero_Pedido"].tolist()
+                "Selecione um pedido (da página atual)",
+                [""] + df_pagina["Numero_Pedido"].tolist()
             )
 
             if pedido_selecionado:
@@ -365,6 +476,22 @@ class PedidoHistoricoView:
                     st.markdown("---")
                     st.markdown("#### Observações")
                     st.write(detalhes['info']['Observacoes'])
+
+                # Histórico de eventos do pedido (criação e mudanças de status)
+                with st.expander("Histórico do pedido"):
+                    historico = self.controller.historico_pedido(pedido_selecionado)
+                    if historico.empty:
+                        st.info("Nenhum evento registrado para este pedido.")
+                    else:
+                        historico = historico.assign(
+                            Momento=pd.to_datetime(historico["momento"], format='ISO8601').dt.strftime('%d/%m/%Y %H:%M'),
+                            Evento=historico["tipo"].map({"criacao": "Criação", "status": "Mudança de status"})
+                        )
+                        st.dataframe(
+                            historico[["Momento", "Evento", "Status", "Responsavel"]].rename(columns={"Responsavel": "Responsável"}),
+                            hide_index=True,
+                            use_container_width=True
+                        )
         except Exception as e:
             if "Quota exceeded" in str(e) or "[429]" in str(e):
                 st.warning("Por favor, recarregue a página e aguarde um minuto antes de tentar novamente.")
@@ -1,5 +1,6 @@
 import streamlit as st
 from controllers.pedido_controller import PedidoController
+from models.catalogo import IndiceCatalogo
 from typing import List, Dict
 import pandas as pd
 from datetime import datetime
@@ -137,15 +138,10 @@ class PedidoView:
         </style>
         """, unsafe_allow_html=True)
 
-    def _mostrar_posicoes_e_contagem(self, dados, cliente: str, rack: str):
+    def _mostrar_posicoes_e_contagem(self, indice: IndiceCatalogo, cliente: str, rack: str):
         """Mostra a tabela de posições e a contagem"""
-        # Filtrar posições do rack
-        posicoes = [
-            item.locacao
-            for item in dados
-            if item.cliente.lower() == cliente.lower() 
-            and item.rack.lower() == rack.lower()
-        ]
+        # Posições do rack direto do índice do catálogo
+        posicoes = indice.posicoes(cliente, rack)
         
         if posicoes:
             # Layout em duas colunas
@@ -290,43 +286,32 @@ class PedidoView:
         """Mostra a interface principal do pedido"""
         st.markdown('<p class="titulo-secao">📦 Novo Pedido de Bobina</p>', unsafe_allow_html=True)
         
-        # Carregar dados da planilha
-        dados = self.controller.carregar_dados()
+        # Carregar índice do catálogo
+        indice = self.controller.carregar_indice()
         
         # 1. Seleção do Cliente
-        clientes = sorted(list(set(item.cliente for item in dados)))
         cliente = st.selectbox(
             "Cliente",
-            [""] + clientes,
+            [""] + indice.clientes,
             index=0
         )
         
         # 2. Seleção do RACK
         rack = None
         if cliente:
-            racks_do_cliente = sorted(list(set(
-                item.rack for item in dados 
-                if item.cliente.lower() == cliente.lower()
-            )))
             rack = st.selectbox(
                 "RACK",
-                [""] + racks_do_cliente,
+                [""] + indice.racks(cliente),
                 index=0
             )
             
             # Mostrar posições e contagem se um RACK foi selecionado
             if rack:
-                self._mostrar_posicoes_e_contagem(dados, cliente, rack)
+                self._mostrar_posicoes_e_contagem(indice, cliente, rack)
                 
                 # Se uma posição foi selecionada, mostrar o formulário
                 if 'posicao_selecionada' in st.session_state:
-                    item_selecionado = next(
-                        (item for item in dados 
-                         if item.cliente.lower() == cliente.lower()
-                         and item.rack.lower() == rack.lower()
-                         and item.locacao.lower() == st.session_state.posicao_selecionada.lower()),
-                        None
-                    )
+                    item_selecionado = indice.item(cliente, rack, st.session_state.posicao_selecionada)
                     
                     if item_selecionado:
-                        self._mostrar_formulario_requisicao(item_selecionado) 
\ No newline at end of file
+                        self._mostrar_formulario_requisicao(item_selecionado)